@@ -0,0 +1,153 @@
+# batch_export.py
+
+import argparse
+import calendar
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+from database import Database
+from claims_report import read_claims_template, write_claims_month
+from qa83_report import write_qa83_report_cached
+from report_cache import ReportCache
+from timesheet_data import build_timesheet, write_timesheet_csv
+
+REPORT_KINDS = ('qa83', 'timesheet', 'travel')
+
+# Each pool process opens the snapshot once and reuses it for all of its months.
+_snapshot_db = None
+
+
+def _load_json(path, default):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError):
+        return default
+
+
+def load_export_settings(config_dir='.'):
+    """
+    Reads what the reports depend on from the JSON files in config_dir, the same
+    files the tabs use: config.json plus holiday.json, QA83.json, timesheet.json
+    and travel.json. Returns a picklable dict for the pool processes.
+    """
+    main_config = _load_json(os.path.join(config_dir, 'config.json'), {})
+    main_config['holidays'] = list(set(_load_json(os.path.join(config_dir, 'holiday.json'), {}).get("holidays", [])))
+    qa83_config = _load_json(os.path.join(config_dir, 'QA83.json'), {})
+    return {
+        'main_config': main_config,
+        'name': qa83_config.get("name", "N/A"),
+        'designation': qa83_config.get("designation", "N/A"),
+        'qa83_categories': qa83_config.get("qa83_categories", []),
+        'row_configs': _load_json(os.path.join(config_dir, 'timesheet.json'), {}).get("row_configurations", []),
+        'travel_categories': _load_json(os.path.join(config_dir, 'travel.json'), {}).get("travel_categories", []),
+        'report_cache_dir': os.path.join(config_dir, 'report_cache'),
+    }
+
+
+def _open_snapshot(snapshot_path):
+    global _snapshot_db
+    _snapshot_db = Database(snapshot_path)
+
+
+def export_month_report(kind, year, month, output_dir, settings):
+    """Pool task: writes one kind of report for one month from the snapshot. Returns the written paths."""
+    db = _snapshot_db
+    month_start = date(year, month, 1)
+    if kind == 'qa83':
+        path = os.path.join(output_dir, f"QA83_Report_{month_start.strftime('%Y-%m')}.html")
+        write_qa83_report_cached(db, year, month, path, settings['name'], settings['designation'],
+                                 ReportCache(settings['report_cache_dir']))
+        return [path]
+    if kind == 'timesheet':
+        path = os.path.join(output_dir, f"Timesheet_{month_start.strftime('%Y-%m')}.csv")
+        dates = [date(year, month, day) for day in range(1, calendar.monthrange(year, month)[1] + 1)]
+        write_timesheet_csv(path, build_timesheet(db, dates, settings['main_config'], settings['row_configs']))
+        return [path]
+    return write_claims_month(db, month_start, output_dir, read_claims_template(), settings['travel_categories'],
+                              settings['name'], settings['designation'])
+
+
+def export_reports(db, months, kinds, output_dir, settings, max_workers=None, progress_callback=None):
+    """
+    Writes the chosen kinds of report for every (year, month) in months into
+    output_dir. All of them are read from one backup snapshot of db, so they agree
+    with each other even if the database changes meanwhile, and each month and kind
+    is rendered in its own pool process. progress_callback, if given, receives
+    (reports done, total). Returns the written paths, sorted.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [(kind, year, month) for year, month in months for kind in kinds]
+    if not jobs:
+        return []
+    snapshot_dir = tempfile.mkdtemp(prefix='task_tracker_export_')
+    try:
+        snapshot_path = os.path.join(snapshot_dir, 'snapshot.db')
+        db.backup_to(snapshot_path)
+        # Bring the snapshot's schema and QA83 groups up to date once, so the pool only reads it.
+        snapshot = Database(snapshot_path)
+        snapshot.set_qa83_categories(settings['qa83_categories'])
+        snapshot.close()
+
+        written = []
+        # spawn, as for the PDF export: the GUI process must not be forked.
+        with ProcessPoolExecutor(max_workers=min(max_workers or os.cpu_count() or 1, len(jobs)),
+                                 mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_open_snapshot, initargs=(snapshot_path,)) as pool:
+            futures = [pool.submit(export_month_report, kind, year, month, output_dir, settings)
+                       for kind, year, month in jobs]
+            try:
+                for done, future in enumerate(as_completed(futures), start=1):
+                    written.extend(future.result())
+                    if progress_callback:
+                        progress_callback(done, len(futures))
+            except BaseException:
+                pool.shutdown(cancel_futures=True)
+                raise
+        return sorted(written)
+    finally:
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+
+
+def parse_month_range(text):
+    """Parses '3' or '1-6' into a list of month numbers."""
+    first, _, last = text.partition('-')
+    months = list(range(int(first), int(last or first) + 1))
+    if not months or months[0] < 1 or months[-1] > 12:
+        raise argparse.ArgumentTypeError(f"invalid month range: {text}")
+    return months
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Writes QA83, timesheet and travel reports for many months at once.")
+    parser.add_argument('year', type=int)
+    parser.add_argument('output_dir')
+    parser.add_argument('--months', type=parse_month_range, default=list(range(1, 13)),
+                        help="month or range of months, e.g. 3 or 1-6 (default: the whole year)")
+    parser.add_argument('--kinds', nargs='+', choices=REPORT_KINDS, default=list(REPORT_KINDS))
+    parser.add_argument('--db', default='task_tracker.db')
+    parser.add_argument('--config-dir', default='.', help="folder with config.json, QA83.json and the other settings")
+    parser.add_argument('--jobs', type=int, default=None, help="worker processes (default: one per core)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        parser.error(f"database not found: {args.db}")
+    db = Database(args.db)
+    try:
+        written = export_reports(db, [(args.year, month) for month in args.months], args.kinds, args.output_dir,
+                                 load_export_settings(args.config_dir), args.jobs,
+                                 lambda done, total: print(f"\r{done}/{total} reports", end='', flush=True))
+    finally:
+        db.close()
+    print(f"\n{len(written)} file(s) written to {os.path.abspath(args.output_dir)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
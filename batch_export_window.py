@@ -0,0 +1,136 @@
+# batch_export_window.py
+
+from datetime import datetime
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, QPushButton,
+                             QDateEdit, QCheckBox, QLineEdit, QFileDialog, QProgressBar,
+                             QDialogButtonBox, QMessageBox)
+from PySide6.QtCore import QThread, Signal, QDate, QUrl, QStandardPaths
+from PySide6.QtGui import QDesktopServices
+
+from batch_export import REPORT_KINDS, export_reports, load_export_settings
+from claims_report import month_range
+
+KIND_LABELS = {'qa83': "QA83 report (HTML)", 'timesheet': "Timesheet (CSV)", 'travel': "Travel claims (HTML and CSV)"}
+
+
+class BatchExportWorker(QThread):
+    """Runs export_reports off the GUI thread; the snapshot backup reads through this thread's connection."""
+    progress = Signal(int, int)
+    succeeded = Signal(list)
+    failed = Signal(str)
+
+    def __init__(self, db, months, kinds, output_dir, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.months = months
+        self.kinds = kinds
+        self.output_dir = output_dir
+
+    def run(self):
+        try:
+            written = export_reports(self.db, self.months, self.kinds, self.output_dir,
+                                     load_export_settings(), progress_callback=self.progress.emit)
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.succeeded.emit(written)
+        finally:
+            self.db.release_thread_connection()
+
+
+class BatchExportWindow(QDialog):
+    """Writes QA83, timesheet and travel reports for a range of months into one folder."""
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.worker = None
+        self.setWindowTitle("Batch Export Reports")
+        self.setMinimumWidth(460)
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        form = QFormLayout()
+        today = datetime.now().date()
+        self.from_edit = QDateEdit(QDate(today.year, 1, 1))
+        self.from_edit.setDisplayFormat("MMMM yyyy")
+        self.to_edit = QDateEdit(QDate(today.year, today.month, 1))
+        self.to_edit.setDisplayFormat("MMMM yyyy")
+        form.addRow("From month:", self.from_edit)
+        form.addRow("To month:", self.to_edit)
+
+        self.kind_checks = {}
+        for kind in REPORT_KINDS:
+            self.kind_checks[kind] = QCheckBox(KIND_LABELS[kind])
+            self.kind_checks[kind].setChecked(True)
+            form.addRow("" if kind != REPORT_KINDS[0] else "Reports:", self.kind_checks[kind])
+
+        folder_layout = QHBoxLayout()
+        self.folder_edit = QLineEdit(QStandardPaths.writableLocation(QStandardPaths.StandardLocation.DesktopLocation))
+        browse_button = QPushButton("Browse...")
+        browse_button.clicked.connect(self._choose_folder)
+        folder_layout.addWidget(self.folder_edit)
+        folder_layout.addWidget(browse_button)
+        form.addRow("Save to:", folder_layout)
+        layout.addLayout(form)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(QLabel("All reports are read from one snapshot of the database."))
+
+        self.buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        self.export_button = self.buttons.addButton("Export", QDialogButtonBox.ButtonRole.AcceptRole)
+        self.buttons.accepted.connect(self._start_export)
+        self.buttons.rejected.connect(self.reject)
+        layout.addWidget(self.buttons)
+
+    def _choose_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Save Reports To", self.folder_edit.text())
+        if folder:
+            self.folder_edit.setText(folder)
+
+    def get_months(self):
+        first_month = self.from_edit.date().toPython().replace(day=1)
+        last_month = self.to_edit.date().toPython().replace(day=1)
+        if last_month < first_month:
+            first_month, last_month = last_month, first_month
+        return [(month.year, month.month) for month in month_range(first_month, last_month)]
+
+    def _start_export(self):
+        kinds = [kind for kind in REPORT_KINDS if self.kind_checks[kind].isChecked()]
+        output_dir = self.folder_edit.text().strip()
+        if not kinds or not output_dir:
+            QMessageBox.warning(self, "Batch Export", "Choose at least one report and a folder.")
+            return
+
+        months = self.get_months()
+        self.progress_bar.setRange(0, len(months) * len(kinds))
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.export_button.setEnabled(False)
+
+        self.worker = BatchExportWorker(self.db, months, kinds, output_dir, self)
+        self.worker.progress.connect(lambda done, total: self.progress_bar.setValue(done))
+        self.worker.succeeded.connect(self._on_export_finished)
+        self.worker.failed.connect(self._on_export_failed)
+        self.worker.finished.connect(self._on_worker_finished)
+        self.worker.start()
+
+    def _on_export_finished(self, paths):
+        QMessageBox.information(self, "Success", f"{len(paths)} file(s) saved to:\n{self.folder_edit.text()}")
+        QDesktopServices.openUrl(QUrl.fromLocalFile(self.folder_edit.text()))
+
+    def _on_export_failed(self, error):
+        QMessageBox.critical(self, "Error", f"Failed to export reports: {error}")
+
+    def _on_worker_finished(self):
+        self.export_button.setEnabled(True)
+        self.progress_bar.setVisible(False)
+        self.worker.deleteLater()
+        self.worker = None
+
+    def reject(self):
+        # The pool cannot be interrupted cleanly, so the dialog stays open until it finishes.
+        if self.worker is None:
+            super().reject()
@@ -0,0 +1,161 @@
+# benchmarks/qa83_view.py
+
+"""
+Times the QA83 month view on a synthetic month with thousands of QA83 entries:
+qa83_data.build_qa83_view against the per-group lookups the QA83 tab used
+before it (one get_task_by_id and one get_qa83_progress call per group and a
+linear scan for each group's master). Both must give the same groups, hours and
+progress cells. Run from the repository root:
+
+    python benchmarks/qa83_view.py --rows 6000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+from qa83_data import build_qa83_view, get_month_weeks_info, get_progress_cells
+
+QA83_CATEGORIES = ['QA83']
+
+
+def create_month(db, year, month, rows, seed=1):
+    """
+    Fills db with about rows tasks spread over the working days of the month, in
+    short back-to-back slots. Most are QA83 work; about one group in ten is merged
+    into a master, and about one in five has progress stored for the month.
+    """
+    rng = random.Random(seed)
+    days = [date(year, month, 1) + timedelta(days=i) for i in range(31)]
+    days = [d for d in days if d.month == month and d.weekday() < 5]
+    per_day = -(-rows // len(days))
+    slot_minutes = max(1, 540 // per_day)
+    tasks = []
+    for day in days:
+        start = datetime.combine(day, datetime.min.time()) + timedelta(hours=8)
+        for _ in range(per_day):
+            if len(tasks) == rows:
+                break
+            end = start + timedelta(minutes=slot_minutes)
+            code = f"P{rng.randrange(60):03d}"
+            # A few descriptions recur, so some entries share an original key.
+            description = f"<p>Check {code} item {rng.randrange(rows // 2)}</p>"
+            categories = 'QA83' if rng.random() < 0.9 else 'Travel'
+            tasks.append((day.isoformat(), start.strftime('%H:%M:%S'), end.strftime('%H:%M:%S'),
+                          code, description, categories, ''))
+            start = end
+
+    db.set_qa83_categories(QA83_CATEGORIES)
+    month_year = f"{year:04d}-{month:02d}"
+    with db.immediate_transaction() as cursor:
+        cursor.executemany('''
+            INSERT INTO tasks (task_date, start_time, end_time, project_code, description, categories, software)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', tasks)
+        cursor.execute("SELECT id, project_code, description FROM tasks WHERE categories = 'QA83' ORDER BY id")
+        qa83_rows = cursor.fetchall()
+        for position in range(0, len(qa83_rows) - 4, 40):
+            master_id = qa83_rows[position][0]
+            child_ids = [row[0] for row in qa83_rows[position + 1:position + 4]]
+            cursor.executemany('UPDATE tasks SET master_task_id = ? WHERE id = ?',
+                               [(master_id, child_id) for child_id in child_ids])
+            cursor.execute('UPDATE tasks SET merged_description = ? WHERE id = ?',
+                           (f"<p>Merged work {master_id}</p>", master_id))
+        cursor.executemany('''
+            INSERT OR REPLACE INTO qa83_progress (month_year, project_code, description, start_progress, final_progress)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(month_year, code, description, str(rng.randrange(50)), str(rng.randrange(50, 101)))
+              for _, code, description in qa83_rows[::5]])
+
+
+def build_qa83_view_per_group(db, year, month):
+    """The QA83 tab's data path before build_qa83_view, without the table widget."""
+    month_year_str = f"{year:04d}-{month:02d}"
+    _, day_to_week_map, num_weeks = get_month_weeks_info(year, month)
+    all_tasks = db.get_tasks_for_month_with_master_info(month_year_str)
+    qa83_categories = set(QA83_CATEGORIES)
+    qa83_tasks = [task for task in all_tasks if qa83_categories.intersection(set(task[6].split(',')))]
+    task_groups = {}
+    for task in qa83_tasks:
+        group_id = task[8] if task[8] else task[13]
+        task_start_dt = datetime.combine(datetime.strptime(task[1], '%Y-%m-%d'), datetime.strptime(task[2], '%H:%M:%S').time())
+        if group_id not in task_groups:
+            master_task = next((t for t in all_tasks if t[0] == group_id), None)
+            if not master_task:
+                continue
+            task_groups[group_id] = {"proj_code": master_task[4], "description": db.get_task_by_id(group_id)[9] or master_task[5],
+                                     "original_key": (master_task[4], master_task[5]), "tasks": [], "earliest_start_dt": task_start_dt}
+        task_groups[group_id]["tasks"].append(task)
+        task_groups[group_id]["earliest_start_dt"] = min(task_groups[group_id]["earliest_start_dt"], task_start_dt)
+
+    groups = []
+    for group in sorted(task_groups.values(), key=lambda g: (g['proj_code'], g['earliest_start_dt'])):
+        weekly_hours, total_hours = [0.0] * num_weeks, 0.0
+        for task in group["tasks"]:
+            week_idx = day_to_week_map.get(int(task[1][8:10]))
+            duration = (datetime.strptime(task[3], '%H:%M:%S') - datetime.strptime(task[2], '%H:%M:%S')).total_seconds() / 3600
+            weekly_hours[week_idx] += duration; total_hours += duration
+        start, final = db.get_qa83_progress(month_year_str, *group["original_key"])
+        groups.append((group["proj_code"], group["description"], weekly_hours,
+                       get_progress_cells(weekly_hours, total_hours, start or "0", final or "100")))
+    return groups
+
+
+def _view_groups(view):
+    return [(proj_code, group["description"], group["weekly_hours"], group["progress_cells"])
+            for proj_code, _, groups in view['projects'] for group in groups]
+
+
+def _same_groups(expected, actual):
+    return len(expected) == len(actual) and all(
+        a[:2] == b[:2] and a[3] == b[3] and all(abs(x - y) < 1e-9 for x, y in zip(a[2], b[2]))
+        for a, b in zip(expected, actual))
+
+
+def _time(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings), statistics.median(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Times the QA83 month view on a synthetic month.")
+    parser.add_argument('--rows', type=int, default=6000, help="tasks to generate in the month (default: 6000)")
+    parser.add_argument('--month', default='2025-03', help="month to generate, as YYYY-MM (default: 2025-03)")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs of each path (default: 5)")
+    args = parser.parse_args(argv)
+    year, month = (int(part) for part in args.month.split('-'))
+
+    with tempfile.TemporaryDirectory(prefix='qa83_benchmark_') as folder:
+        db = Database(os.path.join(folder, 'benchmark.db'))
+        try:
+            create_month(db, year, month, args.rows)
+            view = build_qa83_view(db, year, month)
+            per_group = build_qa83_view_per_group(db, year, month)
+            if not _same_groups(per_group, _view_groups(view)):
+                print("The two paths disagree on the month's groups.")
+                return 1
+            qa83_rows = db._fetchone("SELECT COUNT(*) FROM tasks WHERE categories = 'QA83'")[0]
+            print(f"{args.month}: {args.rows} tasks, {qa83_rows} QA83, {len(per_group)} groups")
+            for label, function in (("per-group lookups", lambda: build_qa83_view_per_group(db, year, month)),
+                                    ("build_qa83_view", lambda: build_qa83_view(db, year, month))):
+                best, median = _time(function, args.repeat)
+                print(f"  {label:<18} best {best * 1000:8.1f} ms   median {median * 1000:8.1f} ms")
+        finally:
+            db.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
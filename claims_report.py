@@ -0,0 +1,147 @@
+# claims_report.py
+
+import csv
+import html
+import os
+import sys
+from datetime import datetime, timedelta
+from PySide6.QtCore import QThread, Signal
+
+CLAIMS_TEMPLATE = 'claims_template.html'
+CSV_HEADERS = ["Date", "Start", "End", "Project Code", "Purpose of Travel", "Hours", "Entry ID"]
+
+
+def get_template_path(template_filename):
+    """Resolves a template next to the executable when bundled, else next to this script."""
+    if getattr(sys, 'frozen', False):
+        base_path = os.path.dirname(sys.executable)
+    else:
+        base_path = os.path.dirname(os.path.realpath(__file__))
+    return os.path.join(base_path, template_filename)
+
+
+def month_range(first_month, last_month):
+    """Returns the first day of every month from first_month to last_month inclusive."""
+    months = []
+    current = first_month.replace(day=1)
+    while current <= last_month:
+        months.append(current)
+        current = (current + timedelta(days=32)).replace(day=1)
+    return months
+
+
+def build_trips(db, start_date_str, end_date_str, categories):
+    """
+    Groups the travel-category rows of a date range into trips. Rows belong to the
+    same trip when they share entry_id, date and project (an entry split at lunch
+    is one trip). Returns trips ordered by date and start time, each a dict with
+    date, start, end, project_code, description, hours and entry_id.
+    """
+    trips = {}
+    for _, task_date, start_time, end_time, project_code, description, _, entry_id in \
+            db.get_tasks_for_range_by_category(start_date_str, end_date_str, categories):
+        key = (entry_id, task_date, project_code)
+        hours = (datetime.strptime(end_time, '%H:%M:%S') - datetime.strptime(start_time, '%H:%M:%S')).total_seconds() / 3600
+        trip = trips.get(key)
+        if trip is None:
+            trips[key] = {
+                'date': task_date, 'start': start_time, 'end': end_time,
+                'project_code': project_code or "", 'description': description,
+                'hours': hours, 'entry_id': entry_id,
+            }
+        else:
+            trip['end'] = max(trip['end'], end_time)
+            trip['hours'] += hours
+    return sorted(trips.values(), key=lambda trip: (trip['date'], trip['start']))
+
+
+def render_claims_html(template_content, trips, name, designation, month_year):
+    rows_html_list = []
+    for number, trip in enumerate(trips, start=1):
+        trip_date = datetime.strptime(trip['date'], '%Y-%m-%d').strftime('%d/%m/%Y (%a)')
+        rows_html_list.append(
+            "<tr>"
+            f"<td>{number}</td>"
+            f"<td>{trip_date}</td>"
+            f"<td>{trip['start'][:5]} - {trip['end'][:5]}</td>"
+            f"<td>{html.escape(trip['project_code'])}</td>"
+            f'<td class="desc">{html.escape(trip["description"])}</td>'
+            f"<td>{trip['hours']:.2f}</td>"
+            "</tr>"
+        )
+    total_hours = sum(trip['hours'] for trip in trips)
+    return (template_content
+            .replace("{{name}}", html.escape(name))
+            .replace("{{designation}}", html.escape(designation))
+            .replace("{{month_year}}", month_year)
+            .replace("{{trip_count}}", str(len(trips)))
+            .replace("{{total_hours}}", f"{total_hours:.2f}")
+            .replace("{{table_rows}}", "\n".join(rows_html_list)))
+
+
+def write_claims_csv(path, trips):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADERS)
+        for trip in trips:
+            writer.writerow([trip['date'], trip['start'], trip['end'], trip['project_code'],
+                             trip['description'], f"{trip['hours']:.2f}", trip['entry_id']])
+
+
+def read_claims_template():
+    with open(get_template_path(CLAIMS_TEMPLATE), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def write_claims_month(db, month_start, output_dir, template_content, categories, name, designation):
+    """Writes Travel_Claims_YYYY-MM.html and .csv for one month into output_dir. Returns both paths."""
+    next_month = (month_start + timedelta(days=32)).replace(day=1)
+    trips = build_trips(db, month_start.strftime('%Y-%m-%d'),
+                        (next_month - timedelta(days=1)).strftime('%Y-%m-%d'), categories)
+    base_name = os.path.join(output_dir, f"Travel_Claims_{month_start.strftime('%Y-%m')}")
+    with open(f"{base_name}.html", 'w', encoding='utf-8') as f:
+        f.write(render_claims_html(template_content, trips, name, designation, month_start.strftime('%B %Y')))
+    write_claims_csv(f"{base_name}.csv", trips)
+    return [f"{base_name}.html", f"{base_name}.csv"]
+
+
+def generate_claims_reports(db, months, output_dir, categories, name, designation, progress_callback=None):
+    """
+    Writes Travel_Claims_YYYY-MM.html and .csv into output_dir for every month in
+    `months` (dates on the first of the month). Returns the written paths.
+    """
+    template_content = read_claims_template()
+
+    written = []
+    for index, month_start in enumerate(months):
+        written.extend(write_claims_month(db, month_start, output_dir, template_content, categories, name, designation))
+        if progress_callback:
+            progress_callback(index + 1, len(months))
+    return written
+
+
+class ClaimsReportWorker(QThread):
+    """Generates claims reports off the GUI thread. Reads go through the thread's own connection."""
+    progress = Signal(int, int)
+    succeeded = Signal(list)
+    failed = Signal(str)
+
+    def __init__(self, db, months, output_dir, categories, name, designation, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.months = months
+        self.output_dir = output_dir
+        self.categories = categories
+        self.name = name
+        self.designation = designation
+
+    def run(self):
+        try:
+            written = generate_claims_reports(self.db, self.months, self.output_dir, self.categories,
+                                              self.name, self.designation, self.progress.emit)
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.succeeded.emit(written)
+        finally:
+            self.db.release_thread_connection()
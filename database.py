@@ -1,16 +1,166 @@
 # database.py
 
+import json
+import os
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
+from pathlib import Path
+from html_text import html_to_plain_text
+
+def _free_gaps(start_time, end_time, busy_ranges):
+    """
+    Returns the sub-ranges of [start_time, end_time) not covered by any busy range.
+    Times are 'HH:MM:SS' strings, which order correctly as plain strings.
+    """
+    gaps = []
+    cursor = start_time
+    for busy_start, busy_end in sorted(busy_ranges):
+        if busy_end <= cursor:
+            continue
+        if busy_start >= end_time:
+            break
+        if cursor < busy_start:
+            gaps.append((cursor, busy_start))
+        cursor = max(cursor, busy_end)
+        if cursor >= end_time:
+            break
+    if cursor < end_time:
+        gaps.append((cursor, end_time))
+    return gaps
+
+def _time_to_seconds(time_str):
+    hours, minutes, seconds = time_str.split(':')
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+
+def _seconds_to_time(seconds):
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+def _take_slots(gaps, seconds):
+    """
+    Returns the earliest (start, end) slots from gaps that add up to `seconds`,
+    or None together with the total free time if the gaps are too short.
+    """
+    slots = []
+    remaining = seconds
+    for gap_start, gap_end in gaps:
+        if remaining <= 0:
+            break
+        start = _time_to_seconds(gap_start)
+        length = min(_time_to_seconds(gap_end) - start, remaining)
+        slots.append((gap_start, _seconds_to_time(start + length)))
+        remaining -= length
+    if remaining > 0:
+        return None, seconds - remaining
+    return slots, seconds
 
 class Database:
-    def __init__(self, db_name='task_tracker.db'):
-        self.conn = sqlite3.connect(db_name)
-        self.cursor = self.conn.cursor()
+    def __init__(self, db_name='task_tracker.db', overlap_guard=False):
+        self.db_name = db_name
+        # One writer connection shared by every thread and serialised by
+        # _write_lock; each thread reads through its own read-only connection.
+        self._write_lock = threading.RLock()
+        self._write_owner = None
+        self._local = threading.local()
+        self._readers = []
+        self._readers_lock = threading.Lock()
+        if db_name == ':memory:' or str(db_name).startswith('file:'):
+            # Nothing else can open this database, so reads use the writer.
+            self._reader_uri = None
+        else:
+            self._reader_uri = Path(os.path.abspath(db_name)).as_uri() + '?mode=ro'
+        self.conn = self._connect(db_name, check_same_thread=False)
+        if self._reader_uri:
+            # WAL lets the readers keep reading while a write is in progress.
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
         self.create_table()
+        self.set_overlap_guard(overlap_guard)
+
+    def _connect(self, target, **kwargs):
+        """Opens a connection configured the same way for the writer and every reader."""
+        conn = sqlite3.connect(target, timeout=10, **kwargs)
+        conn.create_function('plain_text', 1, html_to_plain_text, deterministic=True)
+        return conn
+
+    def _reader(self):
+        """
+        Returns the calling thread's read-only connection, opening it on first use.
+        A thread in the middle of a write reads through the writer instead, so it
+        sees its own uncommitted rows.
+        """
+        if self._reader_uri is None or self._write_owner == threading.get_ident():
+            return self.conn
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect(self._reader_uri, uri=True, check_same_thread=False)
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    def release_thread_connection(self):
+        """Closes the calling thread's reader. Worker threads call this before they exit."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._readers_lock:
+            self._readers.remove(conn)
+        conn.close()
+
+    def get_data_version(self):
+        """
+        Returns a token that changes whenever the database is written, by this
+        process's writer or by another process, for telling if cached views are stale.
+        """
+        return self.conn.total_changes, self._reader().execute('PRAGMA data_version').fetchone()[0]
+
+    def _fetchall(self, query, params=()):
+        return self._reader().execute(query, params).fetchall()
+
+    def _fetchone(self, query, params=()):
+        return self._reader().execute(query, params).fetchone()
+
+    def _execute_write(self, query, params=()):
+        """Runs a single write statement in its own transaction. Returns the row count."""
+        with self._write() as cursor:
+            cursor.execute(query, params)
+            return cursor.rowcount
+
+    @contextmanager
+    def _write(self):
+        """
+        Runs the enclosed statements on the writer connection in one BEGIN IMMEDIATE
+        transaction while holding the write lock. Commits on success, rolls back on
+        error. Nested use joins the enclosing transaction.
+        """
+        with self._write_lock:
+            if self._write_owner == threading.get_ident():
+                yield self.conn.cursor()
+                return
+            if self.conn.in_transaction:
+                self.conn.commit()
+            self.conn.execute('BEGIN IMMEDIATE')
+            self._write_owner = threading.get_ident()
+            try:
+                yield self.conn.cursor()
+            except BaseException:
+                self.conn.rollback()
+                raise
+            else:
+                self.conn.commit()
+            finally:
+                self._write_owner = None
 
     def create_table(self):
-        self.cursor.execute('''
+        with self._write() as cursor:
+            self._create_schema(cursor)
+
+    def _create_schema(self, cursor):
+        cursor.execute('''
             CREATE TABLE IF NOT EXISTS tasks (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 task_date TEXT NOT NULL,
@@ -24,7 +174,7 @@ class Database:
                 merged_description TEXT
             )
         ''')
-        self.cursor.execute('''
+        cursor.execute('''
             CREATE TABLE IF NOT EXISTS daily_work_times (
                 date TEXT PRIMARY KEY,
                 effective_start_time TEXT NOT NULL,
@@ -37,13 +187,13 @@ class Database:
                 holidays TEXT NOT NULL
             )
         ''')
-        self.cursor.execute('''
+        cursor.execute('''
             CREATE TABLE IF NOT EXISTS app_settings (
                 key TEXT PRIMARY KEY,
                 value TEXT NOT NULL
             )
         ''')
-        self.cursor.execute('''
+        cursor.execute('''
             CREATE TABLE IF NOT EXISTS qa83_progress (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 month_year TEXT NOT NULL,
@@ -55,47 +205,390 @@ class Database:
             )
         ''')
         try:
-            self.cursor.execute('ALTER TABLE qa83_progress ADD COLUMN start_progress TEXT')
+            cursor.execute('ALTER TABLE qa83_progress ADD COLUMN start_progress TEXT')
         except sqlite3.OperationalError:
             # Column likely already exists, which is fine.
             pass
-        self.cursor.execute('''
+        cursor.execute('''
             CREATE TABLE IF NOT EXISTS project_titles (
                 project_code TEXT PRIMARY KEY,
                 project_title TEXT NOT NULL
             )
         ''')
-        self.conn.commit()
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_date_start ON tasks (task_date, start_time)')
+        self._create_project_registry(cursor)
+        self._create_entry_ids(cursor)
+        self._create_qa83_groups(cursor)
+        self._create_qa83_versions(cursor)
+
+    def _create_project_registry(self, cursor):
+        """
+        Creates the projects table that tasks reference through project_id, and the
+        triggers that keep each project's usage stats current on every write.
+        Tasks keep their project_code text so existing readers are unaffected.
+        """
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS projects (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                code TEXT NOT NULL UNIQUE,
+                title TEXT,
+                first_used TEXT,
+                last_used TEXT,
+                entry_count INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        try:
+            cursor.execute('ALTER TABLE tasks ADD COLUMN project_id INTEGER REFERENCES projects(id)')
+        except sqlite3.OperationalError:
+            # Column likely already exists, which is fine.
+            pass
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_project ON tasks (project_id, task_date)')
+
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS tasks_project_insert
+            AFTER INSERT ON tasks
+            WHEN NEW.project_code IS NOT NULL
+            BEGIN
+                INSERT OR IGNORE INTO projects (code) VALUES (NEW.project_code);
+                UPDATE projects
+                SET entry_count = entry_count + 1,
+                    first_used = MIN(COALESCE(first_used, NEW.task_date), NEW.task_date),
+                    last_used = MAX(COALESCE(last_used, NEW.task_date), NEW.task_date)
+                WHERE code = NEW.project_code;
+                UPDATE tasks SET project_id = (SELECT id FROM projects WHERE code = NEW.project_code)
+                WHERE id = NEW.id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS tasks_project_delete
+            AFTER DELETE ON tasks
+            WHEN OLD.project_id IS NOT NULL
+            BEGIN
+                UPDATE projects
+                SET entry_count = entry_count - 1,
+                    first_used = (SELECT MIN(task_date) FROM tasks WHERE project_id = OLD.project_id),
+                    last_used = (SELECT MAX(task_date) FROM tasks WHERE project_id = OLD.project_id)
+                WHERE id = OLD.project_id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS tasks_project_update
+            AFTER UPDATE OF project_code, task_date ON tasks
+            WHEN OLD.project_code IS NOT NEW.project_code OR OLD.task_date IS NOT NEW.task_date
+            BEGIN
+                UPDATE projects SET entry_count = entry_count - 1 WHERE id = OLD.project_id;
+                INSERT OR IGNORE INTO projects (code)
+                SELECT NEW.project_code WHERE NEW.project_code IS NOT NULL;
+                UPDATE tasks SET project_id = (SELECT id FROM projects WHERE code = NEW.project_code)
+                WHERE id = NEW.id;
+                UPDATE projects SET entry_count = entry_count + 1 WHERE code = NEW.project_code;
+                UPDATE projects
+                SET first_used = (SELECT MIN(task_date) FROM tasks WHERE project_id = projects.id),
+                    last_used = (SELECT MAX(task_date) FROM tasks WHERE project_id = projects.id)
+                WHERE id = OLD.project_id OR code = NEW.project_code;
+            END
+        ''')
+
+        # One-off migration for rows written before the registry existed.
+        cursor.execute('SELECT 1 FROM tasks WHERE project_id IS NULL AND project_code IS NOT NULL LIMIT 1')
+        if cursor.fetchone():
+            cursor.execute('''
+                INSERT OR IGNORE INTO projects (code)
+                SELECT DISTINCT project_code FROM tasks WHERE project_code IS NOT NULL
+            ''')
+            cursor.execute('''
+                UPDATE tasks SET project_id = (SELECT id FROM projects WHERE code = tasks.project_code)
+                WHERE project_id IS NULL AND project_code IS NOT NULL
+            ''')
+            cursor.execute('''
+                UPDATE projects
+                SET entry_count = (SELECT COUNT(*) FROM tasks WHERE project_id = projects.id),
+                    first_used = (SELECT MIN(task_date) FROM tasks WHERE project_id = projects.id),
+                    last_used = (SELECT MAX(task_date) FROM tasks WHERE project_id = projects.id)
+            ''')
+        # Titles used to live in project_titles; carry over any not yet copied.
+        cursor.execute('''
+            INSERT INTO projects (code, title)
+            SELECT project_code, project_title FROM project_titles WHERE true
+            ON CONFLICT(code) DO UPDATE SET title = excluded.title WHERE projects.title IS NULL
+        ''')
+
+    def _create_entry_ids(self, cursor):
+        """
+        Adds the entry_id column that ties together all rows written by one
+        "Log Task" action (an entry split at lunch or around other tasks).
+        An entry's id is the id of its lowest remaining row.
+        """
+        try:
+            cursor.execute('ALTER TABLE tasks ADD COLUMN entry_id INTEGER')
+        except sqlite3.OperationalError:
+            # Column likely already exists, which is fine.
+            pass
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_entry ON tasks (entry_id)')
+        # Rows inserted without an entry id form an entry of their own.
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS tasks_entry_default
+            AFTER INSERT ON tasks
+            WHEN NEW.entry_id IS NULL
+            BEGIN
+                UPDATE tasks SET entry_id = NEW.id WHERE id = NEW.id;
+            END
+        ''')
+        # Deleting an entry's first row hands the entry id on to the next row.
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS tasks_entry_reassign
+            AFTER DELETE ON tasks
+            WHEN OLD.entry_id = OLD.id
+            BEGIN
+                UPDATE tasks SET entry_id = (SELECT MIN(id) FROM tasks WHERE entry_id = OLD.id)
+                WHERE entry_id = OLD.id;
+            END
+        ''')
+        # Rows logged before entry ids existed were split pieces sharing the same
+        # date, project and description, so group them that way once.
+        cursor.execute('''
+            UPDATE tasks SET entry_id = (
+                SELECT MIN(t2.id) FROM tasks t2
+                WHERE t2.task_date = tasks.task_date
+                  AND t2.project_code IS tasks.project_code
+                  AND t2.description IS tasks.description
+            )
+            WHERE entry_id IS NULL
+        ''')
+
+    def _create_qa83_groups(self, cursor):
+        """
+        Creates qa83_groups, one row per QA83 group and month with the group's master,
+        project, earliest start, member count and hours per week of the month, and the
+        triggers that recompute the groups a task belongs to or leads on every write.
+        A group is a merge master's tasks, or else the pieces of one entry. The QA83
+        categories are read from the 'qa83_categories' setting (a JSON list).
+        """
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS qa83_groups (
+                group_id INTEGER NOT NULL,
+                month_year TEXT NOT NULL,
+                project_code TEXT,
+                description TEXT,
+                display_description TEXT,
+                earliest_start TEXT NOT NULL,
+                member_count INTEGER NOT NULL,
+                merged INTEGER NOT NULL,
+                week1 REAL NOT NULL, week2 REAL NOT NULL, week3 REAL NOT NULL,
+                week4 REAL NOT NULL, week5 REAL NOT NULL, week6 REAL NOT NULL,
+                total_hours REAL NOT NULL,
+                PRIMARY KEY (group_id, month_year)
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_qa83_groups_month ON qa83_groups (month_year, project_code, earliest_start)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_group ON tasks (COALESCE(master_task_id, entry_id))')
+        # Earlier versions only joined a task to a master in the same month, which
+        # dropped merged tasks moved to another month; replace that view and rebuild.
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'view' AND name = 'qa83_group_source'")
+        existing = cursor.fetchone()
+        outdated = existing is not None and 'substr(m.task_date' in existing[0]
+        if outdated:
+            cursor.execute('DROP VIEW qa83_group_source')
+        # Weeks run Monday to Sunday and are numbered from the week holding the 1st.
+        # A group is counted in each month its tasks fall in; project and description
+        # come from the master, whichever month that is in.
+        cursor.execute('''
+            CREATE VIEW IF NOT EXISTS qa83_group_source AS
+            SELECT COALESCE(t.master_task_id, t.entry_id) AS group_id,
+                   substr(t.task_date, 1, 7) AS month_year,
+                   m.project_code, m.description,
+                   COALESCE(NULLIF(m.merged_description, ''), m.description),
+                   MIN(t.task_date || ' ' || t.start_time), COUNT(*), MAX(t.master_task_id IS NOT NULL),
+                   TOTAL(CASE WHEN t.week = 0 THEN t.seconds END) / 3600.0,
+                   TOTAL(CASE WHEN t.week = 1 THEN t.seconds END) / 3600.0,
+                   TOTAL(CASE WHEN t.week = 2 THEN t.seconds END) / 3600.0,
+                   TOTAL(CASE WHEN t.week = 3 THEN t.seconds END) / 3600.0,
+                   TOTAL(CASE WHEN t.week = 4 THEN t.seconds END) / 3600.0,
+                   TOTAL(CASE WHEN t.week = 5 THEN t.seconds END) / 3600.0,
+                   TOTAL(t.seconds) / 3600.0
+            FROM (
+                SELECT *,
+                       (CAST(substr(task_date, 9, 2) AS INTEGER) - 1
+                        + (strftime('%w', substr(task_date, 1, 8) || '01') + 6) % 7) / 7 AS week,
+                       strftime('%s', end_time) - strftime('%s', start_time) AS seconds
+                FROM tasks
+            ) t
+            JOIN tasks m ON m.id = COALESCE(t.master_task_id, t.entry_id)
+            WHERE EXISTS (
+                SELECT 1 FROM json_each((SELECT value FROM app_settings WHERE key = 'qa83_categories')) c
+                WHERE instr(',' || t.categories || ',', ',' || c.value || ',') > 0
+            )
+            GROUP BY 1, 2
+        ''')
+        if outdated:
+            cursor.execute('DELETE FROM qa83_groups')
+            cursor.execute('INSERT INTO qa83_groups SELECT * FROM qa83_group_source')
+        # The triggers recompute every month of the groups a write touches, so a task
+        # moved to another month leaves its old month's group and joins the new one.
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS tasks_qa83_insert
+            AFTER INSERT ON tasks
+            BEGIN
+                DELETE FROM qa83_groups WHERE group_id = COALESCE(NEW.master_task_id, NEW.entry_id);
+                INSERT INTO qa83_groups
+                SELECT * FROM qa83_group_source WHERE group_id = COALESCE(NEW.master_task_id, NEW.entry_id);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS tasks_qa83_update
+            AFTER UPDATE OF task_date, start_time, end_time, project_code, description, categories,
+                            master_task_id, merged_description, entry_id ON tasks
+            BEGIN
+                DELETE FROM qa83_groups WHERE group_id IN
+                    (COALESCE(OLD.master_task_id, OLD.entry_id), COALESCE(NEW.master_task_id, NEW.entry_id), NEW.id);
+                INSERT INTO qa83_groups
+                SELECT * FROM qa83_group_source WHERE group_id IN
+                    (COALESCE(OLD.master_task_id, OLD.entry_id), COALESCE(NEW.master_task_id, NEW.entry_id), NEW.id);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS tasks_qa83_delete
+            AFTER DELETE ON tasks
+            BEGIN
+                DELETE FROM qa83_groups WHERE group_id IN (COALESCE(OLD.master_task_id, OLD.entry_id), OLD.id);
+                INSERT INTO qa83_groups
+                SELECT * FROM qa83_group_source WHERE group_id IN (COALESCE(OLD.master_task_id, OLD.entry_id), OLD.id);
+            END
+        ''')
+
+    def _create_qa83_versions(self, cursor):
+        """
+        Creates qa83_month_versions, a token per month that changes whenever anything
+        its QA83 report shows changes: the month's groups, the titles of their
+        projects, or progress stored for the month or an earlier one (start progress
+        carries over). Tokens are random rather than counted, so restoring an older
+        database never brings back a token that meant other data.
+        """
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS qa83_month_versions (
+                month_year TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            )
+        ''')
+        # Lets a progress write find the later months showing the same group.
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_qa83_groups_key ON qa83_groups (project_code, description, month_year)')
+        bump = '''
+            INSERT INTO qa83_month_versions (month_year, version) {months}
+            ON CONFLICT(month_year) DO UPDATE SET version = excluded.version;
+        '''
+        # The rows each event changes: an update changes both the old and the new row.
+        for event, rows in (('INSERT', ('NEW',)), ('DELETE', ('OLD',)), ('UPDATE', ('OLD', 'NEW'))):
+            group_bumps = "".join(bump.format(months=f"VALUES ({row}.month_year, random())") for row in rows)
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS qa83_groups_version_{event.lower()}
+                AFTER {event} ON qa83_groups
+                BEGIN {group_bumps} END
+            ''')
+            progress_bumps = "".join(bump.format(months=f'''
+                SELECT month_year, random() FROM qa83_groups
+                WHERE project_code = {row}.project_code AND description = {row}.description
+                  AND month_year >= {row}.month_year
+                GROUP BY month_year''') for row in rows)
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS qa83_progress_version_{event.lower()}
+                AFTER {event} ON qa83_progress
+                BEGIN {progress_bumps} END
+            ''')
+        title_bump = bump.format(months='''
+            SELECT month_year, random() FROM qa83_groups WHERE project_code = NEW.code GROUP BY month_year''')
+        for name, event in (('insert', 'INSERT'), ('update', 'UPDATE OF title')):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS projects_qa83_version_{name}
+                AFTER {event} ON projects
+                BEGIN {title_bump} END
+            ''')
+
+    def set_overlap_guard(self, enabled):
+        """
+        Installs (or removes) triggers that reject any insert or time change that
+        would make two tasks on the same date overlap. This protects the table
+        even from writers that bypass the checked methods below.
+        """
+        with self._write() as cursor:
+            if enabled:
+                cursor.execute('''
+                    CREATE TRIGGER IF NOT EXISTS tasks_no_overlap_insert
+                    BEFORE INSERT ON tasks
+                    WHEN EXISTS (
+                        SELECT 1 FROM tasks
+                        WHERE task_date = NEW.task_date
+                          AND start_time < NEW.end_time AND end_time > NEW.start_time
+                    )
+                    BEGIN
+                        SELECT RAISE(ABORT, 'task overlaps an existing task');
+                    END
+                ''')
+                cursor.execute('''
+                    CREATE TRIGGER IF NOT EXISTS tasks_no_overlap_update
+                    BEFORE UPDATE OF task_date, start_time, end_time ON tasks
+                    WHEN EXISTS (
+                        SELECT 1 FROM tasks
+                        WHERE task_date = NEW.task_date AND id != NEW.id
+                          AND start_time < NEW.end_time AND end_time > NEW.start_time
+                    )
+                    BEGIN
+                        SELECT RAISE(ABORT, 'task overlaps an existing task');
+                    END
+                ''')
+            else:
+                cursor.execute('DROP TRIGGER IF EXISTS tasks_no_overlap_insert')
+                cursor.execute('DROP TRIGGER IF EXISTS tasks_no_overlap_update')
 
     def begin_transaction(self):
+        self._write_lock.acquire()
         self.conn.execute('BEGIN TRANSACTION')
+        self._write_owner = threading.get_ident()
 
     def commit_transaction(self):
         self.conn.commit()
+        self._write_owner = None
+        self._write_lock.release()
 
     def rollback_transaction(self):
         self.conn.rollback()
+        self._write_owner = None
+        self._write_lock.release()
+
+    @contextmanager
+    def immediate_transaction(self):
+        """
+        Runs the enclosed statements in a BEGIN IMMEDIATE transaction. The write
+        lock is taken up front, so no other writer can change the data between
+        our reads and our writes. Commits on success, rolls back on error.
+        """
+        with self._write() as cursor:
+            yield cursor
+
+    def backup_to(self, path):
+        """Writes a consistent copy of the database to path with SQLite's online backup."""
+        target = sqlite3.connect(path)
+        try:
+            self._reader().backup(target)
+        finally:
+            target.close()
 
     def set_effective_start_time(self, date_str, new_start_time_str):
         """Updates the effective_start_time for a given date. Returns row count."""
-        self.cursor.execute('''
+        return self._execute_write('''
             UPDATE daily_work_times SET effective_start_time = ? WHERE date = ?
         ''', (new_start_time_str, date_str))
-        self.conn.commit()
-        return self.cursor.rowcount
 
     def update_task_categories(self, task_id, new_categories_str):
         """Updates the categories for a specific task."""
-        self.cursor.execute('UPDATE tasks SET categories = ? WHERE id = ?', (new_categories_str, task_id))
-        self.conn.commit()
+        self._execute_write('UPDATE tasks SET categories = ? WHERE id = ?', (new_categories_str, task_id))
 
     def get_task_ids_for_master(self, master_id, month_year_str):
         """Gets all task IDs (including the master) associated with a master task for a given month."""
-        self.cursor.execute('''
+        rows = self._fetchall('''
             SELECT id FROM tasks 
             WHERE (id = ? OR master_task_id = ?) AND strftime('%Y-%m', task_date) = ?
         ''', (master_id, master_id, month_year_str))
-        return [row[0] for row in self.cursor.fetchall()]
+        return [row[0] for row in rows]
 
     def clear_master_for_tasks(self, task_ids):
         """Resets the master_task_id and merged_description for a list of tasks."""
@@ -106,19 +599,17 @@ class Database:
         # Also clear the merged_description from the master task itself
         query_desc = f"UPDATE tasks SET merged_description = NULL WHERE id IN ({placeholders})"
         params = task_ids
-        self.cursor.execute(query_master, params)
-        self.cursor.execute(query_desc, params)
-        self.conn.commit()
+        with self._write() as cursor:
+            cursor.execute(query_master, params)
+            cursor.execute(query_desc, params)
     
     def get_tasks_for_master_group(self, master_id):
         """Retrieves all tasks (master and children) belonging to a merged group."""
-        self.cursor.execute('SELECT * FROM tasks WHERE id = ? OR master_task_id = ?', (master_id, master_id))
-        return self.cursor.fetchall()
+        return self._fetchall('SELECT * FROM tasks WHERE id = ? OR master_task_id = ?', (master_id, master_id))
 
     def get_child_task_ids(self, master_id):
         """Retrieves the IDs of all child tasks for a given master task ID."""
-        self.cursor.execute('SELECT id FROM tasks WHERE master_task_id = ?', (master_id,))
-        return [row[0] for row in self.cursor.fetchall()]
+        return [row[0] for row in self._fetchall('SELECT id FROM tasks WHERE master_task_id = ?', (master_id,))]
 
     def unmerge_specific_tasks(self, task_ids):
         """Sets the master_task_id to NULL for a specific list of task IDs."""
@@ -126,30 +617,203 @@ class Database:
             return
         placeholders = ','.join('?' for _ in task_ids)
         query = f"UPDATE tasks SET master_task_id = NULL WHERE id IN ({placeholders})"
-        self.cursor.execute(query, task_ids)
-        self.conn.commit()
+        self._execute_write(query, task_ids)
 
     def get_project_title(self, project_code):
         """Retrieves the project title for a given project code."""
-        self.cursor.execute('SELECT project_title FROM project_titles WHERE project_code = ?', (project_code,))
-        result = self.cursor.fetchone()
+        result = self._fetchone('SELECT title FROM projects WHERE code = ?', (project_code,))
         return result[0] if result else None
 
     def set_project_title(self, project_code, project_title):
         """Inserts or updates a project title."""
-        self.cursor.execute('INSERT OR REPLACE INTO project_titles (project_code, project_title) VALUES (?, ?)', (project_code, project_title))
-        self.conn.commit()
+        self.set_project_titles({project_code: project_title})
+
+    def set_project_titles(self, titles):
+        """Inserts or updates many project titles ({code: title}) in one transaction."""
+        if not titles:
+            return
+        with self.immediate_transaction() as cursor:
+            cursor.executemany('''
+                INSERT INTO projects (code, title) VALUES (?, ?)
+                ON CONFLICT(code) DO UPDATE SET title = excluded.title
+            ''', list(titles.items()))
+
+    def get_project_titles(self, project_codes):
+        """Returns {code: title} for the given codes in a single query. Untitled codes map to None."""
+        project_codes = list(project_codes)
+        if not project_codes:
+            return {}
+        placeholders = ','.join('?' for _ in project_codes)
+        titles = {code: None for code in project_codes}
+        titles.update(self._fetchall(f'SELECT code, title FROM projects WHERE code IN ({placeholders})', project_codes))
+        return titles
+
+    def get_projects(self):
+        """Retrieves (code, title, first_used, last_used, entry_count) for every known project, most recently used first."""
+        return self._fetchall('''
+            SELECT code, title, first_used, last_used, entry_count FROM projects
+            ORDER BY last_used IS NULL, last_used DESC, code
+        ''')
 
     def add_task(self, task_date, start_time, end_time, project_code, description, categories, software):
-        self.cursor.execute('''
+        self._execute_write('''
             INSERT INTO tasks (task_date, start_time, end_time, project_code, description, categories, software)
             VALUES (?, ?, ?, ?, ?, ?, ?)
         ''', (task_date, start_time, end_time, project_code, description, categories, software))
-        self.conn.commit()
+
+    def add_task_in_free_time(self, task_date, start_time, end_time, project_code, description,
+                              categories, software, excluded_ranges=()):
+        """
+        Logs a task over [start_time, end_time), writing one row for every part of
+        the interval not already taken by another task or by an excluded range
+        (e.g. the lunch hour). All rows share one entry_id. The overlap read, gap
+        computation and inserts happen in one IMMEDIATE transaction. Returns the
+        number of rows written; 0 means the time is fully occupied.
+        """
+        if start_time >= end_time:
+            return 0
+        try:
+            with self.immediate_transaction() as cursor:
+                cursor.execute('''
+                    SELECT start_time, end_time FROM tasks
+                    WHERE task_date = ? AND start_time < ? AND end_time > ?
+                ''', (task_date, end_time, start_time))
+                gaps = _free_gaps(start_time, end_time, cursor.fetchall() + list(excluded_ranges))
+                self._insert_entry(cursor, task_date, gaps, project_code, description, categories, software)
+        except sqlite3.IntegrityError:
+            # The overlap guard rejected a row; nothing was written.
+            return 0
+        return len(gaps)
+
+    def _insert_entry(self, cursor, task_date, slots, project_code, description, categories, software):
+        """Inserts one row per (start, end) slot, all stamped with the first row's id as entry_id."""
+        if not slots:
+            return None
+        (first_start, first_end), *other_slots = slots
+        cursor.execute('''
+            INSERT INTO tasks (task_date, start_time, end_time, project_code, description, categories, software)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (task_date, first_start, first_end, project_code, description, categories, software))
+        entry_id = cursor.lastrowid
+        cursor.executemany('''
+            INSERT INTO tasks (task_date, start_time, end_time, project_code, description, categories, software, entry_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [(task_date, slot_start, slot_end, project_code, description, categories, software, entry_id)
+              for slot_start, slot_end in other_slots])
+        return entry_id
+
+    def apply_timesheet_changes(self, changes, description, categories=''):
+        """
+        Applies a batch of hour changes typed into the timesheet grid in one
+        IMMEDIATE transaction. Each change is
+            (task_date, project_code, delta_seconds, (window_start, window_end), excluded_ranges).
+        Added time goes into the earliest free slots of the work window, skipping
+        excluded ranges (lunch) and existing tasks, as one entry per project and day.
+        Removed time is trimmed from that project's latest rows on the day.
+        Returns a list of (task_date, project_code, free_hours) for additions that
+        did not fit; when it is not empty nothing has been written.
+        """
+        changes_by_date = {}
+        for change in changes:
+            changes_by_date.setdefault(change[0], []).append(change)
+
+        shortfalls, deletes, updates, inserts = [], [], [], []
+        with self.immediate_transaction() as cursor:
+            for task_date, day_changes in sorted(changes_by_date.items()):
+                cursor.execute('''
+                    SELECT id, start_time, end_time, project_code FROM tasks
+                    WHERE task_date = ? ORDER BY start_time
+                ''', (task_date,))
+                day_rows = cursor.fetchall()
+                busy = {row[0]: (row[1], row[2]) for row in day_rows}
+
+                # Reductions first, so time they free can be reused on the same day.
+                for _, project_code, delta_seconds, window, excluded_ranges in sorted(day_changes, key=lambda c: c[2]):
+                    if delta_seconds < 0:
+                        remaining = -delta_seconds
+                        for task_id, start_time, end_time, row_code in reversed(day_rows):
+                            if remaining <= 0:
+                                break
+                            if row_code != project_code:
+                                continue
+                            duration = _time_to_seconds(end_time) - _time_to_seconds(start_time)
+                            if duration <= remaining:
+                                deletes.append((task_id,))
+                                del busy[task_id]
+                                remaining -= duration
+                            else:
+                                new_end = _seconds_to_time(_time_to_seconds(end_time) - remaining)
+                                updates.append((new_end, task_id))
+                                busy[task_id] = (start_time, new_end)
+                                remaining = 0
+                    elif delta_seconds > 0:
+                        window_start, window_end = window
+                        gaps = _free_gaps(window_start, window_end, list(busy.values()) + list(excluded_ranges))
+                        slots, available = _take_slots(gaps, delta_seconds)
+                        if slots is None:
+                            shortfalls.append((task_date, project_code, available / 3600))
+                            continue
+                        inserts.append((task_date, slots, project_code))
+                        for slot_number, slot in enumerate(slots):
+                            busy[(len(inserts), slot_number)] = slot
+
+            if shortfalls:
+                return shortfalls
+            # As when a task is deleted by hand, tasks merged into a deleted master are unmerged first.
+            cursor.executemany('UPDATE tasks SET master_task_id = NULL, merged_description = NULL WHERE master_task_id = ?', deletes)
+            cursor.executemany('DELETE FROM tasks WHERE id = ?', deletes)
+            cursor.executemany('UPDATE tasks SET end_time = ? WHERE id = ?', updates)
+            for task_date, slots, project_code in inserts:
+                self._insert_entry(cursor, task_date, slots, project_code, description, categories, '')
+        return []
+
+    def get_entry_part_count(self, task_id):
+        """Returns how many rows belong to the same logical entry as the given task."""
+        return self._fetchone('''
+            SELECT COUNT(*) FROM tasks WHERE entry_id = (SELECT entry_id FROM tasks WHERE id = ?)
+        ''', (task_id,))[0]
+
+    def update_task_if_free(self, task_id, task_date, data, apply_to_entry=False):
+        """
+        Updates a task after checking, in the same IMMEDIATE transaction, that its
+        new time does not overlap any other task on task_date. With apply_to_entry,
+        the project, description and categories are also copied to every other
+        piece of the same entry. Returns True if updated, False if the time is taken.
+        """
+        try:
+            with self.immediate_transaction() as cursor:
+                cursor.execute('''
+                    SELECT 1 FROM tasks
+                    WHERE task_date = ? AND id != ? AND start_time < ? AND end_time > ?
+                    LIMIT 1
+                ''', (task_date, task_id, data['end_time'], data['start_time']))
+                if cursor.fetchone():
+                    return False
+                cursor.execute('''
+                    UPDATE tasks 
+                    SET start_time = ?, end_time = ?, project_code = ?, 
+                        description = ?, categories = ?, software = ?
+                    WHERE id = ?
+                ''', (
+                    data['start_time'], data['end_time'], data['project_code'],
+                    data['description'], data['categories'], data['software'],
+                    task_id
+                ))
+                if apply_to_entry:
+                    cursor.execute('''
+                        UPDATE tasks
+                        SET project_code = ?, description = ?, categories = ?, software = ?
+                        WHERE entry_id = (SELECT entry_id FROM tasks WHERE id = ?) AND id != ?
+                    ''', (
+                        data['project_code'], data['description'], data['categories'],
+                        data['software'], task_id, task_id
+                    ))
+        except sqlite3.IntegrityError:
+            return False
+        return True
 
     def get_last_task(self):
-        self.cursor.execute('SELECT * FROM tasks ORDER BY id DESC LIMIT 1')
-        return self.cursor.fetchone()
+        return self._fetchone('SELECT * FROM tasks ORDER BY id DESC LIMIT 1')
 
     def get_task_before(self, before_datetime):
         """
@@ -158,36 +822,39 @@ class Database:
         before_date_str = before_datetime.strftime('%Y-%m-%d')
         before_time_str = before_datetime.strftime('%H:%M:%S')
         
-        self.cursor.execute('''
+        return self._fetchone('''
             SELECT * FROM tasks 
             WHERE task_date < ? OR (task_date = ? AND start_time < ?)
             ORDER BY task_date DESC, start_time DESC 
             LIMIT 1
         ''', (before_date_str, before_date_str, before_time_str))
-        return self.cursor.fetchone()
 
     def get_unique_project_codes(self):
         """Retrieves a sorted list of unique project codes from the tasks table."""
-        self.cursor.execute('SELECT DISTINCT project_code FROM tasks WHERE project_code IS NOT NULL ORDER BY project_code')
-        return [row[0] for row in self.cursor.fetchall()]
+        return [row[0] for row in self._fetchall('SELECT code FROM projects WHERE entry_count > 0 ORDER BY code')]
 
     def get_unique_descriptions_for_project(self, project_code):
         """Retrieves a list of unique, non-empty HTML descriptions for a given project code."""
         if not project_code:
             return []
-        self.cursor.execute('SELECT DISTINCT description FROM tasks WHERE project_code = ? AND description IS NOT NULL AND TRIM(description) != ""', (project_code,))
-        return [row[0] for row in self.cursor.fetchall()]
+        return [row[0] for row in self._fetchall('SELECT DISTINCT description FROM tasks WHERE project_code = ? AND description IS NOT NULL AND TRIM(description) != ""', (project_code,))]
 
     def get_tasks_for_date(self, date_str):
-        self.cursor.execute('SELECT id, task_date, start_time, end_time, project_code, description, categories, software, master_task_id FROM tasks WHERE task_date = ? ORDER BY start_time', (date_str,))
-        return self.cursor.fetchall()
+        return self._fetchall('SELECT id, task_date, start_time, end_time, project_code, description, categories, software, master_task_id, entry_id FROM tasks WHERE task_date = ? ORDER BY start_time', (date_str,))
+
+    def get_tasks_for_range(self, start_date_str, end_date_str):
+        """Returns {date: tasks} for a date range, each day's tasks as get_tasks_for_date returns them."""
+        rows = self._fetchall('SELECT id, task_date, start_time, end_time, project_code, description, categories, software, master_task_id, entry_id FROM tasks WHERE task_date BETWEEN ? AND ? ORDER BY task_date, start_time', (start_date_str, end_date_str))
+        tasks_by_date = {}
+        for row in rows:
+            tasks_by_date.setdefault(row[1], []).append(row)
+        return tasks_by_date
     
     def delete_task_by_id(self, task_id):
-        self.cursor.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
-        self.conn.commit()
+        self._execute_write('DELETE FROM tasks WHERE id = ?', (task_id,))
 
     def update_task_by_id(self, task_id, data):
-        self.cursor.execute('''
+        self._execute_write('''
             UPDATE tasks 
             SET start_time = ?, end_time = ?, project_code = ?, 
                 description = ?, categories = ?, software = ?
@@ -197,10 +864,9 @@ class Database:
             data['description'], data['categories'], data['software'],
             task_id
         ))
-        self.conn.commit()
 
     def add_work_times(self, date_str, effective_start_time_str, settings):
-        self.cursor.execute('''
+        self._execute_write('''
             INSERT OR REPLACE INTO daily_work_times (date, effective_start_time, work_start_lower, 
                                           work_start_upper, daily_working_hours, 
                                           lunch_start, lunch_end, working_days, holidays)
@@ -211,20 +877,121 @@ class Database:
               settings['daily_working_hours'],
               settings['lunch_start'], settings['lunch_end'],
               ",".join(settings['working_days']), ",".join(settings['holidays'])))
-        self.conn.commit()
 
     def get_work_times_for_date(self, date_str):
-        self.cursor.execute('SELECT * FROM daily_work_times WHERE date = ?', (date_str,))
-        return self.cursor.fetchone()
+        return self._fetchone('SELECT * FROM daily_work_times WHERE date = ?', (date_str,))
+
+    def get_project_hours_for_range(self, start_date_str, end_date_str):
+        """Returns (task_date, project_code, hours) summed per day and project over a date range."""
+        return self._fetchall('''
+            SELECT task_date, project_code,
+                   SUM(strftime('%s', end_time) - strftime('%s', start_time)) / 3600.0
+            FROM tasks
+            WHERE task_date BETWEEN ? AND ?
+            GROUP BY task_date, project_code
+        ''', (start_date_str, end_date_str))
+
+    def get_entries_for_range_by_category(self, start_date_str, end_date_str, categories_list):
+        """
+        Returns the first row of every entry in a date range that has any of the given
+        categories, as (id, task_date, start_time, end_time, project_code,
+        description, categories, entry_id), ordered by date and time.
+        """
+        if not categories_list:
+            return []
+        where_clauses, category_params = self._category_filter(categories_list)
+        query = f'''
+            SELECT id, task_date, start_time, end_time, project_code,
+                   description, categories, entry_id
+            FROM (
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY entry_id ORDER BY task_date, start_time) AS part
+                FROM tasks
+                WHERE task_date BETWEEN ? AND ? AND ({where_clauses})
+            )
+            WHERE part = 1
+            ORDER BY task_date, start_time
+        '''
+        return self._fetchall(query, [start_date_str, end_date_str] + category_params)
+
+    def get_tasks_for_range_by_category(self, start_date_str, end_date_str, categories_list):
+        """
+        Returns every row in a date range that has any of the given categories, as
+        (id, task_date, start_time, end_time, project_code, plain-text description,
+        categories, entry_id), ordered by date and time.
+        """
+        if not categories_list:
+            return []
+        where_clauses, category_params = self._category_filter(categories_list)
+        query = f'''
+            SELECT id, task_date, start_time, end_time, project_code,
+                   plain_text(description), categories, entry_id
+            FROM tasks
+            WHERE task_date BETWEEN ? AND ? AND ({where_clauses})
+            ORDER BY task_date, start_time
+        '''
+        return self._fetchall(query, [start_date_str, end_date_str] + category_params)
+
+    def _category_filter(self, categories_list):
+        """Returns (sql, params) matching rows whose comma-separated categories contain any of the given ones."""
+        where_clauses = " OR ".join(["',' || categories || ',' LIKE ?"] * len(categories_list))
+        return where_clauses, [f'%,{cat.strip()},%' for cat in categories_list]
+
+    def get_work_times_for_range(self, start_date_str, end_date_str):
+        """Returns {date: daily_work_times row} for the days in a range that have work times stored."""
+        rows = self._fetchall('SELECT * FROM daily_work_times WHERE date BETWEEN ? AND ?', (start_date_str, end_date_str))
+        return {row[0]: row for row in rows}
+
+    def get_first_start_times_for_range(self, start_date_str, end_date_str):
+        """Returns {task_date: earliest start_time} for the days in a range that have tasks."""
+        return dict(self._fetchall(
+            'SELECT task_date, MIN(start_time) FROM tasks WHERE task_date BETWEEN ? AND ? GROUP BY task_date',
+            (start_date_str, end_date_str)
+        ))
+
+    def get_working_hours_for_range(self, start_date_str, end_date_str):
+        """Returns {date: daily_working_hours} for the days in a range that have work times stored."""
+        return dict(self._fetchall(
+            'SELECT date, daily_working_hours FROM daily_work_times WHERE date BETWEEN ? AND ?',
+            (start_date_str, end_date_str)
+        ))
 
     def get_setting(self, key):
-        self.cursor.execute('SELECT value FROM app_settings WHERE key = ?', (key,))
-        result = self.cursor.fetchone()
+        result = self._fetchone('SELECT value FROM app_settings WHERE key = ?', (key,))
         return result[0] if result else None
 
     def set_setting(self, key, value):
-        self.cursor.execute('INSERT OR REPLACE INTO app_settings (key, value) VALUES (?, ?)', (key, value))
-        self.conn.commit()
+        self._execute_write('INSERT OR REPLACE INTO app_settings (key, value) VALUES (?, ?)', (key, value))
+
+    def set_qa83_categories(self, categories_list):
+        """
+        Stores the categories that mark a task as QA83 work and, if they changed,
+        rebuilds qa83_groups from scratch. Returns True if a rebuild happened.
+        """
+        value = json.dumps(list(categories_list))
+        with self._write() as cursor:
+            cursor.execute("SELECT value FROM app_settings WHERE key = 'qa83_categories'")
+            current = cursor.fetchone()
+            if current and current[0] == value:
+                return False
+            cursor.execute("INSERT OR REPLACE INTO app_settings (key, value) VALUES ('qa83_categories', ?)", (value,))
+            cursor.execute('DELETE FROM qa83_groups')
+            cursor.execute('INSERT INTO qa83_groups SELECT * FROM qa83_group_source')
+        return True
+
+    def get_qa83_groups_for_month(self, month_year):
+        """
+        Returns the month's QA83 groups ordered by project and earliest start, as
+        (group_id, project_code, description, display_description, merged,
+        week1, ..., week6, total_hours, project title).
+        """
+        return self._fetchall('''
+            SELECT g.group_id, g.project_code, g.description, g.display_description, g.merged,
+                   g.week1, g.week2, g.week3, g.week4, g.week5, g.week6, g.total_hours, p.title
+            FROM qa83_groups g
+            LEFT JOIN projects p ON p.code = g.project_code
+            WHERE g.month_year = ?
+            ORDER BY g.project_code, g.earliest_start, g.group_id
+        ''', (month_year,))
 
     def get_unique_tasks_for_month_by_category(self, month_year_str, categories_list):
         if not categories_list:
@@ -241,39 +1008,37 @@ class Database:
         
         params = [month_year_str] + [f'%{cat}%' for cat in categories_list]
         
-        self.cursor.execute(query, params)
-        return self.cursor.fetchall()
+        return self._fetchall(query, params)
     
     def get_task_hours_for_month(self, month_year, proj_code, desc):
-        self.cursor.execute('''
+        return self._fetchall('''
             SELECT task_date, start_time, end_time
             FROM tasks
             WHERE strftime('%Y-%m', task_date) = ? AND project_code = ? AND description = ?
         ''', (month_year, proj_code, desc))
-        return self.cursor.fetchall()
 
     def get_task_by_id(self, task_id):
-        self.cursor.execute('SELECT * FROM tasks WHERE id = ?', (task_id,))
-        return self.cursor.fetchone()
+        return self._fetchone('SELECT * FROM tasks WHERE id = ?', (task_id,))
 
     def get_tasks_for_month_with_master_info(self, month_year_str):
-        self.cursor.execute('''
+        return self._fetchall('''
             SELECT 
                 t.id, t.task_date, t.start_time, t.end_time, t.project_code, 
                 t.description, t.categories, t.software, t.master_task_id,
-                m.project_code, m.description, m.merged_description
+                m.project_code, m.description, m.merged_description,
+                p.title, t.entry_id, t.merged_description
             FROM tasks t 
             LEFT JOIN tasks m ON t.master_task_id = m.id 
-            WHERE strftime('%Y-%m', t.task_date) = ?
-        ''', (month_year_str,))
-        return self.cursor.fetchall()
+            LEFT JOIN projects p ON p.id = COALESCE(m.project_id, t.project_id)
+            WHERE t.task_date BETWEEN ? || '-01' AND ? || '-31'
+        ''', (month_year_str, month_year_str))
         
     def get_task_ids_for_group(self, month_year_str, proj_code, description):
-        self.cursor.execute('''
+        rows = self._fetchall('''
             SELECT id FROM tasks 
             WHERE strftime('%Y-%m', task_date) = ? AND project_code = ? AND description = ?
         ''', (month_year_str, proj_code, description))
-        return [row[0] for row in self.cursor.fetchall()]
+        return [row[0] for row in rows]
 
     def set_master_for_tasks(self, task_ids, master_id):
         if not task_ids:
@@ -281,29 +1046,162 @@ class Database:
         placeholders = ','.join('?' for _ in task_ids)
         query = f"UPDATE tasks SET master_task_id = ? WHERE id IN ({placeholders})"
         params = [master_id] + task_ids
-        self.cursor.execute(query, params)
-        self.conn.commit()
+        self._execute_write(query, params)
 
     def set_merged_description(self, master_id, merged_desc):
-        self.cursor.execute('UPDATE tasks SET merged_description = ? WHERE id = ?', (merged_desc, master_id))
-        self.conn.commit()
+        self._execute_write('UPDATE tasks SET merged_description = ? WHERE id = ?', (merged_desc, master_id))
 
     def get_qa83_progress(self, month_year, proj_code, desc):
-        self.cursor.execute('''
+        result = self._fetchone('''
             SELECT start_progress, final_progress 
             FROM qa83_progress 
             WHERE month_year = ? AND project_code = ? AND description = ?
         ''', (month_year, proj_code, desc))
-        result = self.cursor.fetchone()
         return result if result else (None, None)
 
+    def get_qa83_progress_for_month(self, month_year):
+        """
+        Returns {(project_code, description): (start_progress, final_progress, carried_start)}
+        for a month. carried_start is the numeric final progress of the latest earlier
+        month that has one, or None; the stored values are None where unset.
+        """
+        rows = self._fetchall('''
+            SELECT project_code, description,
+                   MAX(CASE WHEN month_year = ? THEN start_progress END),
+                   MAX(CASE WHEN month_year = ? THEN final_progress END),
+                   MAX(CASE WHEN is_carry AND recency = 1 THEN final_progress END)
+            FROM (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY project_code, description, is_carry ORDER BY month_year DESC
+                ) AS recency
+                FROM (
+                    SELECT project_code, description, month_year, start_progress, final_progress,
+                           month_year < ? AND final_progress GLOB '[0-9]*' AS is_carry
+                    FROM qa83_progress
+                    WHERE month_year <= ?
+                )
+            )
+            GROUP BY project_code, description
+        ''', (month_year, month_year, month_year, month_year))
+        return {(proj_code, desc): (start, final, carried) for proj_code, desc, start, final, carried in rows}
+
+    def carry_forward_qa83_progress(self, month_year):
+        """
+        Stores each QA83 group's carried start progress for a month wherever no start
+        progress is set yet. Returns the number of groups updated.
+        """
+        return self._execute_write('''
+            INSERT INTO qa83_progress (month_year, project_code, description, start_progress)
+            SELECT ?, g.project_code, g.description, c.final_progress
+            FROM (SELECT DISTINCT project_code, description FROM qa83_groups WHERE month_year = ?) g
+            JOIN (
+                SELECT project_code, description, final_progress, ROW_NUMBER() OVER (
+                    PARTITION BY project_code, description ORDER BY month_year DESC
+                ) AS recency
+                FROM qa83_progress
+                WHERE month_year < ? AND final_progress GLOB '[0-9]*'
+            ) c ON c.project_code = g.project_code AND c.description = g.description AND c.recency = 1
+            WHERE true
+            ON CONFLICT(month_year, project_code, description) DO UPDATE
+            SET start_progress = excluded.start_progress
+            WHERE start_progress IS NULL OR start_progress = ''
+        ''', (month_year, month_year, month_year))
+
+    def get_qa83_data_version(self, month_year):
+        """Returns the month's token from qa83_month_versions, or None if nothing was ever recorded for it."""
+        row = self._fetchone('SELECT version FROM qa83_month_versions WHERE month_year = ?', (month_year,))
+        return row[0] if row else None
+
+    def get_qa83_year_summary(self, year):
+        """
+        Returns one row per QA83 group key and month of a year, ordered by project and
+        month, as (project_code, description, month_year, hours, plain-text displayed
+        description, final_progress, project title).
+        """
+        return self._fetchall('''
+            SELECT g.project_code, g.description, g.month_year, SUM(g.total_hours),
+                   plain_text(MAX(g.display_description)), pr.final_progress, p.title
+            FROM qa83_groups g
+            LEFT JOIN qa83_progress pr
+                ON pr.month_year = g.month_year AND pr.project_code = g.project_code AND pr.description = g.description
+            LEFT JOIN projects p ON p.code = g.project_code
+            WHERE g.month_year BETWEEN ? AND ?
+            GROUP BY g.project_code, g.description, g.month_year
+            ORDER BY g.project_code, g.month_year
+        ''', (f"{year:04d}-01", f"{year:04d}-12"))
+
+    def get_qa83_progress_history(self, proj_code, desc):
+        """
+        Returns [(month_year, hours, start_progress, final_progress)] for every month in
+        which a QA83 group has hours or stored progress, oldest first.
+        """
+        return self._fetchall('''
+            SELECT m.month_year, h.hours, p.start_progress, p.final_progress
+            FROM (
+                SELECT month_year FROM qa83_progress WHERE project_code = ? AND description = ?
+                UNION
+                SELECT month_year FROM qa83_groups WHERE project_code = ? AND description = ?
+            ) m
+            LEFT JOIN qa83_progress p
+                ON p.month_year = m.month_year AND p.project_code = ? AND p.description = ?
+            LEFT JOIN (
+                SELECT month_year, SUM(total_hours) AS hours FROM qa83_groups
+                WHERE project_code = ? AND description = ?
+                GROUP BY month_year
+            ) h ON h.month_year = m.month_year
+            ORDER BY m.month_year
+        ''', (proj_code, desc) * 4)
+
     def set_qa83_progress(self, month_year, proj_code, desc, start_progress, final_progress):
-        self.cursor.execute('''
+        self._execute_write('''
             INSERT OR REPLACE INTO qa83_progress 
             (month_year, project_code, description, start_progress, final_progress)
             VALUES (?, ?, ?, ?, ?)
         ''', (month_year, proj_code, desc, start_progress, final_progress))
-        self.conn.commit()
+
+    def run_with_budget(self, statement, budget_seconds):
+        """
+        Runs a maintenance statement on the writer, interrupting it once
+        budget_seconds have passed. Returns (finished, rows); an interrupted
+        statement is rolled back by SQLite and leaves the database unchanged.
+        """
+        deadline = time.monotonic() + budget_seconds
+        with self._write_lock:
+            if self.conn.in_transaction:
+                self.conn.commit()
+            self.conn.set_progress_handler(lambda: time.monotonic() > deadline, 1000)
+            try:
+                rows = self.conn.execute(statement).fetchall()
+            except sqlite3.OperationalError as e:
+                if 'interrupt' in str(e):
+                    return False, []
+                raise
+            finally:
+                self.conn.set_progress_handler(None, 0)
+        return True, rows
+
+    def get_storage_stats(self):
+        """Returns page and file size figures describing the database file."""
+        stats = {}
+        for pragma in ('page_size', 'page_count', 'freelist_count', 'auto_vacuum'):
+            stats[pragma] = self._fetchone(f'PRAGMA {pragma}')[0]
+        stats['file_size'] = 0
+        stats['wal_size'] = 0
+        if self._reader_uri:
+            stats['file_size'] = os.path.getsize(self.db_name)
+            wal_path = f'{self.db_name}-wal'
+            if os.path.exists(wal_path):
+                stats['wal_size'] = os.path.getsize(wal_path)
+        return stats
+
+    def close(self):
+        """Closes every reader connection and then the writer."""
+        with self._readers_lock:
+            readers, self._readers = self._readers, []
+        for conn in readers:
+            conn.close()
+        self.conn.close()
 
     def __del__(self):
-        self.conn.close()
\ No newline at end of file
+        if hasattr(self, 'conn'):
+            self.close()
\ No newline at end of file
@@ -0,0 +1,115 @@
+# database_info_window.py
+
+import os
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel,
+                             QPushButton, QTableWidget, QTableWidgetItem, QHeaderView,
+                             QMessageBox, QApplication)
+from PySide6.QtCore import Qt
+
+
+def _format_bytes(size):
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class DatabaseInfoWindow(QDialog):
+    """Shows database size, free pages and the results of recent maintenance runs."""
+    AUTO_VACUUM_MODES = {0: "None", 1: "Full", 2: "Incremental"}
+
+    def __init__(self, db, scheduler, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.scheduler = scheduler
+        self.setWindowTitle("Debug: Database Info")
+        self.setMinimumSize(520, 420)
+        self.init_ui()
+        self.refresh()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        form = QFormLayout()
+        self.path_label = QLabel(os.path.abspath(self.db.db_name))
+        self.path_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        self.size_label = QLabel()
+        self.wal_label = QLabel()
+        self.pages_label = QLabel()
+        self.free_label = QLabel()
+        self.fragmentation_label = QLabel()
+        self.auto_vacuum_label = QLabel()
+        form.addRow("File:", self.path_label)
+        form.addRow("Size:", self.size_label)
+        form.addRow("WAL size:", self.wal_label)
+        form.addRow("Pages:", self.pages_label)
+        form.addRow("Free pages:", self.free_label)
+        form.addRow("Fragmentation:", self.fragmentation_label)
+        form.addRow("Auto-vacuum:", self.auto_vacuum_label)
+        layout.addLayout(form)
+
+        layout.addWidget(QLabel("<b>Maintenance</b>"))
+        self.history_table = QTableWidget(0, 4)
+        self.history_table.setHorizontalHeaderLabels(["Job", "Last Run", "Status", "Seconds"])
+        self.history_table.verticalHeader().setVisible(False)
+        self.history_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.history_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.history_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.history_table)
+
+        button_layout = QHBoxLayout()
+        run_button = QPushButton("Run Maintenance Now")
+        run_button.clicked.connect(self._run_now)
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.accept)
+        self.compact_button = QPushButton("Compact Database...")
+        self.compact_button.setToolTip("Switches the file to incremental auto-vacuum with one full VACUUM.")
+        self.compact_button.clicked.connect(self._compact)
+        button_layout.addWidget(run_button)
+        button_layout.addWidget(self.compact_button)
+        button_layout.addStretch()
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+    def refresh(self):
+        stats = self.db.get_storage_stats()
+        page_size, page_count, free_count = stats['page_size'], stats['page_count'], stats['freelist_count']
+        self.size_label.setText(_format_bytes(stats['file_size'] or page_size * page_count))
+        self.wal_label.setText(_format_bytes(stats['wal_size']))
+        self.pages_label.setText(f"{page_count} x {page_size} B")
+        self.free_label.setText(f"{free_count} ({_format_bytes(free_count * page_size)} reclaimable)")
+        fragmentation = (free_count / page_count * 100) if page_count else 0.0
+        self.fragmentation_label.setText(f"{fragmentation:.1f}% of pages unused")
+        self.auto_vacuum_label.setText(self.AUTO_VACUUM_MODES.get(stats['auto_vacuum'], str(stats['auto_vacuum'])))
+        self.compact_button.setEnabled(self.scheduler.needs_vacuum_conversion())
+
+        history = self.scheduler.get_history()
+        self.history_table.setRowCount(len(history))
+        for row, (label, last_run, status, seconds) in enumerate(history):
+            values = [label, last_run or "Never", status or "", "" if seconds is None else f"{seconds:.2f}"]
+            for col, value in enumerate(values):
+                self.history_table.setItem(row, col, QTableWidgetItem(value))
+
+    def _run_now(self):
+        results = self.scheduler.run_due_jobs(force=True)
+        self.refresh()
+        summary = "<br>".join(f"{label}: {status}" for label, status in results)
+        QMessageBox.information(self, "Maintenance", f"Maintenance finished.<br><br>{summary}")
+
+    def _compact(self):
+        reply = QMessageBox.question(
+            self, "Compact Database",
+            "This rewrites the whole database file once so that the idle maintenance can "
+            "reclaim free space from then on. Task Tracker cannot save anything until it "
+            "has finished, which can take a while for a large file.<br><br>Compact now?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            status = self.scheduler.convert_to_incremental_vacuum()
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.refresh()
+        QMessageBox.information(self, "Compact Database", f"Compact finished: {status}")
@@ -1,19 +1,23 @@
 # general_tab.py
 
-import re
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QDateEdit,
                              QGroupBox, QGridLayout, QCalendarWidget, QStyle, QApplication,
                              QMessageBox, QSystemTrayIcon, QDialog, QMenu, QTimeEdit,
-                             QDialogButtonBox, QAbstractItemView, QTableWidget, QTableWidgetItem, QHeaderView,
-                             QAbstractScrollArea)
+                             QDialogButtonBox, QAbstractItemView, QTableView, QHeaderView,
+                             QAbstractScrollArea, QComboBox, QStackedWidget, QScrollArea)
 from PySide6.QtCore import Qt, QDate, QTime, QEvent
-from PySide6.QtGui import QColor, QTextCharFormat, QTextDocument, QAction, QFont
+from PySide6.QtGui import QColor, QTextCharFormat, QAction, QFont
 from datetime import datetime, time, timedelta
 from popup import EditTaskPopup
+from render_cache import render_description
+from table_models import RowTableModel, RichTextDelegate, VisibleRowResizer, RICH_TEXT_ROLE
+from timeline_widget import TimelineDay, TimelineWidget
+from view_cache import ViewCache, make_debounce_timer
+from report_cache import make_fingerprint
 
-class NoWheelFocusTableWidget(QTableWidget):
+class NoWheelFocusTableView(QTableView):
     """
-    A custom QTableWidget that prevents the focus from changing when scrolling
+    A custom QTableView that prevents the focus from changing when scrolling
     with the mouse wheel. This provides a smooth scroll without the distracting
     highlighting of different cells.
     """
@@ -23,13 +27,71 @@ class NoWheelFocusTableWidget(QTableWidget):
         # wheelEvent of QAbstractScrollArea, bypassing the item view's logic.
         QAbstractScrollArea.wheelEvent(self, event)
 
+class DayTaskModel(RowTableModel):
+    """
+    The rows of the General tab's day: ('task', task, description_html) for a
+    recorded task, ('slot', (start_dt, end_dt)) for an unrecorded slot and
+    ('message', text) for a note spanning the row. The recorded task is
+    returned for UserRole and the slot for UserRole + 1, on the Time column.
+    """
+    def __init__(self, parent=None):
+        super().__init__(["Time", "Project", "Description"], parent)
+        self.unrecorded_font = QFont("Segoe UI", 9, italic=True)
+
+    def cell_data(self, row, column, role):
+        kind = row[0]
+        if role == Qt.ItemDataRole.DisplayRole:
+            if kind == 'message':
+                return row[1] if column == 0 else None
+            if column == 0:
+                if kind == 'task':
+                    start_dt = datetime.combine(datetime.min, time.fromisoformat(row[1][2]))
+                    end_dt = datetime.combine(datetime.min, time.fromisoformat(row[1][3]))
+                else:
+                    start_dt, end_dt = row[1]
+                duration_hours = (end_dt - start_dt).total_seconds() / 3600
+                return f"{start_dt.strftime('%H:%M')} - {end_dt.strftime('%H:%M')} ({duration_hours:.2f}h)"
+            if column == 1:
+                return row[1][4] if kind == 'task' else "---"
+            return render_description(row[1][5]).plain_text if kind == 'task' else "Unrecorded"
+        if role == RICH_TEXT_ROLE:
+            return row[2] if kind == 'task' and column == 2 else None
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            if kind == 'message':
+                return Qt.AlignmentFlag.AlignCenter
+            return Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft
+        if role == Qt.ItemDataRole.FontRole:
+            return self.unrecorded_font if kind == 'slot' and column == 2 else None
+        if role == Qt.ItemDataRole.UserRole:
+            return row[1] if kind == 'task' and column == 0 else None
+        if role == Qt.ItemDataRole.UserRole + 1:
+            return row[1] if kind == 'slot' and column == 0 else None
+        return None
+
+    def row_key(self, row):
+        # Tasks keep their id across edits; a slot is known by where it starts.
+        if row[0] == 'task':
+            return 'task', row[1][0]
+        if row[0] == 'slot':
+            return 'slot', row[1][0]
+        return row
+
 class GeneralTab(QWidget):
+    VIEW_TABLE, VIEW_DAY_TIMELINE, VIEW_WEEK_TIMELINE = range(3)
+
     def __init__(self, parent, db, config):
         super().__init__()
         self.parent_window = parent
         self.db = db
         self.config = config
         self.view_date = datetime.now().date()
+        # The rows last shown for each day, for finding the task after an unrecorded slot.
+        self.day_rows = {}
+        # The day in the table, so refreshing the same day patches rows instead of resetting them.
+        self.table_date = None
+        # Days and weeks already built, with their neighbours built ahead while the app is idle.
+        self.view_cache = ViewCache(db, max_entries=16, parent=self)
+        self.refresh_timer = make_debounce_timer(self, self.update_task_view)
         
         self.holiday_format = QTextCharFormat()
         self.holiday_format.setForeground(QColor("red"))
@@ -57,12 +119,32 @@ class GeneralTab(QWidget):
         nav_layout.addWidget(self.date_picker, 0, 1)
         nav_layout.addWidget(self.next_button, 0, 2)
         nav_layout.setColumnStretch(1, 1)
+
+        view_layout = QHBoxLayout()
+        view_layout.addWidget(QLabel("View:"))
+        self.view_mode_combo = QComboBox()
+        self.view_mode_combo.addItems(["Table", "Day timeline", "Week timeline"])
+        self.view_mode_combo.currentIndexChanged.connect(self._on_view_mode_changed)
+        view_layout.addWidget(self.view_mode_combo)
+        self.zoom_out_button = QPushButton("-")
+        self.zoom_out_button.setToolTip("Zoom out (Ctrl+Wheel)")
+        self.zoom_out_button.setFixedWidth(28)
+        self.zoom_in_button = QPushButton("+")
+        self.zoom_in_button.setToolTip("Zoom in (Ctrl+Wheel)")
+        self.zoom_in_button.setFixedWidth(28)
+        view_layout.addWidget(self.zoom_out_button)
+        view_layout.addWidget(self.zoom_in_button)
+        view_layout.addStretch()
+        nav_layout.addLayout(view_layout, 1, 0, 1, 3)
         layout.addWidget(nav_group)
         
-        # --- MODIFICATION: Use QTableWidget instead of QListWidget ---
-        self.task_table = NoWheelFocusTableWidget()
-        self.task_table.setColumnCount(3)
-        self.task_table.setHorizontalHeaderLabels(["Time", "Project", "Description"])
+        # The day is a model; only the rows in view are ever painted or measured.
+        self.task_model = DayTaskModel(self)
+        self.task_table = NoWheelFocusTableView()
+        self.task_table.setModel(self.task_model)
+        # Descriptions are shown unwrapped, one line per paragraph.
+        self.task_table.setItemDelegateForColumn(2, RichTextDelegate(self.task_table, word_wrap=False,
+                                                                     selected_text_color=QColor("white")))
         self.task_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.task_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.task_table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
@@ -73,11 +155,11 @@ class GeneralTab(QWidget):
         
         # Set a stylesheet to ensure selection has square corners and consistent color.
         self.task_table.setStyleSheet("""
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #447ED0;
                 color: white;
             }
-            QTableWidget::item:focus {
+            QTableView::item:focus {
                 background-color: #447ED0;
                 color: white;
             }
@@ -90,9 +172,23 @@ class GeneralTab(QWidget):
 
         self.task_table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.task_table.customContextMenuRequested.connect(self._show_context_menu)
-        self.task_table.cellDoubleClicked.connect(self._on_item_double_clicked)
-        layout.addWidget(self.task_table)
-        # --- END MODIFICATION ---
+        self.task_table.doubleClicked.connect(self._on_item_double_clicked)
+        self.row_resizer = VisibleRowResizer(self.task_table)
+
+        # The timeline paints a day or a week in one pass, without a widget or row per task.
+        self.timeline = TimelineWidget()
+        self.timeline.entryActivated.connect(self._on_entry_activated)
+        self.timeline.contextMenuRequested.connect(self._show_entry_menu)
+        self.zoom_out_button.clicked.connect(self.timeline.zoom_out)
+        self.zoom_in_button.clicked.connect(self.timeline.zoom_in)
+        self.timeline_scroll = QScrollArea()
+        self.timeline_scroll.setWidgetResizable(True)
+        self.timeline_scroll.setWidget(self.timeline)
+
+        self.view_stack = QStackedWidget()
+        self.view_stack.addWidget(self.task_table)
+        self.view_stack.addWidget(self.timeline_scroll)
+        layout.addWidget(self.view_stack)
 
         button_layout = QHBoxLayout()
         self.copy_button = QPushButton("Duplicate Task")
@@ -123,7 +219,9 @@ class GeneralTab(QWidget):
         
         layout.addLayout(button_layout)
 
-        self.task_table.itemSelectionChanged.connect(self._update_button_states)
+        self.task_table.selectionModel().selectionChanged.connect(self._update_button_states)
+        self.timeline.selectionChanged.connect(self._update_button_states)
+        self._update_view_mode_controls()
         self._update_button_states()
 
     def eventFilter(self, source, event):
@@ -135,24 +233,15 @@ class GeneralTab(QWidget):
 
     def _show_context_menu(self, position):
         """Creates and shows a context-sensitive menu on right-click."""
-        item = self.task_table.itemAt(position)
-        if not item:
-            # If clicking on empty space, show a generic log menu
-            menu = QMenu(self.task_table)
-            log_action = QAction("Log Task", self)
-            log_action.triggered.connect(self.parent_window.manual_popup)
-            menu.addAction(log_action)
-            menu.exec(self.task_table.viewport().mapToGlobal(position))
-            return
-
-        row = item.row()
-        # Retrieve data from the first column's item for that row
-        data_item = self.task_table.item(row, 0)
-        if not data_item: return
+        index = self.task_table.indexAt(position)
+        row = self.task_model.row_at(index.row()) if index.isValid() else None
+        self._show_entry_menu(row, self.task_table.viewport().mapToGlobal(position))
 
-        menu = QMenu(self.task_table)
-        task_data = data_item.data(Qt.ItemDataRole.UserRole)
-        unrecorded_slot_data = data_item.data(Qt.ItemDataRole.UserRole + 1)
+    def _show_entry_menu(self, row, global_position):
+        """Shows the menu for a table row or timeline entry, or the generic log menu when row is None."""
+        task_data = row[1] if row and row[0] == 'task' else None
+        unrecorded_slot_data = row[1] if row and row[0] == 'slot' else None
+        menu = QMenu(self)
 
         # --- Log Task Action ---
         log_action = QAction("Log Task", self)
@@ -176,19 +265,20 @@ class GeneralTab(QWidget):
             copy_action.triggered.connect(lambda: self.parent_window.popup_from_copied_task(task_data))
             menu.addAction(copy_action)
 
-        menu.exec(self.task_table.viewport().mapToGlobal(position))
+        menu.exec(global_position)
 
     def _log_unrecorded_slot(self, unrecorded_slot_data):
         """Helper function to trigger the log popup for a specific unrecorded slot."""
         start_dt, end_dt = unrecorded_slot_data
+        # The log popup opens on the viewed day, so a slot on another day of the week is viewed first.
+        if start_dt.date() != self.view_date:
+            self.view_date = start_dt.date()
+            self.update_task_view()
         has_subsequent_task = False
         
         # Check if there's a task immediately following this slot
-        for i in range(self.task_table.rowCount()):
-            item = self.task_table.item(i, 0)
-            if not item: continue
-            task_data = item.data(Qt.ItemDataRole.UserRole)
-            if task_data and time.fromisoformat(task_data[2]) == end_dt.time():
+        for row in self.day_rows.get(start_dt.date(), []):
+            if row[0] == 'task' and time.fromisoformat(row[1][2]) == end_dt.time():
                 has_subsequent_task = True
                 break
         self.parent_window.manual_popup(
@@ -280,95 +370,89 @@ class GeneralTab(QWidget):
                     'holidays': self.config.get('holidays', [])
                 }
                 self.db.add_work_times(date_str, new_start_time_str, settings_snapshot)
+                # A new work-times row also sets the day's required hours.
+                self.parent_window.mark_tabs_dirty('timesheet_tab')
 
             QMessageBox.information(self, "Success", f"Start time for {date_str} has been updated to {new_start_time.toString('HH:mm')}.")
             self.update_task_view()
 
     def _on_date_picker_changed(self, new_qdate):
         self.view_date = new_qdate.toPython()
-        self.update_task_view()
+        self._schedule_view_update()
 
     def _go_to_previous_day(self):
-        self.view_date -= timedelta(days=1)
-        self.update_task_view()
+        self.view_date -= timedelta(days=self._navigation_step())
+        self._schedule_view_update()
 
     def _go_to_next_day(self):
-        self.view_date += timedelta(days=1)
+        self.view_date += timedelta(days=self._navigation_step())
+        self._schedule_view_update()
+
+    def _schedule_view_update(self):
+        """Shows the new date at once but only rebuilds the view once the clicking stops."""
+        self._sync_date_picker()
+        self.view_cache.cancel_prefetch()
+        self.refresh_timer.start()
+
+    def _sync_date_picker(self):
+        self.date_picker.blockSignals(True)
+        self.date_picker.setDate(QDate(self.view_date))
+        self.date_picker.blockSignals(False)
+
+    def _navigation_step(self):
+        return 7 if self.view_mode_combo.currentIndex() == self.VIEW_WEEK_TIMELINE else 1
+
+    def _on_view_mode_changed(self, mode):
+        self._update_view_mode_controls()
         self.update_task_view()
+        self._update_button_states()
+
+    def _update_view_mode_controls(self):
+        is_timeline = self.view_mode_combo.currentIndex() != self.VIEW_TABLE
+        self.view_stack.setCurrentWidget(self.timeline_scroll if is_timeline else self.task_table)
+        self.zoom_out_button.setVisible(is_timeline)
+        self.zoom_in_button.setVisible(is_timeline)
 
     def _update_button_states(self):
-        selected_items = self.task_table.selectedItems()
-        is_task_selected = False
-        if selected_items:
-            # Check the data of the item in the first column of the selected row
-            row = selected_items[0].row()
-            item = self.task_table.item(row, 0)
-            if item and item.data(Qt.ItemDataRole.UserRole):
-                is_task_selected = True
+        is_task_selected = self._get_selected_task_data() is not None
         
         self.copy_button.setEnabled(is_task_selected)
         self.edit_button.setEnabled(is_task_selected)
         self.delete_button.setEnabled(is_task_selected)
 
-    def _get_selected_task_data(self):
+    def _get_selected_row(self):
+        if self.view_stack.currentWidget() is self.timeline_scroll:
+            return self.timeline.selected_entry()
         selected_rows = self.task_table.selectionModel().selectedRows()
         if not selected_rows:
             return None
-        
-        # Get the item from the first column of the selected row
-        item = self.task_table.item(selected_rows[0].row(), 0)
-        if not item:
-            return None
-            
-        return item.data(Qt.ItemDataRole.UserRole)
+        return self.task_model.row_at(selected_rows[0].row())
+
+    def _get_selected_task_data(self):
+        row = self._get_selected_row()
+        return row[1] if row and row[0] == 'task' else None
     
     def _get_selected_unrecorded_slot_data(self):
-        selected_rows = self.task_table.selectionModel().selectedRows()
-        if not selected_rows:
-            return None
-            
-        item = self.task_table.item(selected_rows[0].row(), 0)
-        if not item:
-            return None
-            
-        return item.data(Qt.ItemDataRole.UserRole + 1)
+        row = self._get_selected_row()
+        return row[1] if row and row[0] == 'slot' else None
 
     def _on_log_task_clicked(self):
         unrecorded_slot_data = self._get_selected_unrecorded_slot_data()
         if unrecorded_slot_data:
-            start_dt, end_dt = unrecorded_slot_data
-            
-            has_subsequent_task = False
-            for i in range(self.task_table.rowCount()):
-                item = self.task_table.item(i, 0)
-                if not item: continue
-                task_data = item.data(Qt.ItemDataRole.UserRole)
-                if task_data:
-                    task_start_time = time.fromisoformat(task_data[2])
-                    if task_start_time == end_dt.time():
-                        has_subsequent_task = True
-                        break
-            
-            self.parent_window.manual_popup(
-                start_time=start_dt.time(), 
-                end_time=end_dt.time(), 
-                has_subsequent_task=has_subsequent_task
-            )
+            self._log_unrecorded_slot(unrecorded_slot_data)
         else:
             self.parent_window.manual_popup()
 
-    def _on_item_double_clicked(self, row, column):
+    def _on_item_double_clicked(self, index):
         """Handles double-clicking on a cell in the task table."""
-        item = self.task_table.item(row, 0) # Always get data from the first column
-        if not item: return
+        self._on_entry_activated(self.task_model.row_at(index.row()))
 
-        task_data = item.data(Qt.ItemDataRole.UserRole)
-        unrecorded_slot_data = item.data(Qt.ItemDataRole.UserRole + 1)
-
-        if task_data:
-            self._edit_task(task_data[0])
-        elif unrecorded_slot_data:
-            self._log_unrecorded_slot(unrecorded_slot_data)
+    def _on_entry_activated(self, row):
+        """Edits a recorded task or logs an unrecorded slot, from the table or the timeline."""
+        if row and row[0] == 'task':
+            self._edit_task(row[1][0])
+        elif row and row[0] == 'slot':
+            self._log_unrecorded_slot(row[1])
 
     def _copy_selected_task(self):
         task_data = self._get_selected_task_data()
@@ -398,90 +482,83 @@ class GeneralTab(QWidget):
     def _copy_task_to_new_popup(self, task_data):
         self.parent_window.popup_from_copied_task(task_data)
 
-    def _add_recorded_task_item(self, task, is_day_off):
-        row = self.task_table.rowCount()
-        self.task_table.insertRow(row)
-
-        start_dt = datetime.combine(self.view_date, time.fromisoformat(task[2]))
-        end_dt = datetime.combine(self.view_date, time.fromisoformat(task[3]))
-        project_code = task[4]
-        description_html = task[5] or ""
-
-        # The description is saved as HTML with <p> tags, which are block-level
-        # elements. When the text wraps, these blocks add vertical margins that
-        # make the row height incorrect. To fix this, we extract the inner content
-        # of each <p> tag and join them with <br> (line break) tags. This preserves
-        # inline formatting (like bold) while removing the problematic block layout.
-        temp_doc = QTextDocument()
-        temp_doc.setHtml(description_html)
-        if not temp_doc.toPlainText().strip():
-            cleaned_description_html = ""
-        else:
-            # Find all content within the <p>...</p> tags.
-            p_contents = re.findall(r'<p[^>]*>(.*?)</p>', description_html, re.DOTALL)
-            # Join the contents with a line break. This handles multi-paragraph descriptions.
-            cleaned_description_html = "<br>".join(p_contents)
-        
-        duration_hours = (end_dt - start_dt).total_seconds() / 3600
-        time_str = f"{start_dt.strftime('%H:%M')} - {end_dt.strftime('%H:%M')} ({duration_hours:.2f}h)"
-        
-        # Time Item
-        time_item = QTableWidgetItem(time_str)
-        time_item.setData(Qt.ItemDataRole.UserRole, task) # Store task data here
-        time_item.setTextAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
-        self.task_table.setItem(row, 0, time_item)
-
-        # Project Item
-        project_item = QTableWidgetItem(project_code)
-        project_item.setTextAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
-        self.task_table.setItem(row, 1, project_item)
-
-        # Description Item (as a widget for proper wrapping)
-        desc_label = QLabel(cleaned_description_html)
-        desc_label.setWordWrap(False)
-        desc_label.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
-        desc_label.setContentsMargins(4, 4, 4, 4) # Add some padding
-        self.task_table.setCellWidget(row, 2, desc_label)
-
-    def _add_unrecorded_task_item(self, start_dt, end_dt, is_day_off):
-        row = self.task_table.rowCount()
-        self.task_table.insertRow(row)
-
-        duration_hours = (end_dt - start_dt).total_seconds() / 3600
-        time_str = f"{start_dt.strftime('%H:%M')} - {end_dt.strftime('%H:%M')} ({duration_hours:.2f}h)"
-        
-        # Time Item
-        time_item = QTableWidgetItem(time_str)
-        time_item.setData(Qt.ItemDataRole.UserRole, None) 
-        time_item.setData(Qt.ItemDataRole.UserRole + 1, (start_dt, end_dt)) # Store slot data
-        time_item.setTextAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
-        self.task_table.setItem(row, 0, time_item)
-
-        # Project Item
-        project_item = QTableWidgetItem("---")
-        project_item.setTextAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
-        self.task_table.setItem(row, 1, project_item)
-
-        # Description Item
-        desc_item = QTableWidgetItem("Unrecorded")
-        desc_item.setFont(QFont("Segoe UI", 9, italic=True))
-        desc_item.setTextAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
-        self.task_table.setItem(row, 2, desc_item)
+    def _recorded_task_row(self, task):
+        return ('task', task, render_description(task[5]))
 
     def update_task_view(self):
-        self.date_picker.blockSignals(True)
-        self.date_picker.setDate(QDate(self.view_date))
-        self.date_picker.blockSignals(False)
+        self.refresh_timer.stop()
+        self._sync_date_picker()
         self._update_calendar_holidays()
         
-        self.task_table.setRowCount(0) # Clear the table
-
-        date_str = self.view_date.strftime("%Y-%m-%d")
-        day_name = self.view_date.strftime('%A')
+        if self.view_mode_combo.currentIndex() != self.VIEW_TABLE:
+            timeline_days = self._get_view(self.view_date)
+            self.day_rows = {timeline_day.day: timeline_day.rows for timeline_day in timeline_days}
+            self.timeline.set_days(timeline_days, self.view_date)
+        else:
+            rows = self._get_view(self.view_date)
+            self.day_rows = {self.view_date: rows}
+            self.task_table.clearSpans()
+            if self.table_date == self.view_date:
+                self.task_model.update_rows(rows)
+            else:
+                self.task_model.set_rows(rows)
+                self.table_date = self.view_date
+            for row_index, row in enumerate(rows):
+                if row[0] == 'message':
+                    self.task_table.setSpan(row_index, 0, 1, 3)
+            self.row_resizer.resize_now()
+        self._prefetch_neighbours()
+
+    def _get_view(self, view_date):
+        """Returns the DayTaskModel rows, or the TimelineDay list, for view_date in the current view mode."""
+        return self.view_cache.get(*self._view_job(view_date))
+
+    def _view_job(self, view_date):
+        """Returns the (cache key, build function) of the view for view_date in the current view mode."""
+        mode = self.view_mode_combo.currentIndex()
+        if mode == self.VIEW_WEEK_TIMELINE:
+            first_day = view_date - timedelta(days=view_date.weekday())
+            days = [first_day + timedelta(days=offset) for offset in range(7)]
+        else:
+            days = [view_date]
+        key = (mode, days[0], make_fingerprint(self.config))
+        if mode == self.VIEW_TABLE:
+            return key, lambda: self._build_day_rows(view_date)
+        return key, lambda: self._build_timeline_days(days)
+
+    def _prefetch_neighbours(self):
+        if not self.isVisible():
+            return
+        step = timedelta(days=self._navigation_step())
+        self.view_cache.prefetch([self._view_job(self.view_date + step), self._view_job(self.view_date - step)])
+
+    def _build_day_rows(self, day):
+        """Returns the DayTaskModel rows for a day."""
+        date_str = day.strftime("%Y-%m-%d")
+        return self._build_day(day, self.db.get_tasks_for_date(date_str),
+                               self.db.get_work_times_for_date(date_str))[0]
+
+    def _build_timeline_days(self, days):
+        """Returns a TimelineDay for each of a run of consecutive days, read with one query for each table."""
+        tasks_by_date = self.db.get_tasks_for_range(days[0].strftime("%Y-%m-%d"), days[-1].strftime("%Y-%m-%d"))
+        work_times = self.db.get_work_times_for_range(days[0].strftime("%Y-%m-%d"), days[-1].strftime("%Y-%m-%d"))
+        timeline_days = []
+        for day in days:
+            date_str = day.strftime("%Y-%m-%d")
+            rows, lunch_window = self._build_day(day, tasks_by_date.get(date_str, []), work_times.get(date_str))
+            timeline_days.append(TimelineDay(day, rows, lunch_window))
+        return timeline_days
+
+    def _build_day(self, day, tasks, work_times_row):
+        """
+        Returns (rows, lunch window) for one day from its tasks and daily_work_times
+        row: the DayTaskModel rows and (lunch start, lunch end) datetimes, or None on
+        a day that is not worked.
+        """
+        date_str = day.strftime("%Y-%m-%d")
+        day_name = day.strftime('%A')
         day_rules = {}
-        is_day_off = False
 
-        work_times_row = self.db.get_work_times_for_date(date_str)
         if work_times_row:
             day_rules = {
                 'lower': work_times_row[2], 'upper': work_times_row[3],
@@ -501,25 +578,10 @@ class GeneralTab(QWidget):
             }
 
         if date_str in day_rules['holidays']:
-            self.task_table.setRowCount(1)
-            self.task_table.setSpan(0, 0, 1, 3)
-            msg_item = QTableWidgetItem("Public Holiday")
-            msg_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.task_table.setItem(0, 0, msg_item)
-            is_day_off = True
+            return [('message', "Public Holiday")], None
         elif day_name not in day_rules['work_days']:
-            self.task_table.setRowCount(1)
-            self.task_table.setSpan(0, 0, 1, 3)
-            msg_item = QTableWidgetItem(f"Not a working day ({day_name})")
-            msg_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.task_table.setItem(0, 0, msg_item)
-            is_day_off = True
-        
-        if is_day_off:
-            self.task_table.resizeRowsToContents()
-            return
+            return [('message', f"Not a working day ({day_name})")], None
 
-        tasks = self.db.get_tasks_for_date(date_str)
         work_start_t = None
         if work_times_row:
             work_start_t = time.fromisoformat(work_times_row[1])
@@ -531,48 +593,46 @@ class GeneralTab(QWidget):
         else:
             work_start_t = time.fromisoformat(day_rules['upper'])
 
-        work_start_dt = datetime.combine(self.view_date, work_start_t)
+        work_start_dt = datetime.combine(day, work_start_t)
         lunch_s = time.fromisoformat(day_rules['lunch_s'])
         lunch_e = time.fromisoformat(day_rules['lunch_e'])
-        lunch_dur = datetime.combine(self.view_date, lunch_e) - datetime.combine(self.view_date, lunch_s)
+        lunch_dur = datetime.combine(day, lunch_e) - datetime.combine(day, lunch_s)
         work_dur = timedelta(hours=day_rules['hours'])
         work_end_dt = work_start_dt + work_dur + lunch_dur
-        lunch_start_dt = datetime.combine(self.view_date, lunch_s)
-        lunch_end_dt = datetime.combine(self.view_date, lunch_e)
+        lunch_start_dt = datetime.combine(day, lunch_s)
+        lunch_end_dt = datetime.combine(day, lunch_e)
 
+        rows = []
         if not tasks:
             if work_start_dt < work_end_dt:
-                self._add_unrecorded_slots(work_start_dt, work_end_dt, lunch_start_dt, lunch_end_dt, is_day_off)
+                self._add_unrecorded_slots(rows, work_start_dt, work_end_dt, lunch_start_dt, lunch_end_dt)
             else:
-                 self.task_table.setRowCount(1)
-                 self.task_table.setItem(0, 0, QTableWidgetItem("No tasks saved for this day."))
-            self.task_table.resizeRowsToContents()
-            return
+                rows.append(('message', "No tasks saved for this day."))
+            return rows, (lunch_start_dt, lunch_end_dt)
 
         timeline_cursor = work_start_dt
         for task in tasks:
-            task_start_dt = datetime.combine(self.view_date, time.fromisoformat(task[2]))
+            task_start_dt = datetime.combine(day, time.fromisoformat(task[2]))
             if timeline_cursor < task_start_dt:
-                self._add_unrecorded_slots(timeline_cursor, task_start_dt, lunch_start_dt, lunch_end_dt, is_day_off)
+                self._add_unrecorded_slots(rows, timeline_cursor, task_start_dt, lunch_start_dt, lunch_end_dt)
             
-            self._add_recorded_task_item(task, is_day_off)
+            rows.append(self._recorded_task_row(task))
             
-            task_end_dt = datetime.combine(self.view_date, time.fromisoformat(task[3]))
+            task_end_dt = datetime.combine(day, time.fromisoformat(task[3]))
             timeline_cursor = max(timeline_cursor, task_end_dt)
 
         if timeline_cursor < work_end_dt:
-            self._add_unrecorded_slots(timeline_cursor, work_end_dt, lunch_start_dt, lunch_end_dt, is_day_off)
-        
-        self.task_table.resizeRowsToContents()
+            self._add_unrecorded_slots(rows, timeline_cursor, work_end_dt, lunch_start_dt, lunch_end_dt)
+        return rows, (lunch_start_dt, lunch_end_dt)
 
-    def _add_unrecorded_slots(self, start_dt, end_dt, lunch_start_dt, lunch_end_dt, is_day_off):
+    def _add_unrecorded_slots(self, rows, start_dt, end_dt, lunch_start_dt, lunch_end_dt):
         pre_lunch_end = min(end_dt, lunch_start_dt)
         if start_dt < pre_lunch_end:
-            self._add_unrecorded_task_item(start_dt, pre_lunch_end, is_day_off)
+            rows.append(('slot', (start_dt, pre_lunch_end)))
         
         post_lunch_start = max(start_dt, lunch_end_dt)
         if post_lunch_start < end_dt:
-            self._add_unrecorded_task_item(post_lunch_start, end_dt, is_day_off)
+            rows.append(('slot', (post_lunch_start, end_dt)))
 
     def _delete_task(self, task_id, project_code):
         child_task_ids = self.db.get_child_task_ids(task_id)
@@ -596,6 +656,4 @@ class GeneralTab(QWidget):
 
             self.db.delete_task_by_id(task_id)
             self.update_task_view()
-            
-            if hasattr(self.parent_window, 'qa83_tab'):
-                self.parent_window.qa83_tab.update_qa83_view()
\ No newline at end of file
+            self.parent_window.mark_tabs_dirty('timesheet_tab', 'travel_tab', 'qa83_tab')
\ No newline at end of file
@@ -0,0 +1,30 @@
+# html_text.py
+
+import html
+import re
+
+# Qt rich text keeps its stylesheet in <head>; none of it is visible text.
+_HIDDEN_RE = re.compile(r'<(head|style|script|title)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+# Tags that start a new line in the plain-text rendering, as in QTextDocument.toPlainText().
+_BREAK_RE = re.compile(r'\s*<(?:br|/?(?:p|div|li|ul|ol|tr|table|h[1-6]|pre|blockquote))\b[^>]*>\s*', re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]*>')
+_BLANK_LINES_RE = re.compile(r'\n{2,}')
+
+
+def html_to_plain_text(text):
+    """
+    Returns the plain text of a task description stored as Qt rich text HTML,
+    one line per paragraph. Plain (non-HTML) text is returned stripped.
+    Needs no QApplication, so it can run in worker threads and inside SQLite.
+    """
+    if not text:
+        return ""
+    if '<' not in text:
+        return text.strip()
+    text = _HIDDEN_RE.sub('', text)
+    # A <br> inside a paragraph is a real line break; mark it before block tags collapse.
+    text = re.sub(r'<br\b[^>]*>', '\x00', text, flags=re.IGNORECASE)
+    text = _BREAK_RE.sub('\n', text)
+    text = _TAG_RE.sub('', text)
+    text = _BLANK_LINES_RE.sub('\n', text.replace('\r', ''))
+    return html.unescape(text.replace('\x00', '\n')).strip()
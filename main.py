@@ -2,12 +2,17 @@
 
 import sys
 import ctypes
+import multiprocessing
 import os 
 from PySide6.QtWidgets import QApplication, QStyle
 from PySide6.QtGui import QIcon
 from main_window import MainWindow
 
 if __name__ == '__main__':
+    # The PDF export runs in a spawned child process; in a frozen build the child
+    # starts this executable again and must not open another main window.
+    multiprocessing.freeze_support()
+
     # =====================================================================
     # === MODIFIED SECTION START (Set AppUserModelID for Windows) ===
     # =====================================================================
@@ -42,7 +47,10 @@ if __name__ == '__main__':
     # === MODIFIED SECTION END ===
     # =====================================================================
     
-    main_win = MainWindow(app_icon=app_icon)
-    main_win.show()
+    # With --tray, or "start_in_tray" in config.json, only the tray icon appears;
+    # the window is built the first time it is opened from there.
+    main_win = MainWindow(app_icon=app_icon, start_in_tray='--tray' in sys.argv[1:])
+    if not main_win.start_in_tray:
+        main_win.show()
     
     sys.exit(app.exec())
\ No newline at end of file
@@ -4,14 +4,16 @@ import sys
 import json
 import os
 import calendar
-import shutil
 from datetime import datetime, time, timedelta
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget,
                              QSystemTrayIcon, QMenu, QMessageBox, QStyle, QDialog,
-                             QTabWidget)
+                             QTabWidget, QVBoxLayout)
 from PySide6.QtCore import QTimer, QTime, QDate, Qt
 from PySide6.QtGui import QIcon, QAction
 from database import Database
+from maintenance import MaintenanceScheduler
+from database_info_window import DatabaseInfoWindow
+from batch_export_window import BatchExportWindow
 from popup import Popup
 from settings_window import SettingsWindow
 from reminder_settings_window import ReminderSettingsWindow
@@ -27,10 +29,13 @@ class MainWindow(QMainWindow):
     DB_FILE = 'task_tracker.db'
     BACKUP_DIR = 'backups'
     app_icon = 'icon.ico'
+    # (attribute, label) of each tab, in the order they appear.
+    TABS = (('general_tab', "General"), ('timesheet_tab', "Timesheet"), ('travel_tab', "Travel"), ('qa83_tab', "QA83"))
 
-    def __init__(self, app_icon=None):
+    def __init__(self, app_icon=None, start_in_tray=False):
         super().__init__()
-        self.db = Database(self.DB_FILE)
+        self.db = Database(self.DB_FILE, overlap_guard=True)
+        self.maintenance = MaintenanceScheduler(self.db)
         self.config = {}
         self.holidays = []
         self.reload_config()
@@ -44,9 +49,15 @@ class MainWindow(QMainWindow):
             self.app_icon = self.style().standardIcon(QStyle.StandardPixmap.SP_BrowserStop)
             self.app_icon = app_icon
 
-        self.init_ui()
+        # Tabs are built the first time they are shown; dirty_tabs holds the built ones a write has left out of date.
+        self.tabs = None
+        self._tabs = {}
+        self.dirty_tabs = set()
+        # Started in the tray, the window's menus and tabs are only built once it is first opened.
+        self.start_in_tray = start_in_tray or self.config.get('start_in_tray', False)
+        if not self.start_in_tray:
+            self.init_ui()
         self.create_tray_icon()
-        self.general_tab.update_task_view()
         self.check_version()
         QTimer.singleShot(100, self.update_daily_working_times)
         QTimer.singleShot(1000, self.check_previous_day_workload)
@@ -58,6 +69,7 @@ class MainWindow(QMainWindow):
 
         self.backup_check_timer = QTimer(self)
         self.backup_check_timer.timeout.connect(self._handle_weekly_backup)
+        self.backup_check_timer.timeout.connect(self._run_idle_maintenance)
         # Check on startup, then every hour
         QTimer.singleShot(2000, self._handle_weekly_backup) 
         self.backup_check_timer.start(60 * 60 * 1000) # 1 hour
@@ -80,7 +92,7 @@ class MainWindow(QMainWindow):
             backup_filename = f"task_tracker_backup_{today_str}.db"
             backup_path = os.path.join(self.BACKUP_DIR, backup_filename)
 
-            shutil.copy2(self.DB_FILE, backup_path)
+            self.db.backup_to(backup_path)
             
             self.db.set_setting('last_backup_date', today_str)
             self.tray_icon.showMessage(
@@ -98,6 +110,18 @@ class MainWindow(QMainWindow):
                 15000
             )
 
+    def _is_idle(self):
+        """True while the app sits in the tray with no dialog open and no popup due soon."""
+        if self.isVisible() or QApplication.activeModalWidget() is not None:
+            return False
+        next_popup = self.get_next_popup_time()
+        return next_popup is None or next_popup - datetime.now() > timedelta(minutes=5)
+
+    def _run_idle_maintenance(self):
+        """Runs any due database maintenance jobs, but only while the app is idle."""
+        if self._is_idle():
+            self.maintenance.run_due_jobs()
+
     def _cleanup_old_backups(self):
         """Removes the oldest backup files if the count exceeds the configured limit."""
         max_backups = self.config.get('max_backups_to_keep', 4)
@@ -147,14 +171,22 @@ class MainWindow(QMainWindow):
         self.setMinimumSize(540, 400)
         
         self.tabs = QTabWidget()
-        self.general_tab = GeneralTab(parent=self, db=self.db, config=self.config)
-        self.timesheet_tab = TimesheetTab(parent=self, db=self.db, main_config=self.config)
-        self.travel_tab = TravelTab(parent=self, db=self.db)
-        self.qa83_tab = QA83Tab(parent=self, db=self.db)
+        # Each tab starts as an empty page; the tab itself is built into it when first shown.
+        self._pages = {}
+        for name, label in self.TABS:
+            page = QWidget()
+            QVBoxLayout(page).setContentsMargins(0, 0, 0, 0)
+            self._pages[name] = page
+            self.tabs.addTab(page, label)
         
         menu_bar = self.menuBar()
         style = self.style()
         file_menu = menu_bar.addMenu("&File")
+        batch_export_icon = style.standardIcon(QStyle.StandardPixmap.SP_DialogSaveButton)
+        batch_export_action = QAction(batch_export_icon, "Batch Export Reports...", self)
+        batch_export_action.triggered.connect(lambda: BatchExportWindow(self.db, parent=self).exec())
+        file_menu.addAction(batch_export_action)
+        file_menu.addSeparator()
         exit_icon = style.standardIcon(QStyle.StandardPixmap.SP_MessageBoxCritical)
         exit_action = QAction(exit_icon, "&Exit", self)
         exit_action.triggered.connect(QApplication.instance().quit)
@@ -175,9 +207,13 @@ class MainWindow(QMainWindow):
         
         qa83_icon = style.standardIcon(QStyle.StandardPixmap.SP_FileDialogContentsView)
         self.qa83_settings_action = QAction(qa83_icon, "QA83 Report Settings...", self)
-        self.qa83_settings_action.triggered.connect(self.qa83_tab._open_settings)
+        self.qa83_settings_action.triggered.connect(lambda: self.qa83_tab._open_settings())
         settings_menu.addAction(self.qa83_settings_action)
 
+        project_titles_action = QAction(qa83_icon, "Project Titles...", self)
+        project_titles_action.triggered.connect(lambda: self.qa83_tab._open_project_titles())
+        settings_menu.addAction(project_titles_action)
+
         about_menu = menu_bar.addMenu("&About")
         about_icon = style.standardIcon(QStyle.StandardPixmap.SP_MessageBoxInformation)
         about_action = QAction(about_icon, "&About Task Tracker", self)
@@ -193,35 +229,102 @@ class MainWindow(QMainWindow):
         show_schedule_action.triggered.connect(self._debug_show_schedule)
         debug_menu.addAction(show_schedule_action)
 
+        database_info_action = QAction("Database Info...", self)
+        database_info_action.triggered.connect(self._debug_show_database_info)
+        debug_menu.addAction(database_info_action)
+
         self.setCentralWidget(self.tabs)
         
-        self.tabs.addTab(self.general_tab, "General")
-        self.tabs.addTab(self.timesheet_tab, "Timesheet")
-        self.tabs.addTab(self.travel_tab, "Travel")
-        self.tabs.addTab(self.qa83_tab, "QA83")
-        
         self.tabs.currentChanged.connect(self.on_tab_changed)
         self.on_tab_changed(self.tabs.currentIndex())
 
+    def ensure_ui(self):
+        """Builds the window's menus and tabs if it started in the tray and has not been opened yet."""
+        if self.tabs is None:
+            self.init_ui()
+
+    @property
+    def general_tab(self):
+        return self._get_tab('general_tab')
+
+    @property
+    def timesheet_tab(self):
+        return self._get_tab('timesheet_tab')
+
+    @property
+    def travel_tab(self):
+        return self._get_tab('travel_tab')
+
+    @property
+    def qa83_tab(self):
+        return self._get_tab('qa83_tab')
+
+    def _get_tab(self, name):
+        """Returns the named tab, building it into its page the first time it is asked for."""
+        tab = self._tabs.get(name)
+        if tab is None:
+            self.ensure_ui()
+            if name == 'general_tab':
+                tab = GeneralTab(parent=self, db=self.db, config=self.config)
+            elif name == 'timesheet_tab':
+                tab = TimesheetTab(parent=self, db=self.db, main_config=self.config)
+            elif name == 'travel_tab':
+                tab = TravelTab(parent=self, db=self.db)
+            else:
+                tab = QA83Tab(parent=self, db=self.db)
+            self._tabs[name] = tab
+            self._pages[name].layout().addWidget(tab)
+            # A new tab is empty until its first refresh.
+            self.dirty_tabs.add(name)
+        return tab
+
     def on_tab_changed(self, index):
-        """Handler for when the user switches tabs."""
-        current_widget = self.tabs.widget(index)
-        
-        if current_widget == self.qa83_tab:
-            self.qa83_tab.handle_tab_focus()
-        elif current_widget == self.general_tab:
-            self.general_tab.update_task_view()
-        elif current_widget == self.timesheet_tab:
-            self.timesheet_tab.update_timesheet_view()
-        elif current_widget == self.travel_tab:
-            self.travel_tab.update_travel_view()
-    
+        """Handler for when the user switches tabs: builds the tab if it is new and refreshes it if it is dirty."""
+        if index < 0:
+            return
+        name = self.TABS[index][0]
+        self._get_tab(name)
+        self._refresh_tab_if_dirty(name, focused=True)
+
+    def _refresh_tab_if_dirty(self, name, focused=False):
+        """Refreshes a dirty tab, but only while the window is on screen; showEvent catches up on the rest."""
+        if name not in self.dirty_tabs or not self.isVisible():
+            return
+        self.dirty_tabs.discard(name)
+        tab = self._tabs[name]
+        if name == 'qa83_tab':
+            # Switching to the tab also asks for any project titles still missing.
+            if focused:
+                tab.handle_tab_focus()
+            else:
+                tab.update_qa83_view()
+        elif name == 'general_tab':
+            tab.update_task_view()
+        elif name == 'timesheet_tab':
+            tab.update_timesheet_view()
+        elif name == 'travel_tab':
+            tab.update_travel_view()
+
+    def _refresh_current_tab(self):
+        if self.tabs is not None:
+            self._refresh_tab_if_dirty(self.TABS[self.tabs.currentIndex()][0])
+
+    def mark_tabs_dirty(self, *names):
+        """
+        Marks the named tabs (all of them if none are named) as out of date after a
+        write. The tab on screen is refreshed now; the others wait until they are shown.
+        """
+        self.dirty_tabs.update(name for name in (names or [name for name, _ in self.TABS]) if name in self._tabs)
+        self._refresh_current_tab()
+
     def _refresh_all_tabs(self):
-        """Refreshes the data views in all relevant tabs."""
-        self.general_tab.update_task_view()
-        self.timesheet_tab.update_timesheet_view()
-        self.travel_tab.update_travel_view()
-        self.qa83_tab.update_qa83_view()
+        """Marks every tab out of date after a task was saved, refreshing only the one on screen."""
+        self.mark_tabs_dirty()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Catch up on anything written while the window sat in the tray.
+        self._refresh_current_tab()
 
     def _show_about_dialog(self):
         about_dialog = AboutWindow(version=self.APP_VERSION, parent=self)
@@ -238,8 +341,11 @@ class MainWindow(QMainWindow):
         settings_dialog = SettingsWindow(self)
         if settings_dialog.exec():
             self.reload_config()
-            self.general_tab.config = self.config
-            self.general_tab.update_task_view()
+            if 'general_tab' in self._tabs:
+                self.general_tab.config = self.config
+            if 'timesheet_tab' in self._tabs:
+                self.timesheet_tab.main_config = self.config
+            self.mark_tabs_dirty('general_tab', 'timesheet_tab')
             QMessageBox.information(self, "Settings Updated", "General settings and holidays saved. Changes are now active.")
     
     def _open_reminder_settings_window(self):
@@ -257,7 +363,7 @@ class MainWindow(QMainWindow):
         start_time = self.determine_start_time_for_date(self.general_tab.view_date)
         popup.start_time_edit.setTime(start_time)
         if popup.exec() == QDialog.DialogCode.Accepted:
-            self.general_tab.update_task_view()
+            self._refresh_all_tabs()
 
     def _debug_show_schedule(self):
         """Displays the current day's generated popup schedule in a message box."""
@@ -281,6 +387,9 @@ class MainWindow(QMainWindow):
         msg_box.setText(f"The following popups are scheduled for today:<br><br>{schedule_str}")
         msg_box.exec()
     
+    def _debug_show_database_info(self):
+        DatabaseInfoWindow(self.db, self.maintenance, parent=self).exec()
+
     def create_tray_icon(self):
         self.tray_icon = QSystemTrayIcon(self.app_icon, self)
         self.tray_icon.setToolTip("Task Tracker")
@@ -304,7 +413,7 @@ class MainWindow(QMainWindow):
             self.show_and_raise()
 
     def show_and_raise(self):
-        self.showNormal(); self.activateWindow()
+        self.ensure_ui(); self.showNormal(); self.activateWindow()
 
     def changeEvent(self, event):
         if event.type() == event.Type.WindowStateChange and self.windowState() & Qt.WindowState.WindowMinimized:
@@ -351,6 +460,7 @@ class MainWindow(QMainWindow):
 
         effective_start_time_str = effective_start_time.strftime("%H:%M:%S")
         self.db.add_work_times(today_str, effective_start_time_str, settings_snapshot)
+        self.mark_tabs_dirty('general_tab', 'timesheet_tab')
         self.schedule_popups_for_the_day()
 
     def check_for_wake_up(self):
@@ -499,7 +609,8 @@ class MainWindow(QMainWindow):
         self.schedule_next_popup_from_list()
 
     def manual_popup(self, start_time=None, end_time=None, has_subsequent_task=False):
-        popup_date = self.general_tab.view_date
+        # From the tray, before the window has been opened, there is no day on view yet.
+        popup_date = self._tabs['general_tab'].view_date if 'general_tab' in self._tabs else datetime.now().date()
         if start_time:
             popup_start_time = start_time
         else:
@@ -509,7 +620,7 @@ class MainWindow(QMainWindow):
         previous_task = self.db.get_task_before(lookup_dt)
         popup = Popup(self.db, previous_task, self.config, parent=self, is_manual_trigger=True)
         
-        popup.date_edit.setDate(QDate(self.general_tab.view_date))
+        popup.date_edit.setDate(QDate(popup_date))
 
         if start_time:
             popup.start_time_edit.setTime(QTime(start_time.hour, start_time.minute))
@@ -521,14 +632,14 @@ class MainWindow(QMainWindow):
                     temp_time = now_time.addSecs(30)
                     final_end_time = QTime(temp_time.hour(), temp_time.minute())
 
-            workday_end_py = popup._get_workday_end_time_for_date(self.general_tab.view_date)
+            workday_end_py = popup._get_workday_end_time_for_date(popup_date)
             if workday_end_py:
                 workday_end_qtime = QTime(workday_end_py.hour, workday_end_py.minute)
                 final_end_time = min(final_end_time, workday_end_qtime)
 
             popup.end_time_edit.setTime(final_end_time)
         else:
-            calculated_start_time = self.determine_start_time_for_date(self.general_tab.view_date)
+            calculated_start_time = self.determine_start_time_for_date(popup_date)
             popup.start_time_edit.setTime(calculated_start_time)
         
         if popup.exec() == QDialog.DialogCode.Accepted:
@@ -0,0 +1,146 @@
+# maintenance.py
+
+import json
+import math
+import time
+from datetime import datetime, timedelta
+
+# (key, label, minimum interval between successful runs, time budget in seconds)
+MAINTENANCE_JOBS = [
+    ('optimize', 'Optimize', timedelta(days=1), 1.0),
+    ('analyze', 'Analyze statistics', timedelta(days=7), 2.0),
+    ('incremental_vacuum', 'Incremental vacuum', timedelta(days=7), 2.0),
+    ('quick_check', 'Integrity quick check', timedelta(days=30), 3.0),
+    # Last, so pages rewritten by the jobs above are folded into the main file.
+    ('checkpoint', 'WAL checkpoint', timedelta(hours=1), 1.0),
+]
+
+# Upper bound for one idle pass, so a pass never holds the writer for long.
+RUN_BUDGET_SECONDS = 5.0
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+# After a failed or interrupted run a job waits this long before retrying, doubling
+# with each further failure up to its normal interval.
+RETRY_BACKOFF = timedelta(hours=1)
+
+
+class MaintenanceScheduler:
+    """
+    Runs the SQLite housekeeping jobs above when they are due, each under its own
+    time budget. Results are kept in app_settings as 'maintenance_<key>'.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def _statements(self, key):
+        if key == 'checkpoint':
+            return ['PRAGMA wal_checkpoint(TRUNCATE)']
+        if key == 'optimize':
+            return ['PRAGMA optimize']
+        if key == 'analyze':
+            return ['ANALYZE']
+        if key == 'incremental_vacuum':
+            return ['PRAGMA incremental_vacuum']
+        if key == 'quick_check':
+            return ['PRAGMA quick_check']
+        raise ValueError(f"Unknown maintenance job: {key}")
+
+    def get_last_run(self, key):
+        """Returns the stored result dict for a job, or None if it has never run."""
+        value = self.db.get_setting(f'maintenance_{key}')
+        return json.loads(value) if value else None
+
+    def is_due(self, key, interval, now=None):
+        last_run = self.get_last_run(key)
+        if not last_run:
+            return True
+        now = now or datetime.now()
+        if last_run.get('last_ok') and now - datetime.fromisoformat(last_run['last_ok']) < interval:
+            return False
+        # A job that keeps failing, e.g. one its budget always interrupts, is retried less and less often.
+        failures = last_run.get('failures', 0)
+        if failures:
+            backoff = min(RETRY_BACKOFF * 2 ** (failures - 1), interval)
+            return now - datetime.fromisoformat(last_run['last_run']) >= backoff
+        return True
+
+    def needs_vacuum_conversion(self):
+        """True if the file was created without incremental auto-vacuum, which incremental_vacuum needs."""
+        return self.db.get_storage_stats()['auto_vacuum'] != AUTO_VACUUM_INCREMENTAL
+
+    def run_job(self, key, budget_seconds):
+        """Runs one job and stores its outcome. Returns the status string."""
+        started = time.monotonic()
+        status = 'ok'
+        try:
+            if key == 'incremental_vacuum' and self.needs_vacuum_conversion():
+                # Switching needs a full VACUUM, too long for a budget; convert_to_incremental_vacuum does it on request.
+                status = 'skipped: auto-vacuum not incremental, compact from Database Info'
+            else:
+                for statement in self._statements(key):
+                    remaining = budget_seconds - (time.monotonic() - started)
+                    finished, rows = self.db.run_with_budget(statement, max(remaining, 0.05))
+                    if not finished:
+                        status = 'interrupted'
+                        break
+                    if key == 'quick_check' and rows != [('ok',)]:
+                        status = f"problems found: {rows[0][0]}"
+        except Exception as e:
+            status = f"error: {e}"
+        self._record(key, status, started)
+        return status
+
+    def convert_to_incremental_vacuum(self):
+        """
+        Switches the file to incremental auto-vacuum with one full VACUUM. It runs
+        without a time budget, holding the writer for as long as the VACUUM takes,
+        so it is only run when asked for. Returns the status string.
+        """
+        started = time.monotonic()
+        status = 'ok'
+        try:
+            for statement in ('PRAGMA auto_vacuum = INCREMENTAL', 'VACUUM'):
+                self.db.run_with_budget(statement, math.inf)
+        except Exception as e:
+            status = f"error: {e}"
+        # The full VACUUM has also done the incremental vacuum's work.
+        self._record('incremental_vacuum', status, started)
+        return status
+
+    def _record(self, key, status, started):
+        now_str = datetime.now().isoformat(timespec='seconds')
+        previous = self.get_last_run(key) or {}
+        record = {
+            'last_run': now_str,
+            'last_ok': now_str if status == 'ok' else previous.get('last_ok'),
+            'status': status,
+            'seconds': round(time.monotonic() - started, 3),
+            'failures': 0 if status == 'ok' else previous.get('failures', 0) + 1,
+        }
+        self.db.set_setting(f'maintenance_{key}', json.dumps(record))
+
+    def run_due_jobs(self, force=False):
+        """
+        Runs every due job (every job with force) until RUN_BUDGET_SECONDS is used up.
+        Returns a list of (label, status) for the jobs that ran.
+        """
+        results = []
+        started = time.monotonic()
+        for key, label, interval, budget in MAINTENANCE_JOBS:
+            if not force and not self.is_due(key, interval):
+                continue
+            remaining = RUN_BUDGET_SECONDS - (time.monotonic() - started)
+            if remaining <= 0 and not force:
+                break
+            results.append((label, self.run_job(key, budget if force else min(budget, remaining))))
+        return results
+
+    def get_history(self):
+        """Returns (label, last_run, status, seconds) for every job, None fields if never run."""
+        history = []
+        for key, label, _, _ in MAINTENANCE_JOBS:
+            last_run = self.get_last_run(key) or {}
+            history.append((label, last_run.get('last_run'), last_run.get('status'), last_run.get('seconds')))
+        return history
@@ -0,0 +1,117 @@
+# near_duplicates.py
+
+import re
+import zlib
+
+SHINGLE_SIZE = 5
+NUM_HASHES = 48
+BAND_ROWS = 4
+DEFAULT_THRESHOLD = 0.7
+
+_SEPARATOR_RE = re.compile(r'[\W_]+')
+# Larger than any crc32 value, so a borrowed value never equals a real one.
+_BORROW_OFFSET = 2 ** 32
+
+
+def normalize_text(text):
+    """Lower-cases text and collapses punctuation and whitespace runs into single spaces."""
+    return _SEPARATOR_RE.sub(' ', text.lower()).strip()
+
+
+def get_shingles(normalized_text):
+    """Returns the set of overlapping SHINGLE_SIZE-byte n-grams of a normalized text."""
+    data = normalized_text.encode('utf-8')
+    if len(data) <= SHINGLE_SIZE:
+        return {data} if data else set()
+    return {data[i:i + SHINGLE_SIZE] for i in range(len(data) - SHINGLE_SIZE + 1)}
+
+
+def get_minhash_signature(shingles):
+    """
+    Returns a MinHash signature of NUM_HASHES values using one-permutation hashing:
+    each shingle's hash picks a bin by its remainder and the smallest hash in a bin
+    is kept; empty bins borrow from the next filled bin. This needs one hash per
+    shingle instead of one per shingle and signature value. Returns None for an
+    empty set.
+    """
+    if not shingles:
+        return None
+    bins = {}
+    for hashed in map(zlib.crc32, shingles):
+        index = hashed % NUM_HASHES
+        if hashed < bins.get(index, _BORROW_OFFSET):
+            bins[index] = hashed
+    if len(bins) == NUM_HASHES:
+        return [bins[index] for index in range(NUM_HASHES)]
+    # Walk backwards twice around the bins so every empty bin has seen the next filled one.
+    signature = [0] * NUM_HASHES
+    borrowed, step = None, 0
+    for position in range(2 * NUM_HASHES - 1, -1, -1):
+        value = bins.get(position % NUM_HASHES)
+        if value is None:
+            step += 1
+        else:
+            borrowed, step = value, 0
+        if position < NUM_HASHES:
+            signature[position] = value if value is not None else borrowed + step * _BORROW_OFFSET
+    return signature
+
+
+def find_near_duplicate_clusters(items, threshold=DEFAULT_THRESHOLD):
+    """
+    Groups items whose texts are near-duplicates, comparing only items of the same
+    project. items is a list of (key, project_code, plain_text). Identical texts are
+    joined directly; other candidate pairs come from LSH banding of MinHash
+    signatures and are confirmed by their exact shingle Jaccard similarity.
+    Confirmed pairs are joined with union-find. Returns clusters of two or more
+    keys, each in item order, ordered by their first item.
+    """
+    parent = list(range(len(items)))
+
+    def find(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    def union(first, second):
+        first_root, second_root = find(first), find(second)
+        if first_root != second_root:
+            parent[max(first_root, second_root)] = min(first_root, second_root)
+
+    # Only the first item of each distinct text is hashed; the others join it.
+    distinct, shingle_sets = {}, {}
+    for index, (_, project_code, text) in enumerate(items):
+        text_key = (project_code, normalize_text(text))
+        if text_key in distinct:
+            union(distinct[text_key], index)
+        else:
+            distinct[text_key] = index
+            shingle_sets[index] = get_shingles(text_key[1])
+
+    buckets = {}
+    for (project_code, _), index in distinct.items():
+        signature = get_minhash_signature(shingle_sets[index])
+        if signature is None:
+            continue
+        for band_start in range(0, NUM_HASHES, BAND_ROWS):
+            buckets.setdefault((project_code, band_start, *signature[band_start:band_start + BAND_ROWS]), []).append(index)
+
+    # A pair can share several bands; check it once.
+    checked = set()
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        for position, first in enumerate(members):
+            for second in members[position + 1:]:
+                if (first, second) in checked or find(first) == find(second):
+                    continue
+                checked.add((first, second))
+                first_set, second_set = shingle_sets[first], shingle_sets[second]
+                if len(first_set & second_set) >= threshold * len(first_set | second_set):
+                    union(first, second)
+
+    clusters = {}
+    for index, (key, _, _) in enumerate(items):
+        clusters.setdefault(find(index), []).append(key)
+    return [keys for root, keys in sorted(clusters.items()) if len(keys) > 1]
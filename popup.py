@@ -406,17 +406,18 @@ class Popup(QDialog):
             QMessageBox.warning(self, "Invalid Time", f"Cannot log tasks on a non-working day ({day_name}).")
             return
             
-        tasks = self.db.get_tasks_for_date(date_str)
         work_start_t = None
         if work_times_row:
             work_start_t = time.fromisoformat(work_times_row[1])
-        elif tasks:
-            earliest_task_t = time.fromisoformat(tasks[0][2])
-            lower_bound = time.fromisoformat(day_rules['lower'])
-            upper_bound = time.fromisoformat(day_rules['upper'])
-            work_start_t = earliest_task_t if lower_bound <= earliest_task_t <= upper_bound else upper_bound
         else:
-            work_start_t = time.fromisoformat(day_rules['upper'])
+            tasks = self.db.get_tasks_for_date(date_str)
+            if tasks:
+                earliest_task_t = time.fromisoformat(tasks[0][2])
+                lower_bound = time.fromisoformat(day_rules['lower'])
+                upper_bound = time.fromisoformat(day_rules['upper'])
+                work_start_t = earliest_task_t if lower_bound <= earliest_task_t <= upper_bound else upper_bound
+            else:
+                work_start_t = time.fromisoformat(day_rules['upper'])
         work_start_dt = datetime.combine(selected_date, work_start_t)
         lunch_s = time.fromisoformat(day_rules['lunch_s'])
         lunch_e = time.fromisoformat(day_rules['lunch_e'])
@@ -432,41 +433,22 @@ class Popup(QDialog):
         if task_start_dt >= lunch_start_dt and task_end_dt <= lunch_end_dt:
             QMessageBox.warning(self, "Invalid Time", "Cannot log tasks during lunch hour.")
             return
-        preliminary_slots = []
         task_start_dt = max(task_start_dt, work_start_dt)
         task_end_dt = min(task_end_dt, work_end_dt)
-        if task_start_dt < lunch_start_dt and task_end_dt > lunch_end_dt:
-            preliminary_slots.append((task_start_dt, lunch_start_dt))
-            preliminary_slots.append((lunch_end_dt, task_end_dt))
-        else:
-            if task_start_dt >= lunch_start_dt and task_start_dt < lunch_end_dt: task_start_dt = lunch_end_dt
-            if task_end_dt > lunch_start_dt and task_end_dt <= lunch_end_dt: task_end_dt = lunch_start_dt
-            if task_start_dt < task_end_dt:
-                preliminary_slots.append((task_start_dt, task_end_dt))
-        if not preliminary_slots:
+        if task_start_dt >= task_end_dt:
             QMessageBox.warning(self, "Invalid Time", "Task has no duration after adjusting for work/lunch hours.")
             return
-        existing_tasks = self.db.get_tasks_for_date(date_str)
         project_code = self.project_code_input.text()
         description = self.description_input.toHtml()
         categories = ",".join([cb.text() for cb in self.category_checkboxes if cb.isChecked()])
         software = "" # Software field is no longer used
-        tasks_added = 0
-        for slot_start, slot_end in preliminary_slots:
-            candidate_start = slot_start
-            for task_row in existing_tasks:
-                existing_start = datetime.combine(selected_date, datetime.strptime(task_row[2], '%H:%M:%S').time())
-                existing_end = datetime.combine(selected_date, datetime.strptime(task_row[3], '%H:%M:%S').time())
-                if candidate_start < existing_start:
-                    sub_slot_end = min(slot_end, existing_start)
-                    if candidate_start < sub_slot_end:
-                        self.db.add_task(date_str, candidate_start.strftime("%H:%M:%S"), sub_slot_end.strftime("%H:%M:%S"), project_code, description, categories, software)
-                        tasks_added += 1
-                candidate_start = max(candidate_start, existing_end)
-                if candidate_start >= slot_end: break
-            if candidate_start < slot_end:
-                self.db.add_task(date_str, candidate_start.strftime("%H:%M:%S"), slot_end.strftime("%H:%M:%S"), project_code, description, categories, software)
-                tasks_added += 1
+        # The lunch hour is passed as an excluded range, so the entry is split around
+        # it in the same transaction that splits it around existing tasks.
+        tasks_added = self.db.add_task_in_free_time(
+            date_str, task_start_dt.strftime("%H:%M:%S"), task_end_dt.strftime("%H:%M:%S"),
+            project_code, description, categories, software,
+            excluded_ranges=[(lunch_start_dt.strftime("%H:%M:%S"), lunch_end_dt.strftime("%H:%M:%S"))]
+        )
         if tasks_added > 0:
             self.accept()
         else:
@@ -618,6 +600,14 @@ class EditTaskPopup(Popup):
         # Now we load the actual task data, overwriting the initial values.
         self.load_task_data()
 
+        # A task split at lunch or around other tasks is stored as several pieces.
+        # Offer to carry project, description and category changes to all of them.
+        self.entry_part_count = self.db.get_entry_part_count(self.task_id)
+        self.apply_to_entry_checkbox = QCheckBox(f"Apply project, description and categories to all {self.entry_part_count} parts of this entry")
+        self.apply_to_entry_checkbox.setChecked(True)
+        self.apply_to_entry_checkbox.setVisible(self.entry_part_count > 1)
+        self.layout().insertWidget(self.layout().indexOf(self.same_as_prev_checkbox), self.apply_to_entry_checkbox)
+
         # Hide/modify widgets that are not needed for editing
         self.same_as_prev_checkbox.hide()
         self.skip_button.hide()
@@ -626,7 +616,7 @@ class EditTaskPopup(Popup):
 
     def load_task_data(self):
         """Loads the existing task data into the dialog's widgets."""
-        _, task_date, start_time, end_time, proj_code, desc, cats, soft, _, _ = self.task_data
+        task_date, start_time, end_time, proj_code, desc, cats = self.task_data[1:7]
 
         self.date_edit.setDate(QDate.fromString(task_date, "yyyy-MM-dd"))
         self.start_time_edit.setTime(QTime.fromString(start_time, "HH:mm:ss"))
@@ -659,23 +649,14 @@ class EditTaskPopup(Popup):
         selected_date = self.date_edit.date().toPython()
         date_str = selected_date.strftime("%Y-%m-%d")
         
-        other_tasks = [t for t in self.db.get_tasks_for_date(date_str) if t[0] != self.task_id]
-
-        new_start_dt = datetime.combine(selected_date, start_qtime.toPython())
-        new_end_dt = datetime.combine(selected_date, end_qtime.toPython())
-
-        for task_row in other_tasks:
-            existing_start = datetime.combine(selected_date, time.fromisoformat(task_row[2]))
-            existing_end = datetime.combine(selected_date, time.fromisoformat(task_row[3]))
-            if new_start_dt < existing_end and new_end_dt > existing_start:
-                QMessageBox.warning(self, "Time Conflict", "The new time for this task overlaps with another existing task.")
-                return
-
         data = {
             'start_time': start_qtime.toString("HH:mm:ss"), 'end_time': end_qtime.toString("HH:mm:ss"),
             'project_code': project_code, 'description': description,
             'categories': categories, 'software': ""
         }
 
-        self.db.update_task_by_id(self.task_id, data)
+        apply_to_entry = self.entry_part_count > 1 and self.apply_to_entry_checkbox.isChecked()
+        if not self.db.update_task_if_free(self.task_id, date_str, data, apply_to_entry=apply_to_entry):
+            QMessageBox.warning(self, "Time Conflict", "The new time for this task overlaps with another existing task.")
+            return
         self.accept()
\ No newline at end of file
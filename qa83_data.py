@@ -0,0 +1,125 @@
+# qa83_data.py
+
+import calendar
+from datetime import date
+from functools import lru_cache
+
+WEEK_NUMBER_SUFFIX = {1: 'st', 2: 'nd', 3: 'rd'}
+
+
+@lru_cache(maxsize=64)
+def get_month_weeks_info(year, month):
+    """
+    Returns (week_headers, day_to_week_map, num_weeks) for a month, where weeks
+    run Monday to Sunday and are clipped to the month. The result is cached, so
+    callers must not modify it.
+    """
+    day_to_week_map, headers = {}, []
+    for week in calendar.monthcalendar(year, month):
+        week_days = [day for day in week if day != 0]
+        if not week_days: continue
+        week_num = len(headers) + 1; suffix = WEEK_NUMBER_SUFFIX.get(week_num, 'th')
+        start_date, end_date = date(year, month, week_days[0]), date(year, month, week_days[-1])
+        headers.append(f"{week_num}{suffix} Week\n({start_date.strftime('%d/%m')} -\n{end_date.strftime('%d/%m')})")
+        for day in week_days: day_to_week_map[day] = len(headers) - 1
+    return tuple(headers), day_to_week_map, len(headers)
+
+
+def get_progress_cells(weekly_hours, total_hours, start_progress_str, final_progress_str):
+    """
+    Spreads the progress between start and final over the weeks in proportion
+    to the hours worked. Returns one cell text per week, None where no work was
+    logged; a final progress of '-' marks worked weeks with '-'.
+    """
+    start_progress_str = start_progress_str or "0"
+    final_progress_str = final_progress_str or "100"
+    if final_progress_str == "-":
+        return ["-" if hours > 0.005 else None for hours in weekly_hours]
+    try:
+        start_progress = float(start_progress_str); final_progress = float(final_progress_str)
+    except (ValueError, TypeError):
+        return [None] * len(weekly_hours)
+    total_progress_gain = final_progress - start_progress
+    cells, cumulative_progress = [], start_progress
+    for hours in weekly_hours:
+        cumulative_progress += (hours / total_hours) * total_progress_gain if total_hours > 0 else 0
+        cells.append(f"{cumulative_progress:.0f}%" if hours > 0.005 else None)
+    return cells
+
+
+def build_qa83_view(db, year, month):
+    """
+    Computes the QA83 view for a month from the stored qa83_groups rows and the
+    month's progress. Returns a dict with:
+      'month_year', 'week_headers', 'num_weeks',
+      'projects': [(project_code, title, [group, ...])] sorted by project code,
+        each group a dict with 'group_id', 'description', 'original_key',
+        'is_merged', 'weekly_hours', 'total_hours', 'start_progress',
+        'final_progress' and 'progress_cells';
+      'untitled_codes': sorted project codes of QA83 groups without a title.
+    """
+    month_year_str = f"{year:04d}-{month:02d}"
+    week_headers, _, num_weeks = get_month_weeks_info(year, month)
+    progress = db.get_qa83_progress_for_month(month_year_str)
+
+    projects, untitled_codes, group_id_map = [], set(), {}
+    for row in db.get_qa83_groups_for_month(month_year_str):
+        group_id, proj_code, description, display_description, merged = row[:5]
+        weekly_hours, total_hours, title = list(row[5:5 + num_weeks]), row[11], row[12]
+        if not title: untitled_codes.add(proj_code)
+        # An unset start continues from the latest earlier month's final progress.
+        start, final, carried = progress.get((proj_code, description), (None, None, None))
+        start, final = start or carried or "0", final or "100"
+        group = {
+            "group_id": group_id, "description": display_description, "original_key": (proj_code, description),
+            "is_merged": bool(merged), "weekly_hours": weekly_hours, "total_hours": total_hours,
+            "start_progress": start, "final_progress": final,
+            "progress_cells": get_progress_cells(weekly_hours, total_hours, start, final),
+        }
+        # Two groups can share an original key; actions on either resolve to the last one.
+        group_id_map[group["original_key"]] = group_id
+        if not projects or projects[-1][0] != proj_code:
+            projects.append((proj_code, title or "", []))
+        projects[-1][2].append(group)
+    for _, _, groups in projects:
+        for group in groups: group["group_id"] = group_id_map[group["original_key"]]
+
+    return {
+        'month_year': month_year_str,
+        'week_headers': list(week_headers),
+        'num_weeks': num_weeks,
+        'projects': projects,
+        'untitled_codes': sorted(untitled_codes),
+    }
+
+
+def build_qa83_year_summary(db, year):
+    """
+    Computes every QA83 group's hours and final progress per month of a year from
+    one aggregated query. Groups in different months are the same group when they
+    share project code and original description. Returns a dict with:
+      'year',
+      'projects': [(project_code, title, [group, ...])] sorted by project code, each
+        group a dict with 'description' (plain text, from its latest month),
+        'original_key', 'hours' and 'final_progress' (12 entries each, None
+        for months without the group) and 'total_hours'.
+    """
+    projects, groups = [], {}
+    for proj_code, description, month_year, hours, plain_description, final, title in db.get_qa83_year_summary(year):
+        if not projects or projects[-1][0] != proj_code:
+            projects.append((proj_code, title or "", []))
+        group = groups.get((proj_code, description))
+        if group is None:
+            group = groups[(proj_code, description)] = {
+                "description": plain_description, "original_key": (proj_code, description),
+                "hours": [None] * 12, "final_progress": [None] * 12, "total_hours": 0.0,
+            }
+            projects[-1][2].append(group)
+        month_idx = int(month_year[5:7]) - 1
+        group["description"] = plain_description
+        group["hours"][month_idx] = hours; group["final_progress"][month_idx] = final or "100"
+        group["total_hours"] += hours
+    # Within a project, groups run in the order they first appear in the year.
+    for _, _, project_groups in projects:
+        project_groups.sort(key=lambda g: (next(i for i, h in enumerate(g["hours"]) if h is not None), g["description"] or ""))
+    return {'year': year, 'projects': projects}
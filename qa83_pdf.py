@@ -0,0 +1,79 @@
+# qa83_pdf.py
+
+import html
+
+from html_text import html_to_plain_text
+from qa83_data import WEEK_NUMBER_SUFFIX
+from report_cache import make_fingerprint
+
+# ZapfDingbats '4' is a tick; the Yes column is set in that font.
+COMPLIANCE_TICK = '4'
+# Part of every cached PDF's fingerprint: bump it whenever the PDF written for the same data changes.
+QA83_PDF_RENDERER_VERSION = 1
+
+
+def get_qa83_pdf_fingerprint(db, year, month, name, designation):
+    """Returns the fingerprint of everything a month's PDF report depends on, for ReportCache."""
+    return make_fingerprint('pdf', QA83_PDF_RENDERER_VERSION, db.get_qa83_data_version(f"{year:04d}-{month:02d}"),
+                            name, designation)
+
+
+def build_pdf_table(view, cell_style, progress_callback=None):
+    """
+    Returns (table_data, spans) for ReportGenerator.generate_report from a view from
+    build_qa83_view. Text cells are Paragraphs in cell_style so they wrap in their
+    columns. progress_callback, if given, receives (rows built, total).
+    """
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.platypus import Paragraph
+
+    header_style = ParagraphStyle('TableHeader', parent=cell_style, fontName='Helvetica-Bold', alignment=TA_CENTER)
+    headers = ["Job No.", "Project Title", "Description of Work Done"]
+    headers += [f"{week_num}<super>{WEEK_NUMBER_SUFFIX.get(week_num, 'th')}</super> Week"
+                for week_num in range(1, view['num_weeks'] + 1)]
+    headers += ["Name / Initial", "Date", "Yes", "No", "Remarks / Comments"]
+    table_data, spans = [[Paragraph(text, header_style) for text in headers]], []
+
+    total_rows = sum(len(groups) for _, _, groups in view['projects'])
+    for proj_code, title, groups in view['projects']:
+        first_row = len(table_data)
+        for number, group in enumerate(groups, start=1):
+            description = html.escape(html_to_plain_text(group['description'])).replace('\n', '<br/>')
+            row = [proj_code or "", Paragraph(html.escape(title), cell_style)] if number == 1 else ["", ""]
+            row.append(Paragraph(f"{number}) {description}", cell_style))
+            row += [cell_text or "" for cell_text in group['progress_cells']]
+            table_data.append(row + ["", "", COMPLIANCE_TICK, "", ""])
+            if progress_callback and (len(table_data) - 1) % 100 == 0:
+                progress_callback(len(table_data) - 1, total_rows)
+        if len(groups) > 1:
+            spans.append(('SPAN', (0, first_row), (0, len(table_data) - 1)))
+            spans.append(('SPAN', (1, first_row), (1, len(table_data) - 1)))
+    if progress_callback:
+        progress_callback(total_rows, total_rows)
+    return table_data, spans
+
+
+def run_pdf_export(view, path, name, designation, month_year, messages):
+    """
+    Child process entry point: writes the QA83 PDF for a view to path. Posts
+    ('rows', built, total) and ('page', number) while working, then ('done', path)
+    or ('error', message), on the messages queue. reportlab is only imported here,
+    so the GUI process never loads it.
+    """
+    try:
+        from report_generator import ReportGenerator
+
+        generator = ReportGenerator(path, name, designation, month_year)
+        table_data, spans = build_pdf_table(
+            view, generator.cell_style, lambda built, total: messages.put(('rows', built, total)))
+
+        def on_layout_progress(event, value):
+            if event == 'PAGE':
+                messages.put(('page', value))
+
+        generator.generate_report(table_data, spans, view['num_weeks'], on_layout_progress)
+    except Exception as e:
+        messages.put(('error', str(e)))
+    else:
+        messages.put(('done', path))
@@ -0,0 +1,231 @@
+# qa83_report.py
+
+import html
+import multiprocessing
+import os
+import queue
+import re
+import shutil
+from datetime import date
+from PySide6.QtCore import QObject, QThread, QTimer, Signal
+
+from claims_report import get_template_path
+from qa83_data import WEEK_NUMBER_SUFFIX, build_qa83_view
+from qa83_pdf import run_pdf_export
+from report_cache import hash_file, make_fingerprint
+
+QA83_TEMPLATE = 'report_template.html'
+# Part of every cached report's fingerprint: bump it whenever the HTML written for the same data changes.
+QA83_RENDERER_VERSION = 1
+# Reviewed by (name, date), compliance (yes, no) and remarks; compliance defaults to yes.
+REVIEW_CELLS_HTML = "<td></td><td></td><td>&#10003;</td><td></td><td></td>"
+
+_PLACEHOLDER_RE = re.compile(r'\{\{(\w+)\}\}')
+_compiled_templates = {}
+
+
+def compile_template(template_path):
+    """
+    Splits a template into alternating literal text and placeholder names, so that
+    rendering is a single pass of writes. Cached per path until the file changes.
+    """
+    modified = os.path.getmtime(template_path)
+    cached = _compiled_templates.get(template_path)
+    if cached and cached[0] == modified:
+        return cached[1]
+    with open(template_path, 'r', encoding='utf-8') as f:
+        parts = _PLACEHOLDER_RE.split(f.read())
+    _compiled_templates[template_path] = (modified, parts)
+    return parts
+
+
+def get_template_fields(num_weeks, name, designation, month_year):
+    """Returns the values of every template placeholder except table_rows for a month with num_weeks weeks."""
+    week_headers = []
+    for week_num in range(1, num_weeks + 1):
+        week_headers.append(f"<th>{week_num}<sup>{WEEK_NUMBER_SUFFIX.get(week_num, 'th')}</sup> Week</th>")
+    return {
+        'name': html.escape(name), 'designation': html.escape(designation), 'month_year': month_year,
+        # The description column gives up the width the week columns take, 35% at five weeks.
+        'description_width': str(55 - 4 * num_weeks),
+        'week_columns': "\n    ".join(['<col style="width:4%">'] * num_weeks),
+        'week_headers': "\n      ".join(week_headers),
+        'week_count': str(num_weeks),
+        'column_count': str(8 + num_weeks),
+        'designation_span': str(3 + num_weeks),
+        'footer_span': str(2 + num_weeks),
+    }
+
+
+def number_description(description_html, number):
+    """Puts 'number) ' at the start of the description's first paragraph, or before it if it has none."""
+    p_tag_pos = description_html.lower().find('<p')
+    if p_tag_pos != -1:
+        first_tag_end = description_html.find('>', p_tag_pos)
+        if first_tag_end != -1:
+            return f"{description_html[:first_tag_end + 1]}{number}) {description_html[first_tag_end + 1:]}"
+    return f"{number}) {description_html}"
+
+
+def iter_report_rows(view):
+    """Yields the report's table rows as HTML, one per task group, numbered within each project."""
+    for proj_code, title, groups in view['projects']:
+        for number, group in enumerate(groups, start=1):
+            row_html = "<tr>"
+            if number == 1:
+                row_html += f'<td class="proj-code" rowspan="{len(groups)}">{html.escape(proj_code or "")}</td>'
+                row_html += f'<td class="title" rowspan="{len(groups)}">{html.escape(title)}</td>'
+            row_html += f'<td class="desc">{number_description(group["description"] or "", number)}</td>'
+            row_html += "".join(f"<td>{cell_text or ''}</td>" for cell_text in group["progress_cells"])
+            yield row_html + REVIEW_CELLS_HTML + "</tr>"
+
+
+def write_qa83_report(path, view, name, designation, month_year, progress_callback=None):
+    """
+    Writes the QA83 report for a view from build_qa83_view to path, streaming the
+    rows into the file. progress_callback, if given, receives (rows written, total).
+    """
+    fields = get_template_fields(view['num_weeks'], name, designation, month_year)
+    total_rows = sum(len(groups) for _, _, groups in view['projects'])
+    with open(path, 'w', encoding='utf-8') as f:
+        for index, part in enumerate(compile_template(get_template_path(QA83_TEMPLATE))):
+            if index % 2 == 0:
+                f.write(part)
+            elif part == 'table_rows':
+                for row_index, row_html in enumerate(iter_report_rows(view)):
+                    f.write(f"\n{row_html}" if row_index else row_html)
+                    if progress_callback and (row_index + 1) % 100 == 0:
+                        progress_callback(row_index + 1, total_rows)
+            else:
+                f.write(fields.get(part, f"{{{{{part}}}}}"))
+    if progress_callback:
+        progress_callback(total_rows, total_rows)
+
+
+def get_qa83_fingerprint(db, year, month, name, designation):
+    """Returns the fingerprint of everything a month's HTML report depends on, for ReportCache."""
+    return make_fingerprint('html', QA83_RENDERER_VERSION, db.get_qa83_data_version(f"{year:04d}-{month:02d}"),
+                            name, designation, hash_file(get_template_path(QA83_TEMPLATE)))
+
+
+def write_qa83_report_cached(db, year, month, path, name, designation, cache, progress_callback=None):
+    """
+    Writes a month's HTML report to path, copying it from cache when nothing it
+    depends on changed since it was last generated, and storing it otherwise.
+    Returns True if the cached copy was used.
+    """
+    month_year = f"{year:04d}-{month:02d}"
+    # Read before the data, so a change made while rendering can only make the entry miss later.
+    fingerprint = get_qa83_fingerprint(db, year, month, name, designation)
+    cached_path = cache.lookup('qa83', month_year, fingerprint, '.html')
+    if cached_path:
+        shutil.copyfile(cached_path, path)
+        return True
+    write_qa83_report(path, build_qa83_view(db, year, month), name, designation,
+                      date(year, month, 1).strftime('%B %Y'), progress_callback)
+    try:
+        cache.store('qa83', month_year, fingerprint, path)
+    except OSError:
+        pass  # The report itself was written; it just will not be reused.
+    return False
+
+
+class QA83ReportWorker(QThread):
+    """
+    Builds a month's QA83 view and writes its HTML report off the GUI thread, or
+    copies the cached report if nothing changed. succeeded carries (path, from cache).
+    """
+    progress = Signal(int, int)
+    succeeded = Signal(str, bool)
+    failed = Signal(str)
+
+    def __init__(self, db, year, month, path, name, designation, cache, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.year = year
+        self.month = month
+        self.path = path
+        self.name = name
+        self.designation = designation
+        self.cache = cache
+
+    def run(self):
+        try:
+            from_cache = write_qa83_report_cached(self.db, self.year, self.month, self.path, self.name,
+                                                  self.designation, self.cache, self.progress.emit)
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.succeeded.emit(self.path, from_cache)
+        finally:
+            self.db.release_thread_connection()
+
+
+class QA83PdfExport(QObject):
+    """
+    Writes a QA83 PDF with reportlab in a separate process, so its memory and CPU
+    use stay out of the GUI, and relays the child's progress through signals.
+    progress carries (label, value, maximum); a maximum of 0 means page layout,
+    whose length is not known in advance.
+    """
+    progress = Signal(str, int, int)
+    succeeded = Signal(str)
+    failed = Signal(str)
+
+    def __init__(self, view, path, name, designation, month_year, parent=None):
+        super().__init__(parent)
+        self.path = path
+        # spawn on every platform: a fork would copy the Qt state of the GUI process.
+        context = multiprocessing.get_context('spawn')
+        self.messages = context.Queue()
+        self.process = context.Process(
+            target=run_pdf_export, args=(view, path, name, designation, month_year, self.messages), daemon=True)
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(100)
+        self.poll_timer.timeout.connect(self._poll_messages)
+
+    def start(self):
+        self.process.start()
+        self.poll_timer.start()
+
+    def cancel(self):
+        """Stops the export and removes the partly written file."""
+        if not self.poll_timer.isActive():
+            return
+        self.poll_timer.stop()
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        if os.path.exists(self.path):
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def _poll_messages(self):
+        # Checked before draining: once the child has exited, everything it sent is
+        # already in the pipe, so an empty queue then means it died without a result.
+        running = self.process.is_alive()
+        while True:
+            try:
+                message = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] == 'rows':
+                self.progress.emit("Preparing rows...", message[1], message[2])
+            elif message[0] == 'page':
+                self.progress.emit(f"Laying out page {message[1]}...", 0, 0)
+            else:
+                self._finish()
+                if message[0] == 'done':
+                    self.succeeded.emit(message[1])
+                else:
+                    self.failed.emit(message[1])
+                return
+        if not running:
+            self._finish()
+            self.failed.emit(f"The PDF export process stopped unexpectedly (exit code {self.process.exitcode}).")
+
+    def _finish(self):
+        self.poll_timer.stop()
+        self.process.join()
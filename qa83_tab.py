@@ -1,20 +1,28 @@
 # qa83_tab.py
 
+import csv
 import json
 import os
-import sys  # <--- ADDED IMPORT
-from collections import defaultdict
+import shutil
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                              QLabel, QTableWidget, QTableWidgetItem, QDialog,
                              QGroupBox, QGridLayout, QCalendarWidget, QHeaderView,
                              QAbstractItemView, QLineEdit, QFormLayout, QComboBox,
                              QTextEdit, QMessageBox, QFileDialog, QListWidget, QListWidgetItem,
-                             QCheckBox, QSizePolicy)
+                             QCheckBox, QSizePolicy, QProgressDialog)
 from PySide6.QtCore import Qt, QDate, QUrl, QEvent, QTimer, QStandardPaths
-from PySide6.QtGui import QTextDocument, QIntValidator, QKeySequence, QDesktopServices, QFont
-from datetime import datetime, time
+from PySide6.QtGui import QTextDocument, QIntValidator, QKeySequence, QDesktopServices, QFont, QColor
+from datetime import datetime
 import calendar
-from timesheet_tab import CopyableTableWidget
+from timesheet_tab import CopyableTableWidget, CopyableTableView
+from table_models import RowTableModel, RichTextDelegate, VisibleRowResizer, RICH_TEXT_ROLE
+from qa83_data import build_qa83_view, build_qa83_year_summary
+from near_duplicates import find_near_duplicate_clusters
+from qa83_report import QA83ReportWorker, QA83PdfExport
+from qa83_pdf import get_qa83_pdf_fingerprint
+from report_cache import ReportCache
+from view_cache import ViewCache, make_debounce_timer
+from render_cache import render_description
 
 class QA83SettingsDialog(QDialog):
     """Dialog to edit name and designation for QA83 reports."""
@@ -30,15 +38,90 @@ class QA83SettingsDialog(QDialog):
         button_box.addStretch(); button_box.addWidget(cancel_button); button_box.addWidget(ok_button); layout.addRow(button_box)
     def get_values(self): return self.name_input.text(), self.designation_input.text()
 
-class ProjectTitleDialog(QDialog):
-    def __init__(self, project_code, parent=None):
+class ProjectTitlesDialog(QDialog):
+    """Dialog to enter the titles of many projects at once, by hand or from a CSV file."""
+    def __init__(self, projects, message=None, parent=None):
         super().__init__(parent)
-        self.setWindowTitle("Enter Project Title"); layout = QFormLayout(self)
-        layout.addRow(QLabel(f"No title found for project code: <b>{project_code}</b>")); self.title_input = QLineEdit()
-        layout.addRow("Project Title:", self.title_input); button_box = QHBoxLayout()
-        ok_button = QPushButton("Save Title"); ok_button.setDefault(True); ok_button.clicked.connect(self.accept)
-        button_box.addStretch(); button_box.addWidget(ok_button); layout.addRow(button_box); self.title_input.setFocus()
-    def get_title(self): return self.title_input.text().strip()
+        self.setWindowTitle("Project Titles")
+        self.setMinimumSize(560, 360)
+        self.original_titles = {}
+        layout = QVBoxLayout(self)
+        if message:
+            layout.addWidget(QLabel(message))
+
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["Project Code", "Project Title", "Last Used", "Entries"])
+        self.table.verticalHeader().hide()
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
+        for code, title, _, last_used, entry_count in projects:
+            self._add_row(code, title or "", last_used or "", entry_count)
+        layout.addWidget(self.table)
+
+        hint_label = QLabel("<i>Double-click a title to edit it. CSV files need the project code in the first column and the title in the second.</i>")
+        hint_label.setStyleSheet("font-size: 9px; color: gray;")
+        hint_label.setWordWrap(True)
+        layout.addWidget(hint_label)
+
+        button_box = QHBoxLayout()
+        import_button = QPushButton("Import CSV...")
+        import_button.clicked.connect(self._import_csv)
+        ok_button = QPushButton("Save Titles"); ok_button.setDefault(True); ok_button.clicked.connect(self.accept)
+        cancel_button = QPushButton("Cancel"); cancel_button.clicked.connect(self.reject)
+        button_box.addWidget(import_button); button_box.addStretch(); button_box.addWidget(cancel_button); button_box.addWidget(ok_button)
+        layout.addLayout(button_box)
+
+    def _add_row(self, code, title, last_used="", entry_count=0):
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        self.original_titles[code] = title
+        read_only_flags = Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEnabled
+        code_item = QTableWidgetItem(code); code_item.setFlags(read_only_flags)
+        self.table.setItem(row, 0, code_item)
+        self.table.setItem(row, 1, QTableWidgetItem(title))
+        last_used_item = QTableWidgetItem(last_used); last_used_item.setFlags(read_only_flags)
+        self.table.setItem(row, 2, last_used_item)
+        count_item = QTableWidgetItem(str(entry_count or 0)); count_item.setFlags(read_only_flags)
+        count_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.table.setItem(row, 3, count_item)
+        return row
+
+    def _import_csv(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, "Import Project Titles", "", "CSV Files (*.csv);;All Files (*)")
+        if not file_path: return
+        rows_by_code = {self.table.item(row, 0).text(): row for row in range(self.table.rowCount())}
+        imported = 0
+        try:
+            with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+                for line_no, record in enumerate(csv.reader(f)):
+                    if len(record) < 2: continue
+                    code, title = record[0].strip(), record[1].strip()
+                    if not code or not title: continue
+                    if line_no == 0 and 'code' in code.lower() and code not in rows_by_code: continue  # Header row
+                    row = rows_by_code.get(code)
+                    if row is None:
+                        row = self._add_row(code, "")
+                        self.original_titles[code] = None
+                        rows_by_code[code] = row
+                    self.table.item(row, 1).setText(title)
+                    imported += 1
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            QMessageBox.critical(self, "Import Failed", f"Could not read the CSV file: {e}")
+            return
+        QMessageBox.information(self, "Import Complete", f"{imported} project title(s) imported. Review them and click 'Save Titles'.")
+
+    def get_titles(self):
+        """Returns {code: title} for every title that was added or changed."""
+        titles = {}
+        for row in range(self.table.rowCount()):
+            code = self.table.item(row, 0).text()
+            title = self.table.item(row, 1).text().strip()
+            if title and title != self.original_titles.get(code):
+                titles[code] = title
+        return titles
 
 class MergeTasksDialog(QDialog):
     def __init__(self, task_groups, parent=None):
@@ -52,9 +135,7 @@ class MergeTasksDialog(QDialog):
         self.master_task_combo = QComboBox()
         all_descriptions_html = []
         for proj_code, html_desc in self.task_groups:
-            doc = QTextDocument()
-            doc.setHtml(html_desc)
-            self.master_task_combo.addItem(f"{proj_code} - {doc.toPlainText()[:80]}...")
+            self.master_task_combo.addItem(f"{proj_code} - {render_description(html_desc).plain_text[:80]}...")
             all_descriptions_html.append(html_desc)
 
         self.merged_desc_input = QTextEdit()
@@ -122,6 +203,44 @@ class MergeTasksDialog(QDialog):
         
         return self.task_groups[master_index], merged_description_html
 
+class SuggestedMergesDialog(QDialog):
+    """Lists clusters of near-duplicate task groups; each can be opened in the merge dialog."""
+    def __init__(self, clusters, plain_texts, merge_callback, parent=None):
+        super().__init__(parent)
+        self.merge_callback = merge_callback
+        self.setWindowTitle("Suggested Merges")
+        self.setMinimumSize(600, 400)
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("These task groups have nearly identical descriptions. Select one to merge it."))
+
+        self.cluster_list = QListWidget()
+        self.cluster_list.setWordWrap(True)
+        for task_groups in clusters:
+            lines = [f"{task_groups[0][0]} - {len(task_groups)} task groups"]
+            lines += [f"    {plain_texts[key][:100]}" for key in task_groups]
+            item = QListWidgetItem("\n".join(lines))
+            item.setData(Qt.ItemDataRole.UserRole, task_groups)
+            self.cluster_list.addItem(item)
+        self.cluster_list.itemDoubleClicked.connect(self._merge_item)
+        layout.addWidget(self.cluster_list)
+
+        button_box = QHBoxLayout()
+        merge_button = QPushButton("Merge Selected...")
+        merge_button.setDefault(True)
+        merge_button.clicked.connect(lambda: self._merge_item(self.cluster_list.currentItem()))
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.accept)
+        button_box.addStretch()
+        button_box.addWidget(close_button)
+        button_box.addWidget(merge_button)
+        layout.addLayout(button_box)
+
+    def _merge_item(self, item):
+        if item is None: return
+        task_groups = [tuple(key) for key in item.data(Qt.ItemDataRole.UserRole)]
+        if self.merge_callback(task_groups):
+            self.cluster_list.takeItem(self.cluster_list.row(item))
+
 class OverrideDescriptionDialog(QDialog):
     def __init__(self, current_description_html, parent=None):
         super().__init__(parent)
@@ -242,6 +361,89 @@ class ProgressInputDialog(QDialog):
         
         return start_progress, final_progress
 
+class ProgressHistoryDialog(QDialog):
+    """Read-only table of a task group's hours and progress in every month it appears."""
+    def __init__(self, project_code, description, history, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Progress History")
+        self.setMinimumSize(500, 320)
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(f"<b>Project:</b> {project_code}"))
+        task_label = QLabel(f"<b>Task:</b> {description}"); task_label.setWordWrap(True); layout.addWidget(task_label)
+
+        self.table = CopyableTableWidget(len(history), 4)
+        self.table.setHorizontalHeaderLabels(["Month", "Hours", "Start (%)", "Final (%)"])
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        carried = None
+        for row, (month_year, hours, start, final) in enumerate(history):
+            # Same rule as the month view: an unset start continues from the last numeric final.
+            start_text = start or (f"{carried} (carried)" if carried else "0")
+            if final and final.isdigit(): carried = final
+            values = [datetime.strptime(month_year, '%Y-%m').strftime('%B %Y'), f"{hours or 0.0:.2f}", start_text, final or "100"]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if col > 0: item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                self.table.setItem(row, col, item)
+        layout.addWidget(self.table)
+
+        button_box = QHBoxLayout()
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.accept)
+        button_box.addStretch()
+        button_box.addWidget(close_button)
+        layout.addLayout(button_box)
+
+class QA83YearSummaryDialog(QDialog):
+    """Every QA83 task group's monthly hours and final progress for a year, side by side."""
+    def __init__(self, db, year, parent=None):
+        super().__init__(parent)
+        self.db = db; self.year = year
+        self.setWindowTitle("QA83 Year Summary")
+        self.resize(1200, 600)
+        layout = QVBoxLayout(self)
+
+        nav_layout = QHBoxLayout()
+        prev_button = QPushButton("<"); prev_button.clicked.connect(lambda: self._show_year(self.year - 1))
+        next_button = QPushButton(">"); next_button.clicked.connect(lambda: self._show_year(self.year + 1))
+        self.year_label = QLabel(); self.year_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        nav_layout.addWidget(prev_button); nav_layout.addWidget(self.year_label, 1); nav_layout.addWidget(next_button)
+        layout.addLayout(nav_layout)
+
+        self.table = CopyableTableWidget()
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        layout.addWidget(self.table)
+        hint_label = QLabel("<i>Each month shows the hours logged and the final progress. Select cells and press Ctrl+C to copy.</i>")
+        hint_label.setStyleSheet("font-size: 9px; color: gray;")
+        layout.addWidget(hint_label)
+        self._show_year(year)
+
+    def _show_year(self, year):
+        self.year = year; self.year_label.setText(str(year))
+        summary = build_qa83_year_summary(self.db, year)
+        headers = ["Project Code", "Project Title", "Description"] + [calendar.month_abbr[m] for m in range(1, 13)] + ["Total Hours"]
+        self.table.clearContents(); self.table.clearSpans()
+        self.table.setColumnCount(len(headers)); self.table.setHorizontalHeaderLabels(headers)
+        self.table.setRowCount(sum(len(groups) for _, _, groups in summary['projects']))
+        row = 0
+        for proj_code, title, groups in summary['projects']:
+            self.table.setItem(row, 0, QTableWidgetItem(proj_code)); self.table.setItem(row, 1, QTableWidgetItem(title))
+            if len(groups) > 1: self.table.setSpan(row, 0, len(groups), 1); self.table.setSpan(row, 1, len(groups), 1)
+            for group in groups:
+                self.table.setItem(row, 2, QTableWidgetItem(group["description"]))
+                for month_idx, (hours, final) in enumerate(zip(group["hours"], group["final_progress"])):
+                    if hours is None: continue
+                    text = f"{hours:.1f} h" if final == "-" else f"{hours:.1f} h ({final}%)"
+                    item = QTableWidgetItem(text); item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                    self.table.setItem(row, 3 + month_idx, item)
+                total_item = QTableWidgetItem(f"{group['total_hours']:.1f}"); total_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                self.table.setItem(row, 15, total_item)
+                row += 1
+        self.table.resizeColumnsToContents()
+        self.table.setColumnWidth(2, min(self.table.columnWidth(2), 400))
+
 class EditMergedTaskDialog(QDialog):
     def __init__(self, master_id, db, parent=None):
         super().__init__(parent)
@@ -275,10 +477,7 @@ class EditMergedTaskDialog(QDialog):
         for task in self.tasks_in_group:
             if task[0] == self.master_id: continue
             
-            doc = QTextDocument()
-            doc.setHtml(task[5])
-            
-            item_text = f"[{task[1]}] {doc.toPlainText()[:100]}"
+            item_text = f"[{task[1]}] {render_description(task[5]).plain_text[:100]}"
             item = QListWidgetItem(item_text)
             item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
             item.setCheckState(Qt.CheckState.Unchecked)
@@ -348,13 +547,49 @@ class EditMergedTaskDialog(QDialog):
 
         return new_description, ids_to_unmerge, total_children
 
+class QA83GroupModel(RowTableModel):
+    """
+    One row per QA83 task group as (project_code, title, group), with the code and
+    title only on the first row of each project; the tab spans them down the
+    project's rows. On the Description column UserRole, UserRole + 1 and
+    UserRole + 2 return the group's (project, description) key, merged flag and id.
+    """
+    def row_key(self, row):
+        return row[2]["original_key"]
+
+    def cell_data(self, row, column, role):
+        proj_code, title, group = row
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0: return proj_code
+            if column == 1: return title
+            if column == 2: return render_description(group["description"]).plain_text
+            return group["progress_cells"][column - 3]
+        if role == RICH_TEXT_ROLE:
+            return render_description(group["description"]) if column == 2 else None
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter if column > 2 else Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft
+        if column == 2:
+            if role == Qt.ItemDataRole.UserRole: return group["original_key"]
+            if role == Qt.ItemDataRole.UserRole + 1: return group["is_merged"]
+            if role == Qt.ItemDataRole.UserRole + 2: return group["group_id"]
+        return None
+
 class QA83Tab(QWidget):
     CONFIG_FILE = 'QA83.json'
+    REPORT_CACHE_DIR = 'report_cache'
 
     def __init__(self, parent, db):
         super().__init__(parent)
+        self.parent_window = parent
         self.db = db; self.view_date = datetime.now().date(); self.qa83_config = self._load_config()
-        self.init_ui(); self.update_qa83_view()
+        self.report_cache = ReportCache(self.REPORT_CACHE_DIR)
+        # Months already built, with the previous and next ones built ahead while the app is idle.
+        # The month in the table, so refreshing the same month patches rows instead of resetting them.
+        self.table_month = None
+        self.view_cache = ViewCache(db, parent=self); self.refresh_timer = make_debounce_timer(self, self.update_qa83_view)
+        # qa83_groups is maintained by the database, which needs to know which categories count.
+        self.db.set_qa83_categories(self.qa83_config.get("qa83_categories", []))
+        self.init_ui()
 
     def _load_config(self):
         if not os.path.exists(self.CONFIG_FILE):
@@ -370,13 +605,17 @@ class QA83Tab(QWidget):
         nav_group = QGroupBox("Month Navigation"); nav_layout = QGridLayout(nav_group); prev_button = QPushButton("<"); prev_button.clicked.connect(self._go_to_previous_month)
         self.month_label = QLabel(); self.month_label.setAlignment(Qt.AlignmentFlag.AlignCenter); self.month_label.setStyleSheet("QLabel { border: 1px solid gray; border-radius: 4px; padding: 4px; }"); self.month_label.mousePressEvent = self._show_calendar_picker
         next_button = QPushButton(">"); next_button.clicked.connect(self._go_to_next_month); nav_layout.addWidget(prev_button, 0, 0); nav_layout.addWidget(self.month_label, 0, 1); nav_layout.addWidget(next_button, 0, 2); nav_layout.setColumnStretch(1, 1); main_layout.addWidget(nav_group)
-        self.table = CopyableTableWidget(); self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers); self.table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection); self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows) 
-        self.table.setStyleSheet("QTableWidget::item:selected { background-color: #447ED0; color: white; }"); header = self.table.horizontalHeader(); header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents); header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents); header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch); header.setHighlightSections(False)
+        self.model = QA83GroupModel(["Project Code", "Project Title", "Description"], self)
+        self.table = CopyableTableView(); self.table.setModel(self.model); self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers); self.table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection); self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows) 
+        self.table.setItemDelegateForColumn(2, RichTextDelegate(self.table, selected_text_color=QColor("white"), inline=False))
+        self.table.setStyleSheet("QTableView::item:selected { background-color: #447ED0; color: white; }"); header = self.table.horizontalHeader(); header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents); header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents); header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch); header.setHighlightSections(False)
         main_layout.addWidget(self.table); button_layout = QHBoxLayout()
         
         # This ensures that row heights automatically adjust to fit their content.
         # Setting this to Interactive allows the user to manually resize rows.
         self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        # Rows are measured as they scroll into view rather than all at once.
+        self.row_resizer = VisibleRowResizer(self.table)
 
         self.unassign_qa83_button = QPushButton("Unassign QA83")
         self.unassign_qa83_button.clicked.connect(self._unassign_qa83_tag)
@@ -394,24 +633,34 @@ class QA83Tab(QWidget):
         
         self.merge_button = QPushButton("Merge Selected Tasks"); self.merge_button.clicked.connect(self._merge_selected_tasks)
         self.set_progress_button = QPushButton("Set Task Progress"); self.set_progress_button.clicked.connect(self._set_task_progress)
-        generate_report_button = QPushButton("Generate HTML Report"); generate_report_button.clicked.connect(self._generate_html_report)
-        self.table.itemSelectionChanged.connect(self._update_button_states)
+        self.progress_history_button = QPushButton("Progress History"); self.progress_history_button.clicked.connect(self._show_progress_history)
+        carry_forward_button = QPushButton("Carry Forward Progress"); carry_forward_button.clicked.connect(self._carry_forward_progress)
+        suggest_merges_button = QPushButton("Suggest Merges"); suggest_merges_button.clicked.connect(self._suggest_merges)
+        year_summary_button = QPushButton("Year Summary"); year_summary_button.clicked.connect(lambda: QA83YearSummaryDialog(self.db, self.view_date.year, self).exec())
+        self.generate_report_button = QPushButton("Generate HTML Report"); self.generate_report_button.clicked.connect(self._generate_html_report)
+        self.generate_pdf_button = QPushButton("Generate PDF"); self.generate_pdf_button.clicked.connect(self._generate_pdf_report)
+        self.table.selectionModel().selectionChanged.connect(self._update_button_states)
+        button_layout.addWidget(suggest_merges_button)
         button_layout.addWidget(self.merge_button)
         button_layout.addWidget(self.set_progress_button)
-        button_layout.addWidget(generate_report_button)
+        button_layout.addWidget(self.progress_history_button)
+        button_layout.addWidget(carry_forward_button)
+        button_layout.addWidget(year_summary_button)
+        button_layout.addWidget(self.generate_report_button)
+        button_layout.addWidget(self.generate_pdf_button)
         main_layout.addLayout(button_layout)
         self._update_button_states()
 
     def _on_override_description_clicked(self):
         """Handler for the 'Override Description' button."""
-        selected_rows = list(set(index.row() for index in self.table.selectedIndexes()))
+        selected_rows = list(set(index.row() for index in self.table.selectionModel().selectedIndexes()))
         if len(selected_rows) == 1:
             self._override_description(selected_rows[0])
             
     def _override_description(self, row):
         """Opens a dialog to override the description for a task group."""
-        desc_item = self.table.item(row, 2)
-        if not desc_item: return
+        desc_item = self.model.index(row, 2)
+        if not desc_item.isValid(): return
 
         group_id = desc_item.data(Qt.ItemDataRole.UserRole + 2)
         if not group_id:
@@ -426,24 +675,20 @@ class QA83Tab(QWidget):
             self.db.set_merged_description(group_id, dialog.get_description()); self.update_qa83_view()
 
     def handle_tab_focus(self):
-        month_year_str = self.view_date.strftime('%Y-%m'); all_tasks = self.db.get_tasks_for_month_with_master_info(month_year_str); qa83_categories = set(self.qa83_config.get("qa83_categories", []))
-        qa83_tasks = [task for task in all_tasks if qa83_categories.intersection(set(task[6].split(',')))]; unique_proj_codes = set()
-        for task in qa83_tasks:
-            master_id = task[8]
-            if master_id:
-                master_task = next((t for t in all_tasks if t[0] == master_id), None)
-                if master_task: unique_proj_codes.add(master_task[4])
-            else: unique_proj_codes.add(task[4])
-        titles_were_added = False
-        for code in sorted(list(unique_proj_codes)):
-            if not self.db.get_project_title(code):
-                dialog = ProjectTitleDialog(code, self)
-                if dialog.exec():
-                    title = dialog.get_title()
-                    if title: self.db.set_project_title(code, title); titles_were_added = True
+        view = self._build_view()
+        if view['untitled_codes']:
+            projects = [(code, None, None, None, 0) for code in view['untitled_codes']]
+            dialog = ProjectTitlesDialog(projects, "The following projects have no title yet:", self)
+            if dialog.exec():
+                self.db.set_project_titles(dialog.get_titles()); view = self._build_view()
         
         # Always update the view after checking for titles.
-        self.update_qa83_view()
+        self._populate_table(view)
+
+    def _open_project_titles(self):
+        dialog = ProjectTitlesDialog(self.db.get_projects(), parent=self)
+        if dialog.exec():
+            self.db.set_project_titles(dialog.get_titles()); self.update_qa83_view()
 
     def _open_settings(self):
         current_name = self.qa83_config.get("name", ""); current_designation = self.qa83_config.get("designation", "")
@@ -460,76 +705,103 @@ class QA83Tab(QWidget):
         
         save_path, _ = QFileDialog.getSaveFileName(self, "Save HTML Report", default_save_path, "HTML Files (*.html)")
         if not save_path: return
-        
-        _, _, num_weeks = self._get_month_weeks_info(self.view_date.year, self.view_date.month)
-        
-        template_filename = 'report_template_six.html' if num_weeks == 6 else 'report_template.html'
-        
-        # =====================================================================
-        # === MODIFIED SECTION START (Robust path resolution) ===
-        # =====================================================================
-        if getattr(sys, 'frozen', False):
-            # If the application is run as a bundled executable, the base path is the executable's directory.
-            base_path = os.path.dirname(sys.executable)
-        else:
-            # If the application is run as a script, the base path is the script's directory.
-            base_path = os.path.dirname(os.path.realpath(__file__))
-        
-        template_path = os.path.join(base_path, template_filename)
-        # =====================================================================
-        # === MODIFIED SECTION END ===
-        # =====================================================================
 
+        name = self.qa83_config.get("name", "N/A"); designation = self.qa83_config.get("designation", "N/A")
+        self.report_progress = QProgressDialog("Generating QA83 report...", None, 0, 0, self)
+        self.report_progress.setWindowTitle("QA83 Report")
+        self.report_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.report_progress.setMinimumDuration(500)
+        self.generate_report_button.setEnabled(False)
+
+        self.report_worker = QA83ReportWorker(self.db, self.view_date.year, self.view_date.month, save_path, name, designation,
+                                              self.report_cache, self)
+        self.report_worker.progress.connect(self._on_report_progress)
+        self.report_worker.succeeded.connect(self._on_report_written)
+        self.report_worker.failed.connect(self._on_report_failed)
+        self.report_worker.finished.connect(self._on_report_worker_finished)
+        self.report_worker.start()
+
+    def _on_report_progress(self, rows_written, total_rows):
+        self.report_progress.setMaximum(total_rows); self.report_progress.setValue(rows_written)
+
+    def _on_report_written(self, path, from_cache):
+        self.report_progress.close()
+        note = "\n\n(unchanged since it was last generated)" if from_cache else ""
+        QMessageBox.information(self, "Success", f"Report saved to:\n{path}{note}"); QDesktopServices.openUrl(QUrl.fromLocalFile(path))
+
+    def _on_report_failed(self, error):
+        self.report_progress.close()
+        QMessageBox.critical(self, "Error", f"Failed to save or open report: {error}")
+
+    def _on_report_worker_finished(self):
+        self.generate_report_button.setEnabled(True)
+        self.report_worker.deleteLater()
+        self.report_worker = None
+
+    def _generate_pdf_report(self):
+        desktop_path = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.DesktopLocation)
+        default_save_path = os.path.join(desktop_path, f"QA83_Report_{self.view_date.strftime('%Y-%m')}.pdf")
+        save_path, _ = QFileDialog.getSaveFileName(self, "Save PDF Report", default_save_path, "PDF Files (*.pdf)")
+        if not save_path: return
+
+        name = self.qa83_config.get("name", "N/A"); designation = self.qa83_config.get("designation", "N/A")
+        month_year = self.view_date.strftime('%Y-%m')
+        self.pdf_fingerprint = get_qa83_pdf_fingerprint(self.db, self.view_date.year, self.view_date.month, name, designation)
+        cached_path = self.report_cache.lookup('qa83', month_year, self.pdf_fingerprint, '.pdf')
+        if cached_path:
+            try:
+                shutil.copyfile(cached_path, save_path)
+            except OSError as e:
+                QMessageBox.critical(self, "Error", f"Failed to save PDF report: {e}"); return
+            QMessageBox.information(self, "Success", f"Report saved to:\n{save_path}\n\n(unchanged since it was last generated)")
+            QDesktopServices.openUrl(QUrl.fromLocalFile(save_path)); return
+
+        # The child process gets the finished view, so it never touches the database.
+        self.pdf_export = QA83PdfExport(self._build_view(), save_path, name, designation, self.view_date.strftime('%B %Y'), self)
+        self.pdf_month_year = month_year
+        self.pdf_progress = QProgressDialog("Starting PDF export...", "Cancel", 0, 0, self)
+        self.pdf_progress.setWindowTitle("QA83 PDF")
+        self.pdf_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.pdf_progress.setMinimumDuration(500)
+        self.pdf_progress.canceled.connect(self._cancel_pdf_report)
+        self.generate_pdf_button.setEnabled(False)
+
+        self.pdf_export.progress.connect(self._on_pdf_progress)
+        self.pdf_export.succeeded.connect(self._on_pdf_written)
+        self.pdf_export.failed.connect(self._on_pdf_failed)
+        self.pdf_export.start()
+
+    def _on_pdf_progress(self, label, value, maximum):
+        self.pdf_progress.setLabelText(label); self.pdf_progress.setMaximum(maximum); self.pdf_progress.setValue(value)
+
+    def _cancel_pdf_report(self):
+        if self.pdf_export:
+            self.pdf_export.cancel(); self._finish_pdf_report()
+
+    def _on_pdf_written(self, path):
+        self._finish_pdf_report()
         try:
-            with open(template_path, 'r', encoding='utf-8') as f: template_content = f.read()
-        except FileNotFoundError: QMessageBox.critical(self, "Error", f"Template file not found at:\n{template_path}"); return
-        name = self.qa83_config.get("name", "N/A"); designation = self.qa83_config.get("designation", "N/A"); month_year = self.view_date.strftime('%B %Y')
-        rows_html_list = []
-        description_counter = 0
-        for row in range(self.table.rowCount()):
-            row_html = "<tr>"
-            if self.table.item(row, 0):
-                description_counter = 1
-                rowspan = self.table.rowSpan(row, 0); proj_code = self.table.item(row, 0).text(); proj_title = self.table.item(row, 1).text();
-                row_html += f'<td class="proj-code" rowspan="{rowspan}">{proj_code}</td>'
-                row_html += f'<td class="title" rowspan="{rowspan}">{proj_title}</td>'
-            
-            desc_widget = self.table.cellWidget(row, 2); desc_text = ""
-            if desc_widget and isinstance(desc_widget, QLabel):
-                html_content = desc_widget.text()
-                
-                p_tag_pos = html_content.lower().find('<p')
-                
-                if p_tag_pos != -1:
-                    first_tag_end = html_content.find('>', p_tag_pos)
-                    if first_tag_end != -1:
-                        desc_text = (f"{html_content[:first_tag_end + 1]}"
-                                     f"{description_counter}) "
-                                     f"{html_content[first_tag_end + 1:]}")
-                    else:
-                        desc_text = f"{description_counter}) {html_content}"
-                else:
-                    desc_text = f"{description_counter}) {html_content}"
-
-                description_counter += 1
-
-            row_html += f'<td class="desc">{desc_text}</td>'
-            for col in range(3, self.table.columnCount()):
-                item = self.table.item(row, col); cell_text = item.text() if item else ""; row_html += f'<td>{cell_text}</td>'
-            row_html += "<td></td><td></td><td>&#10003;</td><td></td><td></td>"; row_html += "</tr>"; rows_html_list.append(row_html)
-        table_rows_content = "\n".join(rows_html_list)
-        final_html = template_content.replace("{{name}}", name).replace("{{designation}}", designation).replace("{{month_year}}", month_year).replace("{{table_rows}}", table_rows_content)
-        try:
-            with open(save_path, 'w', encoding='utf-8') as f: f.write(final_html)
-            QMessageBox.information(self, "Success", f"Report saved to:\n{save_path}"); QDesktopServices.openUrl(QUrl.fromLocalFile(save_path))
-        except Exception as e: QMessageBox.critical(self, "Error", f"Failed to save or open report: {e}")
+            self.report_cache.store('qa83', self.pdf_month_year, self.pdf_fingerprint, path)
+        except OSError:
+            pass  # The report itself was saved; it just will not be reused.
+        QMessageBox.information(self, "Success", f"Report saved to:\n{path}"); QDesktopServices.openUrl(QUrl.fromLocalFile(path))
+
+    def _on_pdf_failed(self, error):
+        self._finish_pdf_report()
+        QMessageBox.critical(self, "Error", f"Failed to generate PDF report: {error}")
+
+    def _finish_pdf_report(self):
+        self.pdf_progress.canceled.disconnect(self._cancel_pdf_report); self.pdf_progress.close()
+        self.generate_pdf_button.setEnabled(True)
+        self.pdf_export.deleteLater(); self.pdf_export = None
 
     def _update_button_states(self):
-        selected_indexes = self.table.selectedIndexes()
+        selected_indexes = self.table.selectionModel().selectedIndexes()
         selected_rows = set(index.row() for index in selected_indexes)
         num_selected_rows = len(selected_rows)
 
         self.set_progress_button.setEnabled(num_selected_rows == 1)
+        self.progress_history_button.setEnabled(num_selected_rows == 1)
         self.merge_button.setEnabled(num_selected_rows > 1)
         self.unassign_qa83_button.setEnabled(num_selected_rows == 1)
         self.override_desc_button.setEnabled(num_selected_rows == 1)
@@ -537,17 +809,17 @@ class QA83Tab(QWidget):
         is_merged = False
         if num_selected_rows == 1:
             row = list(selected_rows)[0]
-            desc_item = self.table.item(row, 2)
-            if desc_item:
+            desc_item = self.model.index(row, 2)
+            if desc_item.isValid():
                 is_merged = desc_item.data(Qt.ItemDataRole.UserRole + 1) or False
         self.edit_merged_task_button.setEnabled(is_merged)
 
     def _unassign_qa83_tag(self):
-        selected_rows = list(set(index.row() for index in self.table.selectedIndexes()))
+        selected_rows = list(set(index.row() for index in self.table.selectionModel().selectedIndexes()))
         if len(selected_rows) != 1: return
         
         row = selected_rows[0]
-        group_key = self.table.item(row, 2).data(Qt.ItemDataRole.UserRole)
+        group_key = self.model.index(row, 2).data(Qt.ItemDataRole.UserRole)
         if not group_key: return
 
         proj_code, html_desc = group_key
@@ -568,14 +840,16 @@ class QA83Tab(QWidget):
             
             QMessageBox.information(self, "Success", "QA83 tag unassigned successfully.")
             self.update_qa83_view()
+            # The General tab's rows carry each task's categories.
+            self.parent_window.mark_tabs_dirty('general_tab')
 
     def _edit_merged_task(self):
-        selected_rows = list(set(index.row() for index in self.table.selectedIndexes()))
+        selected_rows = list(set(index.row() for index in self.table.selectionModel().selectedIndexes()))
         if len(selected_rows) != 1: return
         
         row = selected_rows[0]
-        desc_item = self.table.item(row, 2)
-        if not desc_item or not desc_item.data(Qt.ItemDataRole.UserRole + 1):
+        desc_item = self.model.index(row, 2)
+        if not desc_item.isValid() or not desc_item.data(Qt.ItemDataRole.UserRole + 1):
             QMessageBox.warning(self, "Action Not Applicable", "This task is not part of a merged group.")
             return
 
@@ -600,12 +874,19 @@ class QA83Tab(QWidget):
 
             QMessageBox.information(self, "Success", "Merged task updated successfully.")
             self.update_qa83_view()
+            # The General tab's rows carry each task's merge master.
+            if ids_to_unmerge:
+                self.parent_window.mark_tabs_dirty('general_tab')
     
     def _add_months(self, source_date, months):
         month = source_date.month - 1 + months; year = source_date.year + month // 12; month = month % 12 + 1; return source_date.replace(year=year, month=month, day=1)
     
-    def _go_to_previous_month(self): self.view_date = self._add_months(self.view_date, -1); self.update_qa83_view()
-    def _go_to_next_month(self): self.view_date = self._add_months(self.view_date, 1); self.update_qa83_view()
+    def _go_to_previous_month(self): self.view_date = self._add_months(self.view_date, -1); self._schedule_view_update()
+    def _go_to_next_month(self): self.view_date = self._add_months(self.view_date, 1); self._schedule_view_update()
+
+    def _schedule_view_update(self):
+        """Shows the new month at once but only rebuilds the table once the clicking stops."""
+        self.month_label.setText(self.view_date.strftime('%B %Y')); self.view_cache.cancel_prefetch(); self.refresh_timer.start()
     
     def _show_calendar_picker(self, event):
         dialog = QDialog(self)
@@ -623,137 +904,107 @@ class QA83Tab(QWidget):
         cal_layout.addWidget(calendar)
         dialog.exec()
     
-    def _get_month_weeks_info(self, year, month):
-        month_calendar = calendar.monthcalendar(year, month); day_to_week_map, headers = {}, []
-        chrono_week_idx = 0; week_number_suffix = {1: 'st', 2: 'nd', 3: 'rd'}
-        for week in month_calendar:
-            week_days = [day for day in week if day != 0]
-            if not week_days: continue
-            week_num = chrono_week_idx + 1; suffix = week_number_suffix.get(week_num, 'th')
-            start_date, end_date = datetime(year, month, week_days[0]), datetime(year, month, week_days[-1])
-            header_text = f"{week_num}{suffix} Week\n({start_date.strftime('%d/%m')} -\n{end_date.strftime('%d/%m')})"
-            headers.append(header_text)
-            for day in week_days: day_to_week_map[day] = chrono_week_idx
-            chrono_week_idx += 1
-        return headers, day_to_week_map, len(headers)
-    
     def _set_task_progress(self):
-        selected_rows = list(set(index.row() for index in self.table.selectedIndexes()));
+        selected_rows = list(set(index.row() for index in self.table.selectionModel().selectedIndexes()));
         if len(selected_rows) != 1: return
-        row = selected_rows[0]; group_key = self.table.item(row, 2).data(Qt.ItemDataRole.UserRole)
+        row = selected_rows[0]; group_key = self.model.index(row, 2).data(Qt.ItemDataRole.UserRole)
         if not group_key: return
-        proj_code, html_desc = group_key; doc = QTextDocument(); doc.setHtml(html_desc); month_year_str = self.view_date.strftime('%Y-%m')
+        proj_code, html_desc = group_key; month_year_str = self.view_date.strftime('%Y-%m')
         
-        current_start, current_final = self.db.get_qa83_progress(month_year_str, proj_code, html_desc)
-        current_start_progress = current_start or "0"
+        current_start, current_final, carried_start = self.db.get_qa83_progress_for_month(month_year_str).get((proj_code, html_desc), (None, None, None))
+        current_start_progress = current_start or carried_start or "0"
         current_final_progress = current_final or "100"
 
-        dialog = ProgressInputDialog(proj_code, doc.toPlainText(), current_start_progress, current_final_progress, self)
+        dialog = ProgressInputDialog(proj_code, render_description(html_desc).plain_text, current_start_progress, current_final_progress, self)
         
         if dialog.exec():
             new_start, new_final = dialog.get_values()
             self.db.set_qa83_progress(month_year_str, proj_code, html_desc, new_start, new_final)
             self.update_qa83_view()
     
+    def _show_progress_history(self):
+        selected_rows = list(set(index.row() for index in self.table.selectionModel().selectedIndexes()))
+        if len(selected_rows) != 1: return
+        group_key = self.model.index(selected_rows[0], 2).data(Qt.ItemDataRole.UserRole)
+        if not group_key: return
+        proj_code, html_desc = group_key
+        ProgressHistoryDialog(proj_code, render_description(html_desc).plain_text, self.db.get_qa83_progress_history(proj_code, html_desc), self).exec()
+
+    def _carry_forward_progress(self):
+        month_year_str = self.view_date.strftime('%Y-%m')
+        updated = self.db.carry_forward_qa83_progress(month_year_str)
+        if updated:
+            QMessageBox.information(self, "Progress Carried Forward", f"Start progress set for {updated} task group(s) from their previous final progress.")
+            self.update_qa83_view()
+        else:
+            QMessageBox.information(self, "Nothing to Carry Forward", "Every task group this month either has a start progress already or no earlier progress.")
+
     def _merge_selected_tasks(self):
-        selected_rows = sorted(list(set(index.row() for index in self.table.selectedIndexes())));
+        selected_rows = sorted(list(set(index.row() for index in self.table.selectionModel().selectedIndexes())));
         if len(selected_rows) < 2: return
         task_groups_to_merge = [];
         for row in selected_rows:
-            group_key = self.table.item(row, 2).data(Qt.ItemDataRole.UserRole)
+            group_key = self.model.index(row, 2).data(Qt.ItemDataRole.UserRole)
             if group_key: task_groups_to_merge.append(group_key)
+        self._merge_task_groups(task_groups_to_merge)
+
+    def _suggest_merges(self):
+        # One entry per distinct (project, description) key, which is what a merge works on.
+        plain_texts, items = {}, []
+        for proj_code, _, groups in self._build_view()['projects']:
+            for group in groups:
+                key = group["original_key"]
+                if key in plain_texts: continue
+                plain_texts[key] = render_description(key[1]).plain_text; items.append((key, proj_code, plain_texts[key]))
+        clusters = find_near_duplicate_clusters(items)
+        if not clusters:
+            QMessageBox.information(self, "Suggested Merges", "No near-duplicate task groups found this month."); return
+        SuggestedMergesDialog(clusters, plain_texts, self._merge_task_groups, self).exec()
+
+    def _merge_task_groups(self, task_groups_to_merge):
+        """Opens the merge dialog for the given (project code, description) groups. Returns True if merged."""
         dialog = MergeTasksDialog(task_groups_to_merge, self)
         if dialog.exec():
             master_group, merged_desc = dialog.get_selection(); month_year_str = self.view_date.strftime('%Y-%m'); all_task_ids = []
             for proj_code, html_desc in task_groups_to_merge: all_task_ids.extend(self.db.get_task_ids_for_group(month_year_str, proj_code, html_desc))
             master_task_ids = self.db.get_task_ids_for_group(month_year_str, master_group[0], master_group[1])
-            if not master_task_ids: QMessageBox.critical(self, "Error", "Could not find master task."); return
+            if not master_task_ids: QMessageBox.critical(self, "Error", "Could not find master task."); return False
             the_one_master_id = master_task_ids[0]; self.db.set_master_for_tasks(all_task_ids, the_one_master_id)
             if merged_desc: self.db.set_merged_description(the_one_master_id, merged_desc)
             QMessageBox.information(self, "Success", f"{len(all_task_ids)} task entries merged."); self.update_qa83_view()
+            self.parent_window.mark_tabs_dirty('general_tab')
+            return True
+        return False
     
+    def _build_view(self):
+        return self.view_cache.get(*self._view_job(self.view_date))
+
+    def _view_job(self, view_date):
+        """Returns the (cache key, build function) of the QA83 view for view_date's month."""
+        return (view_date.year, view_date.month), lambda: build_qa83_view(self.db, view_date.year, view_date.month)
+
     def update_qa83_view(self):
-        self.table.clearContents(); self.table.setRowCount(0); self.month_label.setText(self.view_date.strftime('%B %Y')); month_year_str = self.view_date.strftime('%Y-%m')
-        week_headers, day_to_week_map, num_weeks = self._get_month_weeks_info(self.view_date.year, self.view_date.month)
-        headers = ["Project Code", "Project Title", "Description"] + week_headers
-        self.table.setColumnCount(len(headers)); self.table.setHorizontalHeaderLabels(headers); header = self.table.horizontalHeader()
-        for i in range(3, self.table.columnCount()): header.setSectionResizeMode(i, QHeaderView.ResizeMode.ResizeToContents)
+        self.refresh_timer.stop(); self._populate_table(self._build_view())
+        if self.isVisible(): self.view_cache.prefetch([self._view_job(self._add_months(self.view_date, step)) for step in (1, -1)])
+
+    def _populate_table(self, view):
+        self.month_label.setText(self.view_date.strftime('%B %Y'))
+        rows = [(proj_code if index == 0 else "", title if index == 0 else "", group)
+                for proj_code, title, groups in view['projects'] for index, group in enumerate(groups)]
+        headers = ["Project Code", "Project Title", "Description"] + view['week_headers']
+        self.table.clearSpans()
+        if self.table_month == view['month_year'] and headers == self.model.headers:
+            # The same month again, e.g. after an edit: only the rows that changed are touched.
+            self.model.update_rows(rows)
+        else:
+            self.table_month = view['month_year']; self.model.set_rows(rows, headers); self._setup_header()
+        start_row = 0
+        for _, _, groups in view['projects']:
+            if len(groups) > 1: self.table.setSpan(start_row, 0, len(groups), 1); self.table.setSpan(start_row, 1, len(groups), 1)
+            start_row += len(groups)
+        self.row_resizer.resize_now()
+
+    def _setup_header(self):
+        header = self.table.horizontalHeader(); header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents); header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents); header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        for i in range(3, self.model.columnCount()): header.setSectionResizeMode(i, QHeaderView.ResizeMode.ResizeToContents)
         header.setFixedHeight(header.sizeHint().height()); header.setDefaultAlignment(Qt.AlignmentFlag.AlignCenter | Qt.AlignmentFlag.AlignVCenter)
-        all_tasks = self.db.get_tasks_for_month_with_master_info(month_year_str); qa83_categories = set(self.qa83_config.get("qa83_categories", [])); qa83_tasks = [task for task in all_tasks if qa83_categories.intersection(set(task[6].split(',')))]; task_groups = {}
-        for task in qa83_tasks:
-            group_id = task[8] if task[8] else task[0]; task_start_dt = datetime.combine(datetime.strptime(task[1], '%Y-%m-%d'), time.fromisoformat(task[2]))
-            if group_id not in task_groups:
-                master_task = next((t for t in all_tasks if t[0] == group_id), None)
-                if not master_task: continue
-                
-                # Correctly determine the description: overridden on master, or original.
-                # If it's a merged group, master_task[11] has the merged description.
-                # If it's a single task, we need to check its own overridden description from the database.
-                task_groups[group_id] = { "proj_code": master_task[4], "description": self.db.get_task_by_id(group_id)[9] or master_task[5], "original_key": (master_task[4], master_task[5]), "tasks": [], "earliest_start_dt": task_start_dt }
-            task_groups[group_id]["tasks"].append(task); task_groups[group_id]["earliest_start_dt"] = min(task_groups[group_id]["earliest_start_dt"], task_start_dt)
-        sorted_groups = sorted(list(task_groups.values()), key=lambda g: (g['proj_code'], g['earliest_start_dt'])); projects_data = defaultdict(list)
-        for group in sorted_groups: projects_data[group['proj_code']].append(group)
-        self.table.setRowCount(len(sorted_groups)); current_row = 0
-        
-        group_id_map = {v['original_key']: k for k, v in task_groups.items()}
-
-        for proj_code, groups_in_project in projects_data.items():
-            start_row_for_span = current_row
-            title = self.db.get_project_title(proj_code) or ""
-            
-            proj_code_item = QTableWidgetItem(proj_code)
-            proj_code_item.setTextAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
-            self.table.setItem(current_row, 0, proj_code_item)
-
-            title_item = QTableWidgetItem(title)
-            title_item.setTextAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
-            self.table.setItem(current_row, 1, title_item)
-            for group in groups_in_project:
-                desc_item = QTableWidgetItem()
-                
-                desc_item.setData(Qt.ItemDataRole.UserRole, group["original_key"])
-                is_group_merged = any(task[8] is not None for task in group["tasks"])
-                desc_item.setData(Qt.ItemDataRole.UserRole + 1, is_group_merged)
-                group_id = group_id_map.get(group["original_key"])
-                desc_item.setData(Qt.ItemDataRole.UserRole + 2, group_id)
-
-                self.table.setItem(current_row, 2, desc_item)
-                desc_label = QLabel(group["description"])
-                desc_label.setTextFormat(Qt.TextFormat.RichText)
-                desc_label.setWordWrap(True)
-                desc_label.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
-                self.table.setCellWidget(current_row, 2, desc_label)
-                weekly_hours = [0.0] * num_weeks; total_hours = 0.0
-                for task in group["tasks"]:
-                    day = datetime.strptime(task[1], '%Y-%m-%d').day; week_idx = day_to_week_map.get(day)
-                    if week_idx is not None:
-                        duration = (datetime.combine(datetime.min, time.fromisoformat(task[3])) - datetime.combine(datetime.min, time.fromisoformat(task[2]))).total_seconds() / 3600; weekly_hours[week_idx] += duration; total_hours += duration
-                
-                orig_proj, orig_desc = group["original_key"]
-                start_progress_str, final_progress_str = self.db.get_qa83_progress(month_year_str, orig_proj, orig_desc)
-                start_progress_str = start_progress_str or "0"
-                final_progress_str = final_progress_str or "100"
-
-                col_offset = 3
-                if final_progress_str == "-":
-                    for i, hours in enumerate(weekly_hours):
-                        if hours > 0.005: item = QTableWidgetItem("-"); item.setTextAlignment(Qt.AlignmentFlag.AlignCenter); self.table.setItem(current_row, i + col_offset, item)
-                else:
-                    try:
-                        start_progress = float(start_progress_str)
-                        final_progress = float(final_progress_str)
-                        total_progress_gain = final_progress - start_progress
-                        cumulative_progress = start_progress
-                        
-                        for i, hours in enumerate(weekly_hours):
-                            progress_gain = (hours / total_hours) * total_progress_gain if total_hours > 0 else 0
-                            cumulative_progress += progress_gain
-                            if hours > 0.005: 
-                                item = QTableWidgetItem(f"{cumulative_progress:.0f}%")
-                                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                                self.table.setItem(current_row, i + col_offset, item)
-                    except (ValueError, TypeError): pass
-                current_row += 1
-            span_size = len(groups_in_project)
-            if span_size > 1: self.table.setSpan(start_row_for_span, 0, span_size, 1); self.table.setSpan(start_row_for_span, 1, span_size, 1)
-        self.table.resizeRowsToContents()
\ No newline at end of file
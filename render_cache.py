@@ -0,0 +1,100 @@
+# render_cache.py
+
+import hashlib
+import html
+import re
+from collections import OrderedDict
+
+from html_text import html_to_plain_text
+
+_PARAGRAPH_RE = re.compile(r'<p[^>]*>(.*?)</p>', re.DOTALL)
+
+
+class RenderedDescription:
+    """
+    What the views derive from one task description: the inline HTML a table row
+    draws, its plain text, and the row sizes measured for it so far, keyed by
+    (form drawn, column width, font key), the form being 'html', 'inline' or
+    'plain'. Each part is worked out the first time it is asked for.
+    """
+    MAX_SIZES = 8
+
+    def __init__(self, description):
+        self.description = description
+        self._inline_html = None
+        self._plain_text = None
+        self.sizes = {}
+
+    # Compared by description, so a row holding one still matches after the cache has replaced it.
+    def __eq__(self, other):
+        return isinstance(other, RenderedDescription) and other.description == self.description
+
+    def __hash__(self):
+        return hash(self.description)
+
+    @property
+    def plain_text(self):
+        if self._plain_text is None:
+            self._plain_text = html_to_plain_text(self.description)
+        return self._plain_text
+
+    @property
+    def inline_html(self):
+        # The description is saved as HTML with <p> tags, which are block-level
+        # elements. When the text wraps, these blocks add vertical margins that
+        # make the row height incorrect. To fix this, we extract the inner content
+        # of each <p> tag and join them with <br> (line break) tags. This preserves
+        # inline formatting (like bold) while removing the problematic block layout.
+        if self._inline_html is None:
+            if not self.plain_text:
+                self._inline_html = ""
+            else:
+                p_contents = _PARAGRAPH_RE.findall(self.description)
+                self._inline_html = ("<br>".join(p_contents) if p_contents
+                                     else html.escape(self.plain_text).replace('\n', '<br>'))
+        return self._inline_html
+
+    def size(self, form, width, font_key):
+        return self.sizes.get((form, width, font_key))
+
+    def set_size(self, form, width, font_key, size):
+        # Only a few widths are ever current; forget them all when the column has been dragged around.
+        if len(self.sizes) >= self.MAX_SIZES:
+            self.sizes.clear()
+        self.sizes[(form, width, font_key)] = size
+
+
+class RenderCache:
+    """
+    Bounded LRU of RenderedDescription, keyed by a hash of the description, so a
+    description that recurs day after day is parsed and measured once. Used from
+    the GUI thread only.
+    """
+    def __init__(self, max_entries=5000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, description):
+        description = description or ""
+        key = hashlib.blake2b(description.encode('utf-8'), digest_size=16).digest()
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        entry = RenderedDescription(description)
+        self._entries[key] = entry
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+
+
+# Shared by the General, QA83 and Travel views.
+render_cache = RenderCache()
+
+
+def render_description(description):
+    """Returns the shared RenderedDescription for a task description."""
+    return render_cache.get(description)
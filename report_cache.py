@@ -0,0 +1,62 @@
+# report_cache.py
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+
+_file_hashes = {}
+
+
+def hash_file(path):
+    """Returns the SHA-256 of a file's contents. Cached per path until the file changes."""
+    modified = os.path.getmtime(path)
+    cached = _file_hashes.get(path)
+    if cached and cached[0] == modified:
+        return cached[1]
+    with open(path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    _file_hashes[path] = (modified, digest)
+    return digest
+
+
+def make_fingerprint(*inputs):
+    """Returns a hex digest identifying a report's inputs, which must be JSON-serialisable."""
+    return hashlib.sha256(json.dumps(inputs, ensure_ascii=False).encode('utf-8')).hexdigest()[:32]
+
+
+class ReportCache:
+    """
+    Keeps the last generated copy of each kind of report for each month in a
+    folder, named by the fingerprint of its inputs. A lookup with the same
+    fingerprint returns the stored file; storing a new one replaces the month's
+    older copy, so the folder holds at most one file per kind and month.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, kind, month_year, fingerprint, extension):
+        return os.path.join(self.directory, f"{kind}_{month_year}_{fingerprint}{extension}")
+
+    def lookup(self, kind, month_year, fingerprint, extension):
+        """Returns the cached file for these inputs, or None."""
+        path = self._path(kind, month_year, fingerprint, extension)
+        return path if os.path.exists(path) else None
+
+    def store(self, kind, month_year, fingerprint, source_path):
+        """Copies a freshly generated report into the cache. Returns the cached path."""
+        os.makedirs(self.directory, exist_ok=True)
+        extension = os.path.splitext(source_path)[1]
+        path = self._path(kind, month_year, fingerprint, extension)
+        # Write under a temporary name first, so a concurrent lookup never sees half a file.
+        temporary_path = f"{path}.tmp{os.getpid()}"
+        shutil.copyfile(source_path, temporary_path)
+        os.replace(temporary_path, path)
+        for stale_path in glob.glob(os.path.join(glob.escape(self.directory), f"{kind}_{month_year}_*{extension}")):
+            if stale_path != path:
+                try:
+                    os.remove(stale_path)
+                except OSError:
+                    pass
+        return path
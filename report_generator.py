@@ -2,7 +2,7 @@
 # report_generator.py
 
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Spacer, Paragraph, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from reportlab.lib.colors import black, HexColor
@@ -15,6 +15,12 @@ class ReportGenerator:
         self.designation = designation
         self.month_year = month_year
         self.styles = getSampleStyleSheet()
+        # Derived styles rather than edits to 'Normal', so every run starts from the same stylesheet.
+        self.footer_style = ParagraphStyle('FooterNormal', parent=self.styles['Normal'],
+                                           fontName='Helvetica', fontSize=10, alignment=TA_LEFT)
+        self.footer_bold_style = ParagraphStyle('FooterBold', parent=self.footer_style, fontName='Helvetica-Bold')
+        self.cell_style = ParagraphStyle('TableCell', parent=self.styles['Normal'],
+                                         fontName='Helvetica', fontSize=8, leading=10)
         self.story = []
 
     def _header(self, canvas, doc):
@@ -54,15 +60,8 @@ class ReportGenerator:
         """Creates the footer flowable elements to be added ONLY at the end of the story."""
         footer_story = []
         
-        styles = self.styles
-        styleN = styles['Normal']
-        styleN.fontName = 'Helvetica'
-        styleN.fontSize = 10
-        styleN.alignment = TA_LEFT
-        
-        styleB = styles['Normal']
-        styleB.fontName = 'Helvetica-Bold'
-        styleB.fontSize = 10
+        styleN = self.footer_style
+        styleB = self.footer_bold_style
 
         p_review = Paragraph("<u>Overall Review by Principal/ Immediate Superior</u>", styleB)
         footer_story.append(p_review)
@@ -91,7 +90,13 @@ class ReportGenerator:
         footer_story.append(footer_table)
         return footer_story
 
-    def generate_report(self, table_data, spans):
+    def generate_report(self, table_data, spans, num_weeks=5, progress_callback=None):
+        """
+        Builds the PDF from the table rows (header first) and SPAN commands. The columns
+        are Job No., title, description, num_weeks weeks, reviewed by (name, date),
+        compliance (yes, no) and remarks. progress_callback, if given, receives
+        reportlab's (event, value) progress calls, e.g. ('PAGE', page number).
+        """
         doc = SimpleDocTemplate(
             self.output_path,
             pagesize=landscape(A4),
@@ -101,7 +106,14 @@ class ReportGenerator:
             bottomMargin=15 * mm
         )
 
-        main_table = Table(table_data, repeatRows=1)
+        if progress_callback:
+            doc.setProgressCallBack(progress_callback)
+
+        # Same proportions as the HTML report: the description gives up the width the weeks take.
+        column_percents = [5, 10, 55 - 4 * num_weeks] + [4] * num_weeks + [6, 6, 4, 4, 8]
+        main_table = Table(table_data, colWidths=[doc.width * percent / 100 for percent in column_percents],
+                           repeatRows=1)
+        week_end = 2 + num_weeks
         
         # Define Table Style
         style = TableStyle([
@@ -125,9 +137,10 @@ class ReportGenerator:
             # =====================================================================
             # === MODIFIED SECTION END ===
             # =====================================================================
-            ('ALIGN', (3, 1), (7, -1), 'CENTER'), # % Weeks
-            ('ALIGN', (8, 1), (9, -1), 'CENTER'), # Reviewed
-            ('ALIGN', (10, 1), (11, -1), 'CENTER'), # Compliance
+            ('ALIGN', (3, 1), (week_end, -1), 'CENTER'), # % Weeks
+            ('ALIGN', (week_end + 1, 1), (week_end + 2, -1), 'CENTER'), # Reviewed
+            ('ALIGN', (week_end + 3, 1), (week_end + 4, -1), 'CENTER'), # Compliance
+            ('FONTNAME', (week_end + 3, 1), (week_end + 3, -1), 'ZapfDingbats'), # Tick in the Yes column
             ('LEFTPADDING', (2, 1), (2, -1), 4), # Description left padding
             ('VALIGN', (2,1), (2,-1), 'TOP'), # Description top align
         ])
@@ -138,7 +151,7 @@ class ReportGenerator:
 
         main_table.setStyle(style)
         
-        self.story.append(main_table)
+        self.story = [main_table]
         self.story.extend(self._footer())
 
         doc.build(self.story, onFirstPage=self._header, onLaterPages=self._header)
\ No newline at end of file
@@ -32,6 +32,7 @@ class SettingsWindow(QDialog):
         self.popup_interval = QSpinBox()
         self.popup_autoclose = QSpinBox()
         self.schedule_notify_checkbox = QCheckBox("Show daily schedule as a notification on startup")
+        self.start_in_tray_checkbox = QCheckBox("Start in the system tray (open the window from the tray icon)")
         # =====================================================================
         # === MODIFIED SECTION START (Add max backups widget) ===
         # =====================================================================
@@ -80,6 +81,7 @@ class SettingsWindow(QDialog):
         form_layout.addRow("Popup Interval (minutes):", self.popup_interval)
         form_layout.addRow("Popup Autoclose:", self.popup_autoclose)
         form_layout.addRow("", self.schedule_notify_checkbox)
+        form_layout.addRow("", self.start_in_tray_checkbox)
         # =====================================================================
         # === MODIFIED SECTION START (Add max backups widget to layout) ===
         # =====================================================================
@@ -123,6 +125,7 @@ class SettingsWindow(QDialog):
             self.popup_interval.setValue(self.config['popup_interval_minutes'])
             self.popup_autoclose.setValue(self.config.get('popup_autoclose_minutes', 2))
             self.schedule_notify_checkbox.setChecked(self.config.get('show_schedule_notification', True))
+            self.start_in_tray_checkbox.setChecked(self.config.get('start_in_tray', False))
             # =====================================================================
             # === MODIFIED SECTION START (Load max backups value) ===
             # =====================================================================
@@ -166,6 +169,7 @@ class SettingsWindow(QDialog):
         self.config['popup_interval_minutes'] = self.popup_interval.value()
         self.config['popup_autoclose_minutes'] = self.popup_autoclose.value()
         self.config['show_schedule_notification'] = self.schedule_notify_checkbox.isChecked()
+        self.config['start_in_tray'] = self.start_in_tray_checkbox.isChecked()
         # =====================================================================
         # === MODIFIED SECTION START (Save max backups value) ===
         # =====================================================================
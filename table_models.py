@@ -0,0 +1,248 @@
+# table_models.py
+
+import math
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from PySide6.QtWidgets import QStyledItemDelegate, QStyleOptionViewItem, QStyle, QApplication
+from PySide6.QtCore import Qt, QObject, QAbstractTableModel, QModelIndex, QSize, QRectF, QTimer
+from PySide6.QtGui import QTextDocument, QAbstractTextDocumentLayout, QPalette
+
+# Cells drawn by RichTextDelegate return their description's RenderedDescription
+# (see render_cache) for this role; DisplayRole stays plain text for copying.
+RICH_TEXT_ROLE = Qt.ItemDataRole.UserRole + 100
+
+
+class RowTableModel(QAbstractTableModel):
+    """
+    Read-only table over a list of row objects. cell_data(row, column, role)
+    answers for one row object; by default rows are tuples shown as they are,
+    and subclasses override it for anything richer. set_rows replaces all rows
+    with a single model reset, so views never hold a widget per cell.
+    update_rows instead patches in only the rows that differ, matched by
+    row_key, so the view keeps its scroll position and selection.
+    """
+    def __init__(self, headers=(), parent=None):
+        super().__init__(parent)
+        self.headers = list(headers)
+        self.rows = []
+
+    def set_rows(self, rows, headers=None):
+        self.beginResetModel()
+        self.rows = list(rows)
+        if headers is not None:
+            self.headers = list(headers)
+        self.endResetModel()
+
+    def row_key(self, row):
+        """Returns what identifies a row between updates. Subclasses return an id where rows have one."""
+        return row
+
+    def update_rows(self, rows, headers=None):
+        """
+        Replaces the rows with rows, removing, inserting and signalling changes for
+        only the runs of rows that differ from the current ones. Falls back to
+        set_rows when the columns change. Returns the number of rows touched.
+        """
+        rows = list(rows)
+        if headers is not None and list(headers) != self.headers:
+            self.set_rows(rows, headers)
+            return len(rows)
+        return apply_row_diff(self, self.rows, rows, self.row_key)
+
+    def row_at(self, row):
+        return self.rows[row] if 0 <= row < len(self.rows) else None
+
+    def cell_data(self, row, column, role):
+        if role == Qt.ItemDataRole.DisplayRole and column < len(row):
+            value = row[column]
+            return None if value is None else str(value)
+        return None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        return self.cell_data(self.rows[index.row()], index.column(), role)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal and section < len(self.headers):
+            return self.headers[section]
+        return super().headerData(section, orientation, role)
+
+
+def apply_row_diff(model, rows, new_rows, row_key):
+    """
+    Turns the list rows, which holds model's rows from its first row on, into
+    new_rows in place. Rows are matched by row_key; model signals only the runs
+    that were removed, inserted or changed. Returns the number of rows touched.
+    """
+    old_keys = [row_key(row) for row in rows]
+    new_keys = [row_key(row) for row in new_rows]
+    touched = 0
+    # Opcodes are in order, so by the time one is applied everything before j1 already matches new_rows.
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, old_keys, new_keys, autojunk=False).get_opcodes():
+        if tag == 'equal':
+            offset = j1 - i1
+            changed = [i + offset for i in range(i1, i2) if rows[i + offset] != new_rows[i + offset]]
+            for first, last in _runs(changed):
+                rows[first:last + 1] = new_rows[first:last + 1]
+                model.dataChanged.emit(model.index(first, 0), model.index(last, model.columnCount() - 1))
+            touched += len(changed)
+            continue
+        if i2 > i1:
+            model.beginRemoveRows(QModelIndex(), j1, j1 + i2 - i1 - 1)
+            del rows[j1:j1 + i2 - i1]
+            model.endRemoveRows()
+        if j2 > j1:
+            model.beginInsertRows(QModelIndex(), j1, j2 - 1)
+            rows[j1:j1] = new_rows[j1:j2]
+            model.endInsertRows()
+        touched += max(i2 - i1, j2 - j1)
+    return touched
+
+
+def _runs(numbers):
+    """Yields (first, last) for each run of consecutive numbers in a sorted list."""
+    start = previous = None
+    for number in numbers:
+        if previous is not None and number == previous + 1:
+            previous = number
+            continue
+        if start is not None:
+            yield start, previous
+        start = previous = number
+    if start is not None:
+        yield start, previous
+
+
+class RichTextDelegate(QStyledItemDelegate):
+    """
+    Draws the description a cell returns for RICH_TEXT_ROLE with a QTextDocument,
+    as its inline HTML or, with inline=False, as stored. Laid-out documents are
+    kept in a bounded LRU keyed by HTML, width and font, so repainting a row that
+    was shown before does no layout work, and measured sizes are kept on the
+    description's RenderedDescription, so sizing a row whose description has been
+    measured at this width does none either. Other cells are drawn as usual.
+    """
+    CACHE_SIZE = 500
+
+    def __init__(self, view, word_wrap=True, margin=4, selected_text_color=None, inline=True):
+        super().__init__(view)
+        self.view = view
+        self.word_wrap = word_wrap
+        self.inline = inline
+        self.margin = margin
+        self.selected_text_color = selected_text_color
+        self._documents = OrderedDict()
+
+    def _document(self, html, width, font):
+        key = (html, width, font.key())
+        document = self._documents.get(key)
+        if document is not None:
+            self._documents.move_to_end(key)
+            return document
+        document = QTextDocument()
+        document.setDefaultFont(font)
+        document.setDocumentMargin(self.margin)
+        document.setHtml(html)
+        if self.word_wrap:
+            document.setTextWidth(width)
+        self._documents[key] = document
+        if len(self._documents) > self.CACHE_SIZE:
+            self._documents.popitem(last=False)
+        return document
+
+    def _html(self, rendered):
+        return rendered.inline_html if self.inline else rendered.description
+
+    def paint(self, painter, option, index):
+        rendered = index.data(RICH_TEXT_ROLE)
+        if rendered is None:
+            super().paint(painter, option, index)
+            return
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        opt.text = ""
+        # Let the style draw the background and selection, then the text on top.
+        style = opt.widget.style() if opt.widget else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_ItemViewItem, opt, painter, opt.widget)
+
+        document = self._document(self._html(rendered), opt.rect.width() if self.word_wrap else -1, opt.font)
+        context = QAbstractTextDocumentLayout.PaintContext()
+        if opt.state & QStyle.StateFlag.State_Selected:
+            context.palette.setColor(QPalette.ColorRole.Text, self.selected_text_color or
+                                     opt.palette.color(QPalette.ColorRole.HighlightedText))
+        painter.save()
+        painter.translate(opt.rect.topLeft())
+        painter.setClipRect(QRectF(0, 0, opt.rect.width(), opt.rect.height()))
+        document.documentLayout().draw(painter, context)
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        rendered = index.data(RICH_TEXT_ROLE)
+        if rendered is None:
+            return super().sizeHint(option, index)
+        width = self.view.columnWidth(index.column()) if self.word_wrap else -1
+        form = 'inline' if self.inline else 'html'
+        size = rendered.size(form, width, option.font.key())
+        if size is None:
+            document = self._document(self._html(rendered), width, option.font)
+            size = QSize(math.ceil(document.idealWidth()), math.ceil(document.size().height()))
+            rendered.set_size(form, width, option.font.key(), size)
+        return size
+
+
+class VisibleRowResizer(QObject):
+    """
+    Sizes a QTableView's rows to their contents only once they scroll into view,
+    instead of measuring every row up front. Rows are measured again after the
+    model is reset or a column changes width.
+    """
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        self.sized_rows = set()
+        # Columns sized to their contents look at the rows in view only, not the first thousand.
+        view.horizontalHeader().setResizeContentsPrecision(0)
+        self._pending = False
+        view.verticalScrollBar().valueChanged.connect(self.schedule)
+        view.horizontalHeader().sectionResized.connect(self.reset)
+        model = view.model()
+        model.modelReset.connect(self.reset)
+        model.rowsInserted.connect(self.reset)
+        model.rowsRemoved.connect(self.reset)
+        model.dataChanged.connect(self._on_data_changed)
+
+    def reset(self):
+        self.sized_rows.clear()
+        self.schedule()
+
+    def _on_data_changed(self, top_left, bottom_right, roles=()):
+        self.sized_rows.difference_update(range(top_left.row(), bottom_right.row() + 1))
+        self.schedule()
+
+    def schedule(self):
+        if not self._pending:
+            self._pending = True
+            QTimer.singleShot(0, self._resize_visible_rows)
+
+    def resize_now(self):
+        self._pending = True
+        self._resize_visible_rows()
+
+    def _resize_visible_rows(self):
+        self._pending = False
+        view = self.view
+        row_count = view.model().rowCount()
+        row = max(view.rowAt(0), 0)
+        viewport_height = view.viewport().height()
+        while row < row_count and view.rowViewportPosition(row) < viewport_height:
+            if row not in self.sized_rows:
+                view.resizeRowToContents(row)
+                self.sized_rows.add(row)
+            row += 1
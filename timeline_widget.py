@@ -0,0 +1,295 @@
+# timeline_widget.py
+
+import math
+import zlib
+from bisect import bisect_left, bisect_right
+from datetime import time
+from PySide6.QtWidgets import QWidget, QToolTip
+from PySide6.QtCore import Qt, Signal, QRectF, QPointF, QEvent
+from PySide6.QtGui import QPainter, QColor, QPen, QBrush, QFont, QFontMetrics, QPalette
+
+from render_cache import render_description
+
+
+class TimelineDay:
+    """
+    One day column of the timeline, laid out from the General tab's rows for it:
+    recorded tasks and unrecorded slots as (start minute, end minute, row) sorted
+    by start, the lunch window in minutes (or None) and the message, if the day
+    only has one.
+    """
+    def __init__(self, day, rows, lunch_window=None):
+        self.day = day
+        self.rows = rows
+        self.message = None
+        self.entries = []
+        for row in rows:
+            if row[0] == 'task':
+                start, end = _minutes(time.fromisoformat(row[1][2])), _minutes(time.fromisoformat(row[1][3]))
+            elif row[0] == 'slot':
+                start, end = _minutes(row[1][0].time()), _minutes(row[1][1].time())
+            else:
+                self.message = row[1]
+                continue
+            self.entries.append((start, max(end, start + 1), row))
+        self.entries.sort(key=lambda entry: entry[0])
+        self.starts = [entry[0] for entry in self.entries]
+        # With the longest entry known, the entries overlapping any span are found by bisecting on their starts.
+        self.longest = max((end - start for start, end, _ in self.entries), default=0)
+        self.lunch = (_minutes(lunch_window[0].time()), _minutes(lunch_window[1].time())) if lunch_window else None
+
+    def entries_between(self, first_minute, last_minute):
+        """Returns the entries that overlap [first_minute, last_minute], in start order."""
+        low = bisect_left(self.starts, first_minute - self.longest)
+        high = bisect_right(self.starts, last_minute)
+        return [entry for entry in self.entries[low:high] if entry[1] > first_minute]
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+
+class TimelineWidget(QWidget):
+    """
+    Paints a day or a week of the General tab as columns of time: recorded tasks,
+    unrecorded slots and the lunch window, all in one paint pass. Only the hours
+    inside the repainted rectangle are looked at, found by bisecting each day's
+    entries, so painting and hit-testing cost the same however full the week is.
+    Meant to sit in a QScrollArea that resizes it.
+    """
+    entryActivated = Signal(object)
+    selectionChanged = Signal()
+    contextMenuRequested = Signal(object, object)
+
+    HEADER_HEIGHT = 24
+    # Room above the first hour line for its label.
+    TOP_PADDING = 8
+    GUTTER_WIDTH = 44
+    MIN_ZOOM, MAX_ZOOM = 0.5, 6.0
+    UNRECORDED_COLOR = QColor("#9a9a9a")
+    SELECTED_COLOR = QColor("#447ED0")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.days = []
+        self.current_day = None
+        self.first_minute, self.last_minute = 8 * 60, 18 * 60
+        # Pixels per minute.
+        self.zoom = 1.2
+        self.selected_row = None
+        self.setFocusPolicy(Qt.FocusPolicy.ClickFocus)
+        self._relayout()
+
+    def set_days(self, days, current_day=None):
+        """Shows a list of TimelineDay, one column each. The selection is kept if its task is still shown."""
+        selected_id = self.selected_row[1][0] if self.selected_row and self.selected_row[0] == 'task' else None
+        self.days = days
+        self.current_day = current_day
+        starts = [day.entries[0][0] for day in days if day.entries] + [day.lunch[0] for day in days if day.lunch]
+        ends = [max(end for _, end, _ in day.entries) for day in days if day.entries] + \
+               [day.lunch[1] for day in days if day.lunch]
+        self.first_minute = (min(starts) // 60) * 60 if starts else 8 * 60
+        self.last_minute = min(math.ceil(max(ends) / 60) * 60, 24 * 60) if ends else 18 * 60
+        self.selected_row = None
+        if selected_id is not None:
+            for day in days:
+                for _, _, row in day.entries:
+                    if row[0] == 'task' and row[1][0] == selected_id:
+                        self.selected_row = row
+        self._relayout()
+        self.selectionChanged.emit()
+
+    def selected_entry(self):
+        """Returns the selected ('task', task, ...) or ('slot', (start_dt, end_dt)) row, or None."""
+        return self.selected_row
+
+    def set_zoom(self, zoom):
+        zoom = min(max(zoom, self.MIN_ZOOM), self.MAX_ZOOM)
+        if zoom != self.zoom:
+            self.zoom = zoom
+            self._relayout()
+
+    def zoom_in(self):
+        self.set_zoom(self.zoom * 1.25)
+
+    def zoom_out(self):
+        self.set_zoom(self.zoom / 1.25)
+
+    def _relayout(self):
+        self.setMinimumHeight(self.HEADER_HEIGHT + self.TOP_PADDING * 2 + math.ceil((self.last_minute - self.first_minute) * self.zoom) + 1)
+        self.update()
+
+    # --- Geometry ---
+
+    def _column_width(self):
+        return max(self.width() - self.GUTTER_WIDTH, 1) / max(len(self.days), 1)
+
+    def _y(self, minute):
+        return self.HEADER_HEIGHT + self.TOP_PADDING + (minute - self.first_minute) * self.zoom
+
+    def _minute_at(self, y):
+        return self.first_minute + (y - self.HEADER_HEIGHT - self.TOP_PADDING) / self.zoom
+
+    def _entry_rect(self, column, start, end):
+        column_width = self._column_width()
+        x = self.GUTTER_WIDTH + column * column_width
+        return QRectF(x + 2, self._y(start) + 1, column_width - 4, max((end - start) * self.zoom - 2, 2))
+
+    def entry_at(self, pos):
+        """Returns the row under a point in widget coordinates, or None."""
+        if pos.x() < self.GUTTER_WIDTH or pos.y() < self.HEADER_HEIGHT or not self.days:
+            return None
+        column = int((pos.x() - self.GUTTER_WIDTH) // self._column_width())
+        if not 0 <= column < len(self.days):
+            return None
+        minute = self._minute_at(pos.y())
+        hits = self.days[column].entries_between(minute, minute)
+        # Later entries are painted on top of earlier ones.
+        hits = [entry for entry in hits if entry[0] <= minute]
+        return hits[-1][2] if hits else None
+
+    # --- Painting ---
+
+    def _task_color(self, project_code):
+        # crc32 rather than hash(), so a project keeps its colour between runs.
+        hue = zlib.crc32((project_code or "").encode('utf-8')) % 360
+        return QColor.fromHsl(hue, 150, 205)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        clip = event.rect()
+        palette = self.palette()
+        painter.fillRect(clip, palette.color(QPalette.ColorRole.Base))
+        first_visible = max(self._minute_at(clip.top()), self.first_minute)
+        last_visible = min(self._minute_at(clip.bottom() + 1), self.last_minute)
+        column_width = self._column_width()
+
+        # Hour lines and labels in the gutter.
+        painter.setPen(palette.color(QPalette.ColorRole.Mid))
+        for hour in range(int(first_visible // 60), int(last_visible // 60) + 1):
+            y = self._y(hour * 60)
+            painter.drawLine(QPointF(self.GUTTER_WIDTH, y), QPointF(self.width(), y))
+            painter.drawText(QRectF(0, y - 8, self.GUTTER_WIDTH - 6, 16),
+                             Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, f"{hour % 24:02d}:00")
+
+        text_font = QFont(self.font())
+        text_font.setPointSizeF(max(text_font.pointSizeF() - 1, 7))
+        metrics = QFontMetrics(text_font)
+        for column, day in enumerate(self.days):
+            x = self.GUTTER_WIDTH + column * column_width
+            if x > clip.right() or x + column_width < clip.left():
+                continue
+            painter.setPen(palette.color(QPalette.ColorRole.Mid))
+            painter.drawLine(QPointF(x, self.HEADER_HEIGHT), QPointF(x, self.height()))
+
+            if day.lunch and day.lunch[1] > first_visible and day.lunch[0] < last_visible:
+                painter.fillRect(self._entry_rect(column, *day.lunch),
+                                 QBrush(palette.color(QPalette.ColorRole.Mid), Qt.BrushStyle.BDiagPattern))
+            if day.message:
+                painter.setPen(palette.color(QPalette.ColorRole.PlaceholderText))
+                painter.drawText(QRectF(x, self._y(first_visible), column_width, self._y(last_visible) - self._y(first_visible)),
+                                 Qt.AlignmentFlag.AlignCenter | Qt.TextFlag.TextWordWrap, day.message)
+
+            painter.setFont(text_font)
+            entries = day.entries_between(first_visible, last_visible)
+            hidden = 0
+            for number, (start, end, row) in enumerate(entries):
+                # Entries with the same times are drawn once, as the topmost with a count of the rest.
+                if number + 1 < len(entries) and entries[number + 1][:2] == (start, end):
+                    hidden += 1
+                    continue
+                self._paint_entry(painter, self._entry_rect(column, start, end), row, metrics, hidden)
+                hidden = 0
+            painter.setFont(self.font())
+
+        # The day names go on top, so they stay readable over the entries when scrolled to the top.
+        if clip.top() < self.HEADER_HEIGHT:
+            header_rect = QRectF(0, 0, self.width(), self.HEADER_HEIGHT)
+            painter.fillRect(header_rect, palette.color(QPalette.ColorRole.Button))
+            for column, day in enumerate(self.days):
+                rect = QRectF(self.GUTTER_WIDTH + column * column_width, 0, column_width, self.HEADER_HEIGHT)
+                font = QFont(self.font())
+                font.setBold(day.day == self.current_day and len(self.days) > 1)
+                painter.setFont(font)
+                painter.setPen(palette.color(QPalette.ColorRole.ButtonText))
+                painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, day.day.strftime("%a %d/%m"))
+        painter.end()
+
+    def _paint_entry(self, painter, rect, row, metrics, hidden=0):
+        selected = row is self.selected_row
+        if row[0] == 'task':
+            painter.setBrush(self._task_color(row[1][4]))
+            painter.setPen(QPen(self.SELECTED_COLOR if selected else self._task_color(row[1][4]).darker(140),
+                                2 if selected else 1))
+        else:
+            painter.setBrush(Qt.BrushStyle.NoBrush if not selected else QColor(68, 126, 208, 40))
+            painter.setPen(QPen(self.SELECTED_COLOR if selected else self.UNRECORDED_COLOR,
+                                2 if selected else 1, Qt.PenStyle.DashLine))
+        painter.drawRoundedRect(rect, 3, 3)
+
+        if rect.height() < metrics.height():
+            return
+        if row[0] == 'task':
+            painter.setPen(Qt.GlobalColor.black)
+            label = f"{row[1][2][:5]} {row[1][4]}" + (f" (+{hidden} more)" if hidden else "")
+            detail = render_description(row[1][5]).plain_text
+        else:
+            painter.setPen(self.UNRECORDED_COLOR)
+            label = f"{row[1][0].strftime('%H:%M')} Unrecorded"
+            detail = ""
+        text_rect = rect.adjusted(4, 1, -4, -1)
+        lines = [label] + (detail.splitlines() if detail else [])
+        max_lines = max(int(text_rect.height() // metrics.height()), 1)
+        for number, line in enumerate(lines[:max_lines]):
+            painter.drawText(QRectF(text_rect.left(), text_rect.top() + number * metrics.height(),
+                                    text_rect.width(), metrics.height()),
+                             Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                             metrics.elidedText(line, Qt.TextElideMode.ElideRight, int(text_rect.width())))
+
+    # --- Interaction ---
+
+    def mousePressEvent(self, event):
+        row = self.entry_at(event.position())
+        if row is not self.selected_row:
+            self.selected_row = row
+            self.update()
+            self.selectionChanged.emit()
+        super().mousePressEvent(event)
+
+    def mouseDoubleClickEvent(self, event):
+        row = self.entry_at(event.position())
+        if row is not None:
+            self.entryActivated.emit(row)
+
+    def contextMenuEvent(self, event):
+        row = self.entry_at(QPointF(event.pos()))
+        if row is not self.selected_row:
+            self.selected_row = row
+            self.update()
+            self.selectionChanged.emit()
+        self.contextMenuRequested.emit(row, event.globalPos())
+
+    def wheelEvent(self, event):
+        if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            if event.angleDelta().y() > 0:
+                self.zoom_in()
+            elif event.angleDelta().y() < 0:
+                self.zoom_out()
+            event.accept()
+        else:
+            # Let the scroll area scroll.
+            event.ignore()
+
+    def event(self, event):
+        if event.type() == QEvent.Type.ToolTip:
+            row = self.entry_at(QPointF(event.pos()))
+            if row is None:
+                QToolTip.hideText()
+            elif row[0] == 'task':
+                QToolTip.showText(event.globalPos(), f"<b>{row[1][2][:5]} - {row[1][3][:5]} {row[1][4]}</b><br>{row[2].inline_html}", self)
+            else:
+                start_dt, end_dt = row[1]
+                QToolTip.showText(event.globalPos(), f"{start_dt.strftime('%H:%M')} - {end_dt.strftime('%H:%M')} Unrecorded", self)
+            return True
+        return super().event(event)
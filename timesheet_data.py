@@ -0,0 +1,164 @@
+# timesheet_data.py
+
+import csv
+from datetime import datetime, time, timedelta
+
+DAY_NAME_TO_WEEKDAY = {"Monday": 0, "Tuesday": 1, "Wednesday": 2, "Thursday": 3, "Friday": 4, "Saturday": 5, "Sunday": 6}
+
+
+def get_holidays_in_range(dates, main_config):
+    """
+    Returns the set of dates in `dates` that are holidays, including the working day
+    that replaces a holiday falling on a Sunday.
+    """
+    if not dates:
+        return set()
+    official_holidays = set(main_config.get("holidays", []))
+    working_day_numbers = {DAY_NAME_TO_WEEKDAY[name] for name in main_config.get("working_days", [])}
+    date_set = set(dates)
+
+    holidays = set()
+    # Start a week early so a Sunday holiday just before the range still moves into it.
+    date_obj = dates[0] - timedelta(days=7)
+    while date_obj <= dates[-1]:
+        if date_obj.strftime("%Y-%m-%d") in official_holidays:
+            holidays.add(date_obj)
+            if date_obj.weekday() == 6 and working_day_numbers:
+                replacement_date = date_obj + timedelta(days=1)
+                while replacement_date.weekday() not in working_day_numbers:
+                    replacement_date += timedelta(days=1)
+                holidays.add(replacement_date)
+        date_obj += timedelta(days=1)
+    return holidays & date_set
+
+
+def get_work_windows(db, dates, main_config):
+    """
+    Returns {date: (work_start, work_end, lunch_start, lunch_end)} as 'HH:MM:SS'
+    strings for consecutive `dates`, or None for days that are not working days.
+    Uses the same rules as the task popup: the stored effective start time, else
+    the first task of the day if it is inside the flexible window, else the
+    window's upper bound; the day ends after the working hours plus lunch.
+    """
+    start_str, end_str = dates[0].strftime("%Y-%m-%d"), dates[-1].strftime("%Y-%m-%d")
+    work_times = db.get_work_times_for_range(start_str, end_str)
+    first_starts = db.get_first_start_times_for_range(start_str, end_str)
+
+    windows = {}
+    for date_obj in dates:
+        date_str = date_obj.strftime("%Y-%m-%d")
+        work_times_row = work_times.get(date_str)
+        if work_times_row:
+            lower, upper, hours = work_times_row[2], work_times_row[3], work_times_row[4]
+            lunch_s, lunch_e = work_times_row[5], work_times_row[6]
+            work_days, holidays = work_times_row[7].split(','), work_times_row[8].split(',')
+        else:
+            lower = main_config['work_start_time_flexible']['lower']
+            upper = main_config['work_start_time_flexible']['upper']
+            hours = main_config['daily_working_hours']
+            lunch_s, lunch_e = main_config['lunch_hour']['start'], main_config['lunch_hour']['end']
+            work_days, holidays = main_config.get('working_days', []), main_config.get('holidays', [])
+
+        if date_str in holidays or date_obj.strftime('%A') not in work_days:
+            windows[date_obj] = None
+            continue
+
+        if work_times_row:
+            work_start_t = time.fromisoformat(work_times_row[1])
+        elif date_str in first_starts:
+            earliest_task_t = time.fromisoformat(first_starts[date_str])
+            lower_bound, upper_bound = time.fromisoformat(lower), time.fromisoformat(upper)
+            work_start_t = earliest_task_t if lower_bound <= earliest_task_t <= upper_bound else upper_bound
+        else:
+            work_start_t = time.fromisoformat(upper)
+
+        work_start_dt = datetime.combine(date_obj, work_start_t)
+        lunch_dur = datetime.combine(date_obj, time.fromisoformat(lunch_e)) - datetime.combine(date_obj, time.fromisoformat(lunch_s))
+        work_end_dt = min(work_start_dt + timedelta(hours=hours) + lunch_dur,
+                          datetime.combine(date_obj, time(23, 59, 59)))
+        windows[date_obj] = (work_start_dt.strftime("%H:%M:%S"), work_end_dt.strftime("%H:%M:%S"), lunch_s, lunch_e)
+    return windows
+
+
+def build_timesheet(db, dates, main_config, row_configs):
+    """
+    Computes the timesheet grid for consecutive `dates` with one query for task
+    hours and one for working hours. Returns a dict with:
+      'dates', 'holidays',
+      'rows': [(project_code, display_name, [hours per date])] in display order,
+      'totals': [hours per date],
+      'required_hours': [hours expected per date, None on weekends],
+      'holiday_project_code': the configured holiday row's code, or None.
+    """
+    start_str, end_str = dates[0].strftime("%Y-%m-%d"), dates[-1].strftime("%Y-%m-%d")
+    date_index = {d.strftime("%Y-%m-%d"): i for i, d in enumerate(dates)}
+    holidays = get_holidays_in_range(dates, main_config)
+    default_hours = main_config.get("daily_working_hours", 8.0)
+    working_hours = db.get_working_hours_for_range(start_str, end_str)
+
+    project_hours = {}
+    for task_date, proj_code, hours in db.get_project_hours_for_range(start_str, end_str):
+        if hours is None:
+            continue
+        if proj_code not in project_hours:
+            project_hours[proj_code] = [0.0] * len(dates)
+        project_hours[proj_code][date_index[task_date]] += hours
+
+    holiday_project_code = next((c.get("project_code") for c in row_configs if c.get("is_holiday_code")), None)
+    if holiday_project_code:
+        if holiday_project_code not in project_hours:
+            project_hours[holiday_project_code] = [0.0] * len(dates)
+        for i, date_obj in enumerate(dates):
+            if date_obj in holidays and date_obj.weekday() not in [5, 6]:
+                project_hours[holiday_project_code][i] = working_hours.get(date_obj.strftime("%Y-%m-%d"), default_hours)
+
+    prefix_projects, suffix_projects, display_map = [], [], {}
+    for item in row_configs:
+        code = item.get("project_code")
+        if not code: continue
+        display_map[code] = item.get("display_name", code)
+        if item.get("is_prefix"):
+            prefix_projects.append(code)
+        elif item.get("is_suffix"):
+            suffix_projects.append(code)
+
+    projects_with_hours = set(project_hours.keys())
+    prefix_set, suffix_set = set(prefix_projects), set(suffix_projects)
+    other_projects = sorted(projects_with_hours - prefix_set - suffix_set, key=lambda code: code or "")
+    filtered_suffix_projects = [code for code in suffix_projects if code in projects_with_hours]
+    final_project_order = prefix_projects + other_projects + filtered_suffix_projects
+
+    rows = [(code, display_map.get(code, code), project_hours.get(code, [0.0] * len(dates)))
+            for code in final_project_order]
+    totals = [sum(hours[i] for _, _, hours in rows) for i in range(len(dates))]
+    required_hours = [
+        None if d.weekday() in [5, 6] else working_hours.get(d.strftime("%Y-%m-%d"), default_hours)
+        for d in dates
+    ]
+    return {
+        'dates': dates,
+        'holidays': holidays,
+        'rows': rows,
+        'totals': totals,
+        'required_hours': required_hours,
+        'holiday_project_code': holiday_project_code,
+    }
+
+
+def write_timesheet_csv(path, data):
+    """
+    Writes a timesheet from build_timesheet as CSV: one row per project with its
+    hours per date and total, then the daily totals and the required hours.
+    """
+    def format_hours(hours):
+        return "" if not hours else f"{hours:g}"
+
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Project Code", "Project"] + [d.strftime('%d/%m (%a)') for d in data['dates']] + ["Total"])
+        for proj_code, display_name, hours in data['rows']:
+            writer.writerow([proj_code or "", display_name or ""] + [format_hours(h) for h in hours]
+                            + [format_hours(sum(hours))])
+        writer.writerow(["", "Total"] + [format_hours(h) for h in data['totals']] + [format_hours(sum(data['totals']))])
+        writer.writerow(["", "Required"] + [format_hours(h) for h in data['required_hours']]
+                        + [format_hours(sum(h for h in data['required_hours'] if h))])
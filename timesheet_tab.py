@@ -1,34 +1,38 @@
 # timesheet_tab.py
 
+import calendar
 import json
 import os
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-                             QLabel, QTableWidget, QTableWidgetItem, QDialog,
-
-                             QGroupBox, QGridLayout, QCalendarWidget, QHeaderView,
+                             QLabel, QTableWidget, QTableView, QDialog, QComboBox,
+                             QGroupBox, QGridLayout, QCalendarWidget, QHeaderView, QDateEdit,
+                             QDialogButtonBox, QFormLayout, QInputDialog, QMessageBox,
                              QAbstractItemView, QStyledItemDelegate, QStyle, QApplication, QMenu)
-from PySide6.QtCore import Qt, QDate
+from PySide6.QtCore import Qt, QDate, QAbstractTableModel, QModelIndex, Signal
 from PySide6.QtGui import QColor, QBrush, QFont, QKeySequence, QKeyEvent
-from datetime import datetime, timedelta, time
+from datetime import datetime, timedelta
+from timesheet_data import build_timesheet, get_work_windows
+from table_models import apply_row_diff
+from view_cache import ViewCache, make_debounce_timer
+from report_cache import make_fingerprint
 
-class CopyableTableWidget(QTableWidget):
-    """A QTableWidget subclass that supports copying selected cells to the clipboard."""
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+class CopyableTableMixin:
+    """Adds copying of the selected cells to the clipboard to a QTableWidget or QTableView."""
 
     def copy_selection(self):
         """Copies the content of the selected cells to the clipboard in a tab-separated format."""
-        selected = self.selectedRanges()
-        if not selected:
+        selection = self.selectionModel().selection()
+        if selection.isEmpty():
             return
 
-        first_range = selected[0]
+        first_range = selection.first()
+        model = self.model()
         rows = []
-        for r in range(first_range.topRow(), first_range.bottomRow() + 1):
+        for r in range(first_range.top(), first_range.bottom() + 1):
             row_data = []
-            for c in range(first_range.leftColumn(), first_range.rightColumn() + 1):
-                item = self.item(r, c)
-                row_data.append(item.text() if item else "")
+            for c in range(first_range.left(), first_range.right() + 1):
+                value = model.index(r, c).data()
+                row_data.append(str(value) if value is not None else "")
             rows.append("\t".join(row_data))
         
         QApplication.clipboard().setText("\n".join(rows))
@@ -46,11 +50,17 @@ class CopyableTableWidget(QTableWidget):
         copy_action = menu.addAction("Copy (Ctrl+C)")
         copy_action.triggered.connect(self.copy_selection)
         
-        if not self.selectedRanges():
+        if not self.selectionModel().hasSelection():
             copy_action.setEnabled(False)
             
         menu.exec(event.globalPos())
 
+class CopyableTableWidget(CopyableTableMixin, QTableWidget):
+    """A QTableWidget subclass that supports copying selected cells to the clipboard."""
+
+class CopyableTableView(CopyableTableMixin, QTableView):
+    """A QTableView subclass that supports copying selected cells to the clipboard."""
+
 class CustomCellDelegate(QStyledItemDelegate):
     """A custom delegate to handle special drawing for all cells in timesheet."""
     def __init__(self, parent=None):
@@ -62,10 +72,10 @@ class CustomCellDelegate(QStyledItemDelegate):
         self.holiday_selected_color = self.holiday_color.darker(115)
         
         self.holidays = set()
-        self.week_dates = []
+        self.dates = []
 
-    def set_view_data(self, week_dates, holidays):
-        self.week_dates = week_dates
+    def set_view_data(self, dates, holidays):
+        self.dates = dates
         self.holidays = holidays
 
     def paint(self, painter, option, index):
@@ -73,7 +83,7 @@ class CustomCellDelegate(QStyledItemDelegate):
         is_weekend = False
 
         if index.column() > 0:
-            current_date = self.week_dates[index.column() - 1]
+            current_date = self.dates[index.column() - 1]
             is_holiday = current_date in self.holidays
             is_weekend = current_date.weekday() in [5, 6]
 
@@ -94,18 +104,214 @@ class CustomCellDelegate(QStyledItemDelegate):
         super().paint(painter, option, index)
 
 
+class TimesheetModel(QAbstractTableModel):
+    """
+    Project x day grid of hours with a Total row, as returned by build_timesheet.
+    Only the cells in view are ever asked for, so long ranges stay cheap.
+    Hours typed into a cell are kept in `edits` until the tab writes them back.
+    """
+    editsChanged = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.dates = []
+        self.rows = []
+        self.totals = []
+        self.required_hours = []
+        self.holidays = set()
+        self.holiday_project_code = None
+        self.edits = {}
+        self.bold_font = QFont()
+        self.bold_font.setBold(True)
+        self.edited_font = QFont()
+        self.edited_font.setItalic(True)
+
+    def set_timesheet(self, data):
+        self.beginResetModel()
+        self.dates = data['dates']
+        # A copy, as added project rows must not leak into the cached timesheet.
+        self.rows = list(data['rows'])
+        self.totals = list(data['totals'])
+        self.required_hours = data['required_hours']
+        self.holidays = data['holidays']
+        self.holiday_project_code = data['holiday_project_code']
+        self.edits = {}
+        self.endResetModel()
+        self.editsChanged.emit()
+
+    def update_timesheet(self, data):
+        """
+        Takes a rebuilt timesheet for the dates already shown, signalling only the
+        project rows and totals that changed. Anything else goes through set_timesheet.
+        """
+        if (self.edits or data['dates'] != self.dates or data['holidays'] != self.holidays
+                or data['required_hours'] != self.required_hours
+                or data['holiday_project_code'] != self.holiday_project_code):
+            self.set_timesheet(data)
+            return
+        apply_row_diff(self, self.rows, list(data['rows']), lambda row: row[0])
+        if list(data['totals']) != self.totals:
+            self.totals = list(data['totals'])
+            self.dataChanged.emit(self.index(len(self.rows), 0), self.index(len(self.rows), self.columnCount() - 1))
+
+    def clear_edits(self):
+        """Drops the hours typed into cells, showing the stored hours and totals again."""
+        stored = {code: hours for code, _, hours in self.rows}
+        for (proj_code, date_obj), hours in self.edits.items():
+            col = self.dates.index(date_obj)
+            self.totals[col] -= hours - stored[proj_code][col]
+        self.edits = {}
+        if self.rows:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.rows), self.columnCount() - 1))
+        self.editsChanged.emit()
+
+    def _hours(self, row, col):
+        proj_code, _, hours = self.rows[row]
+        return self.edits.get((proj_code, self.dates[col - 1]), hours[col - 1])
+
+    def _is_editable(self, row, col):
+        if col == 0 or row >= len(self.rows):
+            return False
+        # Holiday hours come from the calendar, not from stored tasks.
+        return not (self.rows[row][0] == self.holiday_project_code and self.dates[col - 1] in self.holidays)
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and self._is_editable(index.row(), index.column()):
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.EditRole or not self._is_editable(index.row(), index.column()):
+            return False
+        text = str(value).strip() if value is not None else ""
+        try:
+            hours = float(text) if text else 0.0
+        except ValueError:
+            return False
+        if not 0 <= hours <= 24:
+            return False
+
+        row, col = index.row(), index.column()
+        proj_code, _, stored_hours = self.rows[row]
+        key = (proj_code, self.dates[col - 1])
+        previous_hours = self._hours(row, col)
+        if abs(hours - stored_hours[col - 1]) < 0.005:
+            self.edits.pop(key, None)
+        else:
+            self.edits[key] = hours
+        self.totals[col - 1] += self._hours(row, col) - previous_hours
+
+        total_index = self.index(len(self.rows), col)
+        self.dataChanged.emit(index, index)
+        self.dataChanged.emit(total_index, total_index)
+        self.editsChanged.emit()
+        return True
+
+    def add_project_row(self, proj_code, display_name):
+        """Adds an empty row for a project not yet in the grid. Returns the row number."""
+        for row, (code, _, _) in enumerate(self.rows):
+            if code == proj_code:
+                return row
+        row = len(self.rows)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.rows.append((proj_code, display_name, [0.0] * len(self.dates)))
+        self.endInsertRows()
+        return row
+
+    def get_changes(self):
+        """Returns (project_code, date, stored_hours, new_hours) for every edited cell."""
+        stored = {code: hours for code, _, hours in self.rows}
+        return [(code, date_obj, stored[code][self.dates.index(date_obj)], hours)
+                for (code, date_obj), hours in self.edits.items()]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows) + 1
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.dates) + 1
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        is_total_row = row == len(self.rows)
+
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            if col == 0:
+                return "Total" if is_total_row else self.rows[row][1]
+            hours = self.totals[col - 1] if is_total_row else self._hours(row, col)
+            return f"{hours:.2f}" if hours > 0.005 else ""
+        if role == Qt.ItemDataRole.TextAlignmentRole and col > 0:
+            return Qt.AlignmentFlag.AlignCenter
+        if role == Qt.ItemDataRole.FontRole:
+            if is_total_row:
+                return self.bold_font
+            if col > 0 and (self.rows[row][0], self.dates[col - 1]) in self.edits:
+                return self.edited_font
+        if role == Qt.ItemDataRole.ForegroundRole and is_total_row and col > 0:
+            required_hours = self.required_hours[col - 1]
+            if required_hours is not None and self.totals[col - 1] < required_hours \
+                    and self.dates[col - 1] not in self.holidays:
+                return QColor("red")
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            if section == 0:
+                return "Project"
+            date_format = '%A\n(%d/%m)' if len(self.dates) <= 7 else '%a\n(%d/%m)'
+            return self.dates[section - 1].strftime(date_format)
+        return super().headerData(section, orientation, role)
+
+
+class DateRangeDialog(QDialog):
+    """Asks for an inclusive start and end date."""
+    def __init__(self, start_date, end_date, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Select Date Range")
+        layout = QFormLayout(self)
+
+        self.start_edit = QDateEdit(QDate(start_date))
+        self.start_edit.setCalendarPopup(True)
+        self.start_edit.setDisplayFormat("dd/MM/yyyy")
+        self.end_edit = QDateEdit(QDate(end_date))
+        self.end_edit.setCalendarPopup(True)
+        self.end_edit.setDisplayFormat("dd/MM/yyyy")
+        layout.addRow("From:", self.start_edit)
+        layout.addRow("To:", self.end_edit)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+
+    def get_range(self):
+        start_date = self.start_edit.date().toPython()
+        end_date = self.end_edit.date().toPython()
+        return (start_date, end_date) if start_date <= end_date else (end_date, start_date)
+
+
 class TimesheetTab(QWidget):
     CONFIG_FILE = 'timesheet.json'
+    RANGE_MODES = ["Week", "Fortnight", "Month", "Custom"]
+    DAY_COLUMN_WIDTH = 64
+    TIMESHEET_DESCRIPTION = "Logged from timesheet"
 
     def __init__(self, parent, db, main_config):
         super().__init__(parent)
+        self.parent_window = parent
         self.db = db
         self.main_config = main_config
         self.view_date = datetime.now().date()
+        self.range_mode = "Week"
+        self.custom_range = self._get_week_boundaries(self.view_date)
         self.timesheet_config = self._load_config()
+        # Ranges already built, with the previous and next ones built ahead while the app is idle.
+        self.view_cache = ViewCache(db, parent=self)
+        self.refresh_timer = make_debounce_timer(self, self.update_timesheet_view)
         
         self.init_ui()
-        self.update_timesheet_view()
 
     def _load_config(self):
         if not os.path.exists(self.CONFIG_FILE):
@@ -123,12 +329,16 @@ class TimesheetTab(QWidget):
     def init_ui(self):
         main_layout = QVBoxLayout(self)
         
-        nav_group = QGroupBox("Week Navigation")
+        nav_group = QGroupBox("Timesheet Range")
         nav_layout = QGridLayout(nav_group)
+
+        self.range_combo = QComboBox()
+        self.range_combo.addItems(self.RANGE_MODES)
+        self.range_combo.currentTextChanged.connect(self._on_range_mode_changed)
         
         prev_button = QPushButton("<")
-        prev_button.setToolTip("Previous Week")
-        prev_button.clicked.connect(self._go_to_previous_week)
+        prev_button.setToolTip("Previous")
+        prev_button.clicked.connect(self._go_to_previous_range)
         
         self.week_label = QLabel()
         self.week_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -137,185 +347,268 @@ class TimesheetTab(QWidget):
         self.week_label.mousePressEvent = self._show_calendar_picker
         
         next_button = QPushButton(">")
-        next_button.setToolTip("Next Week")
-        next_button.clicked.connect(self._go_to_next_week)
+        next_button.setToolTip("Next")
+        next_button.clicked.connect(self._go_to_next_range)
         
-        nav_layout.addWidget(prev_button, 0, 0)
-        nav_layout.addWidget(self.week_label, 0, 1)
-        nav_layout.addWidget(next_button, 0, 2)
-        nav_layout.setColumnStretch(1, 1)
+        nav_layout.addWidget(self.range_combo, 0, 0)
+        nav_layout.addWidget(prev_button, 0, 1)
+        nav_layout.addWidget(self.week_label, 0, 2)
+        nav_layout.addWidget(next_button, 0, 3)
+        nav_layout.setColumnStretch(2, 1)
         
         main_layout.addWidget(nav_group)
 
-        self.table = CopyableTableWidget()
-        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.model = TimesheetModel(self)
+        self.model.editsChanged.connect(self._on_edits_changed)
+        self.table = CopyableTableView()
+        self.table.setModel(self.model)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.DoubleClicked |
+                                   QAbstractItemView.EditTrigger.EditKeyPressed |
+                                   QAbstractItemView.EditTrigger.AnyKeyPressed)
         self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectItems)
         self.table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.table.setHorizontalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
 
         self.delegate = CustomCellDelegate(self)
         self.table.setItemDelegate(self.delegate)
 
         header = self.table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
         header.setHighlightSections(False)
 
         main_layout.addWidget(self.table)
 
+        edit_layout = QHBoxLayout()
+        edit_hint = QLabel("Type hours into a cell to log or remove time, then save.")
+        add_project_button = QPushButton("Add Project...")
+        add_project_button.clicked.connect(self._add_project_row)
+        self.discard_button = QPushButton("Discard Changes")
+        self.discard_button.clicked.connect(self._discard_edits)
+        self.save_button = QPushButton("Save Changes")
+        self.save_button.clicked.connect(self._save_edits)
+        edit_layout.addWidget(edit_hint)
+        edit_layout.addStretch()
+        edit_layout.addWidget(add_project_button)
+        edit_layout.addWidget(self.discard_button)
+        edit_layout.addWidget(self.save_button)
+        main_layout.addLayout(edit_layout)
+        self._on_edits_changed()
+
     def _get_week_boundaries(self, date_obj):
         days_to_saturday = (date_obj.weekday() + 2) % 7
         start_of_week = date_obj - timedelta(days=days_to_saturday)
         end_of_week = start_of_week + timedelta(days=6)
         return start_of_week, end_of_week
 
-    def _go_to_previous_week(self):
-        self.view_date -= timedelta(weeks=1)
+    def _get_range_boundaries(self, view_date=None, custom_range=None):
+        """Returns the inclusive (start, end) dates shown for the current range mode, at view_date if given."""
+        view_date = view_date or self.view_date
+        if self.range_mode == "Fortnight":
+            start_of_range, _ = self._get_week_boundaries(view_date)
+            return start_of_range, start_of_range + timedelta(days=13)
+        if self.range_mode == "Month":
+            last_day = calendar.monthrange(view_date.year, view_date.month)[1]
+            return view_date.replace(day=1), view_date.replace(day=last_day)
+        if self.range_mode == "Custom":
+            return custom_range or self.custom_range
+        return self._get_week_boundaries(view_date)
+
+    def _on_range_mode_changed(self, mode):
+        if not self._resolve_pending_edits():
+            self.range_combo.blockSignals(True)
+            self.range_combo.setCurrentText(self.range_mode)
+            self.range_combo.blockSignals(False)
+            return
+        if mode == "Custom":
+            start_date, end_date = self._get_range_boundaries()
+            dialog = DateRangeDialog(start_date, end_date, self)
+            if dialog.exec() != QDialog.DialogCode.Accepted:
+                self.range_combo.blockSignals(True)
+                self.range_combo.setCurrentText(self.range_mode)
+                self.range_combo.blockSignals(False)
+                return
+            self.custom_range = dialog.get_range()
+        self.range_mode = mode
         self.update_timesheet_view()
 
-    def _go_to_next_week(self):
-        self.view_date += timedelta(weeks=1)
-        self.update_timesheet_view()
+    def _step_range(self, direction):
+        if not self._resolve_pending_edits():
+            return
+        self.view_date, self.custom_range = self._stepped_range(direction)
+        # Show where navigation has got to at once, but only build the range once the clicking stops.
+        self._update_range_label(*self._get_range_boundaries())
+        self.view_cache.cancel_prefetch()
+        self.refresh_timer.start()
+
+    def _stepped_range(self, direction):
+        """Returns the (view_date, custom_range) one range before (-1) or after (1) the current one."""
+        view_date, custom_range = self.view_date, self.custom_range
+        if self.range_mode == "Month":
+            month_index = view_date.year * 12 + view_date.month - 1 + direction
+            view_date = view_date.replace(year=month_index // 12, month=month_index % 12 + 1, day=1)
+        elif self.range_mode == "Custom":
+            start_date, end_date = custom_range
+            span = (end_date - start_date + timedelta(days=1)) * direction
+            custom_range = (start_date + span, end_date + span)
+        else:
+            weeks = 2 if self.range_mode == "Fortnight" else 1
+            view_date += timedelta(weeks=weeks * direction)
+        return view_date, custom_range
+
+    def _go_to_previous_range(self):
+        self._step_range(-1)
+
+    def _go_to_next_range(self):
+        self._step_range(1)
 
     def _show_calendar_picker(self, event):
+        if not self._resolve_pending_edits():
+            return
+        if self.range_mode == "Custom":
+            dialog = DateRangeDialog(*self.custom_range, parent=self)
+            if dialog.exec() == QDialog.DialogCode.Accepted:
+                self.custom_range = dialog.get_range()
+                self.update_timesheet_view()
+            return
+
         calendar_dialog = QDialog(self)
         calendar_dialog.setWindowTitle("Select Date")
         cal_layout = QVBoxLayout(calendar_dialog)
-        calendar = QCalendarWidget()
-        calendar.setSelectedDate(QDate(self.view_date))
+        calendar_widget = QCalendarWidget()
+        calendar_widget.setSelectedDate(QDate(self.view_date))
         
         def on_date_selected():
-            self.view_date = calendar.selectedDate().toPython()
+            self.view_date = calendar_widget.selectedDate().toPython()
             self.update_timesheet_view()
             calendar_dialog.accept()
 
-        calendar.selectionChanged.connect(on_date_selected)
-        cal_layout.addWidget(calendar)
+        calendar_widget.selectionChanged.connect(on_date_selected)
+        cal_layout.addWidget(calendar_widget)
         calendar_dialog.exec()
 
-    def update_timesheet_view(self):
-        start_of_week, end_of_week = self._get_week_boundaries(self.view_date)
-        self.week_label.setText(
-            f"{start_of_week.strftime('%d/%m/%Y')} to {end_of_week.strftime('%d/%m/%Y')}"
+    def _apply_column_sizes(self, num_days):
+        """Short ranges fill the width; long ranges use fixed day columns and scroll."""
+        header = self.table.horizontalHeader()
+        if num_days <= 7:
+            header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+            header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        else:
+            header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+            header.setDefaultSectionSize(self.DAY_COLUMN_WIDTH)
+            header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
+
+    def _on_edits_changed(self):
+        has_edits = bool(self.model.edits)
+        self.save_button.setEnabled(has_edits)
+        self.discard_button.setEnabled(has_edits)
+
+    def _resolve_pending_edits(self):
+        """Asks what to do with unsaved cell edits. Returns False if the user cancels."""
+        if not self.model.edits:
+            return True
+        reply = QMessageBox.question(
+            self, "Unsaved Changes", "Save the hours you have typed into the timesheet?",
+            QMessageBox.StandardButton.Save | QMessageBox.StandardButton.Discard | QMessageBox.StandardButton.Cancel
         )
-        
-        week_dates = [start_of_week + timedelta(days=i) for i in range(7)]
-        headers = ["Project"] + [d.strftime('%A\n(%d/%m)') for d in week_dates]
-        self.table.setColumnCount(len(headers))
-        self.table.setHorizontalHeaderLabels(headers)
-
-        official_holidays = set(self.main_config.get("holidays", []))
-        working_days_names = self.main_config.get("working_days", [])
-        day_name_to_weekday = {"Monday": 0, "Tuesday": 1, "Wednesday": 2, "Thursday": 3, "Friday": 4, "Saturday": 5, "Sunday": 6}
-        working_day_numbers = {day_name_to_weekday[name] for name in working_days_names}
-        
-        actual_holidays_this_week = set()
-        for date_obj in week_dates:
-            if date_obj.strftime("%Y-%m-%d") in official_holidays:
-                actual_holidays_this_week.add(date_obj)
-                if date_obj.weekday() == 6:
-                    replacement_date = date_obj + timedelta(days=1)
-                    while True:
-                        if replacement_date.weekday() in working_day_numbers:
-                            actual_holidays_this_week.add(replacement_date)
-                            break
-                        replacement_date += timedelta(days=1)
-        
-        self.delegate.set_view_data(week_dates, actual_holidays_this_week)
-
-        project_hours = {}
-        for i, current_date in enumerate(week_dates):
-            tasks = self.db.get_tasks_for_date(current_date.strftime("%Y-%m-%d"))
-            for task in tasks:
-                proj_code = task[4]
-                try:
-                    start_t = time.fromisoformat(task[2])
-                    end_t = time.fromisoformat(task[3])
-                    duration = (datetime.combine(current_date, end_t) - 
-                                datetime.combine(current_date, start_t)).total_seconds() / 3600
-                    if proj_code not in project_hours:
-                        project_hours[proj_code] = [0.0] * 7
-                    project_hours[proj_code][i] += duration
-                except ValueError:
-                    continue
+        if reply == QMessageBox.StandardButton.Save:
+            return self._save_edits()
+        if reply == QMessageBox.StandardButton.Discard:
+            self.model.clear_edits()
+            return True
+        return False
+
+    def _discard_edits(self):
+        self.model.clear_edits()
+        self.update_timesheet_view()
 
+    def _add_project_row(self):
+        codes = self.db.get_unique_project_codes()
+        proj_code, ok = QInputDialog.getItem(self, "Add Project", "Project code:", codes, 0, True)
+        proj_code = proj_code.strip()
+        if not ok or not proj_code:
+            return
         row_configs = self.timesheet_config.get("row_configurations", [])
-        holiday_project_code = next((c.get("project_code") for c in row_configs if c.get("is_holiday_code")), None)
-
-        if holiday_project_code:
-            if holiday_project_code not in project_hours:
-                project_hours[holiday_project_code] = [0.0] * 7
-            for i, date_obj in enumerate(week_dates):
-                if date_obj in actual_holidays_this_week and date_obj.weekday() not in [5, 6]:
-                    work_times_row = self.db.get_work_times_for_date(date_obj.strftime("%Y-%m-%d"))
-                    hours_for_day = work_times_row[4] if work_times_row else self.main_config.get("daily_working_hours", 8.0)
-                    project_hours[holiday_project_code][i] = hours_for_day
-        
-        prefix_projects, suffix_projects, display_map = [], [], {}
-        for item in row_configs:
-            code = item.get("project_code")
-            if not code: continue
-            display_map[code] = item.get("display_name", code)
-            if item.get("is_prefix"):
-                prefix_projects.append(code)
-            elif item.get("is_suffix"):
-                suffix_projects.append(code)
-
-        projects_with_hours = set(project_hours.keys())
-        prefix_set, suffix_set = set(prefix_projects), set(suffix_projects)
-        other_projects = sorted(list(projects_with_hours - prefix_set - suffix_set))
-        filtered_suffix_projects = [code for code in suffix_projects if code in projects_with_hours]
-        final_project_order = prefix_projects + other_projects + filtered_suffix_projects
-        
-        self.table.setRowCount(len(final_project_order))
-
-        for row, proj_code in enumerate(final_project_order):
-            display_name = display_map.get(proj_code, proj_code)
-            proj_item = QTableWidgetItem(display_name)
-            self.table.setItem(row, 0, proj_item)
-            hours_data = project_hours.get(proj_code, [0.0] * 7)
-            for col, hours in enumerate(hours_data, start=1):
-                hours_item = QTableWidgetItem()
-                if hours > 0.005:
-                    hours_item.setText(f"{hours:.2f}")
-                hours_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.table.setItem(row, col, hours_item)
-
-        num_project_rows = len(final_project_order)
-        self.table.setRowCount(num_project_rows + 1)
-        total_row_index = num_project_rows
-
-        bold_font = QFont()
-        bold_font.setBold(True)
-
-        total_label_item = QTableWidgetItem("Total")
-        total_label_item.setFont(bold_font)
-        self.table.setItem(total_row_index, 0, total_label_item)
-
-        for col in range(1, self.table.columnCount()):
-            column_total = 0.0
-            for row in range(num_project_rows):
-                item = self.table.item(row, col)
-                if item and item.text():
-                    try:
-                        column_total += float(item.text())
-                    except ValueError:
-                        pass
-
-            total_item = QTableWidgetItem()
-            if column_total > 0.005:
-                total_item.setText(f"{column_total:.2f}")
-            
-            total_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            total_item.setFont(bold_font)
+        display_name = next((c.get("display_name", proj_code) for c in row_configs if c.get("project_code") == proj_code), proj_code)
+        row = self.model.add_project_row(proj_code, display_name)
+        self.table.setCurrentIndex(self.model.index(row, 1))
+
+    def _save_edits(self):
+        """
+        Writes every edited cell back in one transaction: added hours are placed in
+        the day's free working time, removed hours are trimmed from the latest rows.
+        Returns True if the changes were saved.
+        """
+        changes = self.model.get_changes()
+        if not changes:
+            return True
+        first_date = min(date_obj for _, date_obj, _, _ in changes)
+        last_date = max(date_obj for _, date_obj, _, _ in changes)
+        windows = get_work_windows(
+            self.db, [first_date + timedelta(days=i) for i in range((last_date - first_date).days + 1)], self.main_config
+        )
+
+        batch, problems = [], []
+        for proj_code, date_obj, stored_hours, new_hours in sorted(changes, key=lambda c: (c[1], c[0])):
+            delta_seconds = round(new_hours * 60) * 60 - round(stored_hours * 3600)
+            if delta_seconds == 0:
+                continue
+            window = windows[date_obj]
+            if window is None:
+                if delta_seconds > 0:
+                    problems.append(f"{date_obj.strftime('%d/%m/%Y')} ({proj_code}): not a working day")
+                    continue
+                window = (None, None, None, None)
+            work_start, work_end, lunch_start, lunch_end = window
+            excluded_ranges = [(lunch_start, lunch_end)] if lunch_start else []
+            batch.append((date_obj.strftime('%Y-%m-%d'), proj_code, delta_seconds, (work_start, work_end), excluded_ranges))
+
+        if not problems:
+            for task_date, proj_code, free_hours in self.db.apply_timesheet_changes(batch, self.TIMESHEET_DESCRIPTION):
+                date_text = datetime.strptime(task_date, '%Y-%m-%d').strftime('%d/%m/%Y')
+                problems.append(f"{date_text} ({proj_code}): only {free_hours:.2f} h free in the work day")
+        if problems:
+            QMessageBox.warning(self, "Timesheet Not Saved",
+                                "Nothing was saved because some hours do not fit:\n\n" + "\n".join(problems))
+            return False
+
+        self.model.clear_edits()
+        self.update_timesheet_view()
+        # Added, trimmed and deleted rows can be of any category.
+        self.parent_window.mark_tabs_dirty('general_tab', 'travel_tab', 'qa83_tab')
+        return True
+
+    def update_timesheet_view(self):
+        self.refresh_timer.stop()
+        if self.model.edits:
+            # Keep the user's unsaved typing; navigation asks before throwing it away.
+            return
+        start_date, end_date = self._get_range_boundaries()
+        self._update_range_label(start_date, end_date)
 
-            current_date = week_dates[col - 1]
-            if current_date.weekday() not in [5, 6]:
-                work_times_row = self.db.get_work_times_for_date(current_date.strftime("%Y-%m-%d"))
-                required_hours = work_times_row[4] if work_times_row else self.main_config.get("daily_working_hours", 8.0)
-                
-                if column_total < required_hours and current_date not in actual_holidays_this_week:
-                    total_item.setForeground(QColor("red"))
+        data = self.view_cache.get(*self._view_job(start_date, end_date))
+        dates = data['dates']
 
-            self.table.setItem(total_row_index, col, total_item)
+        self.delegate.set_view_data(dates, data['holidays'])
+        if dates == self.model.dates:
+            self.model.update_timesheet(data)
+        else:
+            self.model.set_timesheet(data)
+            self._apply_column_sizes(len(dates))
+        self._prefetch_neighbours()
+
+    def _update_range_label(self, start_date, end_date):
+        self.week_label.setText(
+            f"{start_date.strftime('%d/%m/%Y')} to {end_date.strftime('%d/%m/%Y')}"
+        )
 
-        self.table.resizeColumnsToContents()
-        self.table.resizeRowsToContents()
\ No newline at end of file
+    def _view_job(self, start_date, end_date):
+        """Returns the (cache key, build function) of the timesheet for a range of dates."""
+        dates = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+        row_configs = self.timesheet_config.get("row_configurations", [])
+        key = (start_date, end_date, make_fingerprint(self.main_config, row_configs))
+        return key, lambda: build_timesheet(self.db, dates, self.main_config, row_configs)
+
+    def _prefetch_neighbours(self):
+        if not self.isVisible():
+            return
+        self.view_cache.prefetch([self._view_job(*self._get_range_boundaries(*self._stepped_range(direction)))
+                                  for direction in (1, -1)])
@@ -3,26 +3,82 @@
 import json
 import os
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-                             QLabel, QTableWidgetItem, QDialog,
+                             QLabel, QDialog, QComboBox,
                              QGroupBox, QGridLayout, QCalendarWidget, QHeaderView,
-                             QAbstractItemView)
-from PySide6.QtCore import Qt, QDate
-from PySide6.QtGui import QTextDocument
-from datetime import datetime, timedelta, time
-from datetime import datetime, timedelta
-from timesheet_tab import CopyableTableWidget
+                             QAbstractItemView, QFormLayout, QDateEdit, QDialogButtonBox,
+                             QFileDialog, QMessageBox, QProgressDialog)
+from PySide6.QtCore import Qt, QDate, QStandardPaths, QUrl, QSize
+from PySide6.QtGui import QDesktopServices
+from datetime import datetime, date, timedelta, time
+from timesheet_tab import CopyableTableView
+from table_models import RowTableModel
+from claims_report import ClaimsReportWorker, month_range
+from render_cache import render_description
+from view_cache import ViewCache, make_debounce_timer
+
+class ClaimsReportDialog(QDialog):
+    """Asks for the first and last month of a batch of travel claims reports."""
+    def __init__(self, first_month, last_month, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Generate Travel Claims")
+        layout = QFormLayout(self)
+
+        self.from_edit = QDateEdit(QDate(first_month))
+        self.from_edit.setDisplayFormat("MMMM yyyy")
+        self.to_edit = QDateEdit(QDate(last_month))
+        self.to_edit.setDisplayFormat("MMMM yyyy")
+        layout.addRow("From month:", self.from_edit)
+        layout.addRow("To month:", self.to_edit)
+        layout.addRow(QLabel("One HTML and one CSV file is written per month."))
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+
+    def get_months(self):
+        first_month = self.from_edit.date().toPython().replace(day=1)
+        last_month = self.to_edit.date().toPython().replace(day=1)
+        if last_month < first_month:
+            first_month, last_month = last_month, first_month
+        return month_range(first_month, last_month)
+
+class TravelEntryModel(RowTableModel):
+    """One row per travel entry, as returned by Database.get_entries_for_range_by_category."""
+    def __init__(self, parent=None):
+        super().__init__(["Date", "Time", "Project Code", "Description"], parent)
+
+    def row_key(self, row):
+        return row[7]
+
+    def cell_data(self, row, column, role):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if column == 0:
+            return date.fromisoformat(row[1]).strftime("%d/%m/%Y (%a)")
+        if column == 1:
+            return time.fromisoformat(row[2]).strftime("%H:%M")
+        return row[4] if column == 2 else render_description(row[5]).plain_text
 
 class TravelTab(QWidget):
     CONFIG_FILE = 'travel.json'
+    CLAIMANT_CONFIG_FILE = 'QA83.json'
+    # View name -> number of months shown and stepped by the arrows.
+    VIEW_MONTHS = {"Month": 1, "Quarter": 3, "Year": 12}
 
     def __init__(self, parent, db):
         super().__init__(parent)
         self.db = db
         self.view_date = datetime.now().date()
+        self.view_mode = "Month"
         self.travel_config = self._load_config()
+        # The period in the table, so refreshing the same period patches rows instead of resetting them.
+        self.table_period = None
+        # Periods already listed, with the previous and next ones listed ahead while the app is idle.
+        self.view_cache = ViewCache(db, parent=self)
+        self.refresh_timer = make_debounce_timer(self, self.update_travel_view)
         
         self.init_ui()
-        self.update_travel_view()
 
     def _load_config(self):
         if not os.path.exists(self.CONFIG_FILE):
@@ -40,11 +96,15 @@ class TravelTab(QWidget):
     def init_ui(self):
         main_layout = QVBoxLayout(self)
         
-        nav_group = QGroupBox("Month Navigation")
+        nav_group = QGroupBox("Period Navigation")
         nav_layout = QGridLayout(nav_group)
+
+        self.view_combo = QComboBox()
+        self.view_combo.addItems(list(self.VIEW_MONTHS))
+        self.view_combo.currentTextChanged.connect(self._on_view_mode_changed)
         
         prev_button = QPushButton("<")
-        prev_button.setToolTip("Previous Month")
+        prev_button.setToolTip("Previous Period")
         prev_button.clicked.connect(self._go_to_previous_month)
         
         self.month_label = QLabel()
@@ -54,23 +114,24 @@ class TravelTab(QWidget):
         self.month_label.mousePressEvent = self._show_calendar_picker
         
         next_button = QPushButton(">")
-        next_button.setToolTip("Next Month")
+        next_button.setToolTip("Next Period")
         next_button.clicked.connect(self._go_to_next_month)
         
-        nav_layout.addWidget(prev_button, 0, 0)
-        nav_layout.addWidget(self.month_label, 0, 1)
-        nav_layout.addWidget(next_button, 0, 2)
-        nav_layout.setColumnStretch(1, 1)
+        nav_layout.addWidget(self.view_combo, 0, 0)
+        nav_layout.addWidget(prev_button, 0, 1)
+        nav_layout.addWidget(self.month_label, 0, 2)
+        nav_layout.addWidget(next_button, 0, 3)
+        nav_layout.setColumnStretch(2, 1)
         
         main_layout.addWidget(nav_group)
 
-        self.table = CopyableTableWidget()
+        self.model = TravelEntryModel(self)
+        self.table = CopyableTableView()
+        self.table.setModel(self.model)
         self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
-        self.table.setColumnCount(4)
-        self.table.setHorizontalHeaderLabels(["Date", "Time", "Project Code", "Description"])
         
         self.table.setStyleSheet("""
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #447ED0;
                 color: white;
             }
@@ -84,6 +145,14 @@ class TravelTab(QWidget):
         header.setHighlightSections(False)
 
         main_layout.addWidget(self.table)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.claims_button = QPushButton("Generate Claims Report...")
+        self.claims_button.clicked.connect(self._generate_claims_reports)
+        button_layout.addWidget(self.claims_button)
+        main_layout.addLayout(button_layout)
+        self.claims_worker = None
     
     def _add_months(self, source_date, months):
         month = source_date.month - 1 + months
@@ -91,13 +160,39 @@ class TravelTab(QWidget):
         month = month % 12 + 1
         return source_date.replace(year=year, month=month, day=1)
 
-    def _go_to_previous_month(self):
-        self.view_date = self._add_months(self.view_date, -1)
+    def _get_period_boundaries(self, view_date=None):
+        """Returns the first and last date of the month, quarter or year containing view_date."""
+        view_date = view_date or self.view_date
+        months = self.VIEW_MONTHS[self.view_mode]
+        first_month = (view_date.month - 1) // months * months + 1
+        start_of_period = view_date.replace(month=first_month, day=1)
+        end_of_period = self._add_months(start_of_period, months) - timedelta(days=1)
+        return start_of_period, end_of_period
+
+    def _get_period_label(self, start_of_period):
+        if self.view_mode == "Year":
+            return start_of_period.strftime('%Y')
+        if self.view_mode == "Quarter":
+            return f"Q{(start_of_period.month - 1) // 3 + 1} {start_of_period.year}"
+        return start_of_period.strftime('%B %Y')
+
+    def _on_view_mode_changed(self, mode):
+        self.view_mode = mode
         self.update_travel_view()
 
+    def _go_to_previous_month(self):
+        self.view_date = self._add_months(self.view_date, -self.VIEW_MONTHS[self.view_mode])
+        self._schedule_view_update()
+
     def _go_to_next_month(self):
-        self.view_date = self._add_months(self.view_date, 1)
-        self.update_travel_view()
+        self.view_date = self._add_months(self.view_date, self.VIEW_MONTHS[self.view_mode])
+        self._schedule_view_update()
+
+    def _schedule_view_update(self):
+        """Shows the new period at once but only lists its entries once the clicking stops."""
+        self.month_label.setText(self._get_period_label(self._get_period_boundaries()[0]))
+        self.view_cache.cancel_prefetch()
+        self.refresh_timer.start()
 
     def _show_calendar_picker(self, event):
         calendar_dialog = QDialog(self)
@@ -115,80 +210,101 @@ class TravelTab(QWidget):
         cal_layout.addWidget(calendar)
         calendar_dialog.exec()
 
-    def _group_tasks_for_display(self, tasks):
-        """
-        Groups tasks by date, project, and description, returning only the first
-        entry for each group. This handles cases where a single logical task is
-        split into multiple database entries (e.g., split by a lunch break).
-        """
-        if not tasks:
-            return []
-
-        # The tasks list is pre-sorted by date and start time from the database query.
-        # We use a set to keep track of the groups we've already added.
-        # A group is uniquely identified by (date, project_code, description).
-        
-        unique_groups = set()
-        display_tasks = []
-
-        for task in tasks:
-            group_key = (
-                task[1],  # task_date
-                task[4],  # project_code
-                task[5]   # description
-            )
-            
-            if group_key not in unique_groups:
-                display_tasks.append(task)
-                unique_groups.add(group_key)
-                
-        return display_tasks
+    def _load_claimant(self):
+        """Returns (name, designation), shared with the QA83 report settings."""
+        try:
+            with open(self.CLAIMANT_CONFIG_FILE, 'r') as f:
+                config = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            config = {}
+        return config.get("name", ""), config.get("designation", "")
+
+    def _generate_claims_reports(self):
+        start_of_period, end_of_period = self._get_period_boundaries()
+        dialog = ClaimsReportDialog(start_of_period, end_of_period, self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        months = dialog.get_months()
+
+        desktop_path = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.DesktopLocation)
+        output_dir = QFileDialog.getExistingDirectory(self, "Save Claims Reports To", desktop_path)
+        if not output_dir:
+            return
+
+        name, designation = self._load_claimant()
+        self.claims_progress = QProgressDialog("Generating travel claims...", None, 0, len(months), self)
+        self.claims_progress.setWindowTitle("Travel Claims")
+        self.claims_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.claims_progress.setMinimumDuration(0)
+        self.claims_progress.setValue(0)
+
+        self.claims_button.setEnabled(False)
+        self.claims_worker = ClaimsReportWorker(
+            self.db, months, output_dir, self.travel_config.get("travel_categories", []),
+            name, designation, self
+        )
+        self.claims_worker.progress.connect(lambda done, total: self.claims_progress.setValue(done))
+        self.claims_worker.succeeded.connect(self._on_claims_reports_written)
+        self.claims_worker.failed.connect(self._on_claims_reports_failed)
+        self.claims_worker.finished.connect(self._on_claims_worker_finished)
+        self.claims_worker.start()
+
+    def _on_claims_reports_written(self, paths):
+        self.claims_progress.close()
+        QMessageBox.information(self, "Success", f"{len(paths) // 2} month(s) of claims saved to:\n{os.path.dirname(paths[0])}")
+        QDesktopServices.openUrl(QUrl.fromLocalFile(paths[0]))
+
+    def _on_claims_reports_failed(self, error):
+        self.claims_progress.close()
+        QMessageBox.critical(self, "Error", f"Failed to generate claims reports: {error}")
+
+    def _on_claims_worker_finished(self):
+        self.claims_button.setEnabled(True)
+        self.claims_worker.deleteLater()
+        self.claims_worker = None
 
     def update_travel_view(self):
-        self.month_label.setText(self.view_date.strftime('%B %Y'))
+        self.refresh_timer.stop()
+        start_of_period, end_of_period = self._get_period_boundaries()
+        self.month_label.setText(self._get_period_label(start_of_period))
 
-        start_of_month = self.view_date.replace(day=1)
-        next_month = self._add_months(start_of_month, 1)
-        end_of_month = next_month - timedelta(days=1)
-        
-        travel_tasks = []
-        travel_categories_set = set(self.travel_config.get("travel_categories", []))
-
-        current_date = start_of_month
-        while current_date <= end_of_month:
-            date_str = current_date.strftime("%Y-%m-%d")
-            tasks_for_day = self.db.get_tasks_for_date(date_str)
-            
-            for task in tasks_for_day:
-                task_categories = set(cat.strip() for cat in task[6].split(','))
-                if not travel_categories_set.isdisjoint(task_categories):
-                    travel_tasks.append(task)
-            
-            current_date += timedelta(days=1)
-
-        # Group the collected tasks before displaying them
-        display_tasks = self._group_tasks_for_display(travel_tasks)
-
-        self.table.setRowCount(len(display_tasks))
+        display_tasks = self.view_cache.get(*self._view_job(start_of_period, end_of_period))
+
+        if self.table_period == (start_of_period, end_of_period):
+            # The same period again, e.g. after an edit: only the rows that changed are touched.
+            self.model.update_rows(display_tasks)
+        else:
+            self.table_period = (start_of_period, end_of_period)
+            self.model.set_rows(display_tasks)
+
+        # Only multi-line descriptions need measuring; the rest keep the default height.
+        # Heights already measured at this column width come from the shared render cache.
+        width, font_key = self.table.columnWidth(3), self.table.font().key()
+        default_height = self.table.verticalHeader().defaultSectionSize()
         for row, task in enumerate(display_tasks):
-            task_date_obj = datetime.strptime(task[1], "%Y-%m-%d").date()
-            display_date = task_date_obj.strftime("%d/%m/%Y (%a)")
-            
-            start_time_obj = time.fromisoformat(task[2])
-            display_time = start_time_obj.strftime("%H:%M")
-
-            doc = QTextDocument()
-            doc.setHtml(task[5])
-            plain_text_description = doc.toPlainText()
-            
-            date_item = QTableWidgetItem(display_date)
-            time_item = QTableWidgetItem(display_time)
-            project_item = QTableWidgetItem(task[4])
-            description_item = QTableWidgetItem(plain_text_description)
-            
-            self.table.setItem(row, 0, date_item)
-            self.table.setItem(row, 1, time_item)
-            self.table.setItem(row, 2, project_item)
-            self.table.setItem(row, 3, description_item)
-
-        self.table.resizeRowsToContents()
\ No newline at end of file
+            rendered = render_description(task[5])
+            if '\n' not in rendered.plain_text:
+                if self.table.rowHeight(row) != default_height:
+                    self.table.setRowHeight(row, default_height)
+            else:
+                size = rendered.size('plain', width, font_key)
+                if size is None:
+                    self.table.resizeRowToContents(row)
+                    rendered.set_size('plain', width, font_key, QSize(width, self.table.rowHeight(row)))
+                else:
+                    self.table.setRowHeight(row, size.height())
+        self._prefetch_neighbours()
+
+    def _view_job(self, start_of_period, end_of_period):
+        """Returns the (cache key, build function) of the travel entries listed for a period."""
+        categories = tuple(self.travel_config.get("travel_categories", []))
+        # One query returns the first row of each travel entry.
+        return (start_of_period, end_of_period, categories), lambda: self.db.get_entries_for_range_by_category(
+            start_of_period.strftime("%Y-%m-%d"), end_of_period.strftime("%Y-%m-%d"), list(categories))
+
+    def _prefetch_neighbours(self):
+        if not self.isVisible():
+            return
+        months = self.VIEW_MONTHS[self.view_mode]
+        self.view_cache.prefetch([self._view_job(*self._get_period_boundaries(self._add_months(self.view_date, step)))
+                                  for step in (months, -months)])
@@ -0,0 +1,80 @@
+# view_cache.py
+
+from collections import OrderedDict
+from PySide6.QtCore import QObject, QTimer
+
+# How long navigation waits for the next click before rendering where it has got to.
+NAVIGATION_DELAY_MS = 150
+
+
+def make_debounce_timer(parent, slot, interval=NAVIGATION_DELAY_MS):
+    """Returns a single-shot timer that calls slot once clicks have stopped for interval ms; start() restarts it."""
+    timer = QTimer(parent)
+    timer.setSingleShot(True)
+    timer.setInterval(interval)
+    timer.timeout.connect(slot)
+    return timer
+
+
+class ViewCache(QObject):
+    """
+    Small LRU of a tab's computed view models, keyed by whatever identifies a
+    view (its period and the settings it depends on). Each entry remembers the
+    database's data version it was built at and is rebuilt once anything has
+    been written since. prefetch() builds views the user is likely to step to
+    next, one per event-loop pass, so the GUI stays responsive while it works.
+    """
+    def __init__(self, db, max_entries=12, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._pending = []
+        self._prefetch_timer = QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.setInterval(0)
+        self._prefetch_timer.timeout.connect(self._prefetch_next)
+
+    def get(self, key, build):
+        """Returns the view for key, calling build() to compute it if it is missing or out of date."""
+        version = self.db.get_data_version()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self._entries.move_to_end(key)
+            return entry[1]
+        view = build()
+        self._store(key, version, view)
+        return view
+
+    def _store(self, key, version, view):
+        self._entries[key] = (version, view)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def prefetch(self, jobs):
+        """Replaces the queued prefetches with jobs, a list of (key, build), and starts working through them."""
+        self._pending = list(jobs)
+        if self._pending:
+            self._prefetch_timer.start()
+        else:
+            self._prefetch_timer.stop()
+
+    def cancel_prefetch(self):
+        self.prefetch([])
+
+    def _prefetch_next(self):
+        version = self.db.get_data_version()
+        while self._pending:
+            key, build = self._pending.pop(0)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                continue
+            self._store(key, version, build())
+            break
+        if self._pending:
+            self._prefetch_timer.start()
+
+    def clear(self):
+        self._entries.clear()
+        self.cancel_prefetch()